@@ -0,0 +1,239 @@
+# app/brightdata.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+from datetime import timedelta
+from typing import Dict, Optional
+
+import httpx
+
+API_TOKEN = os.getenv("BRIGHTDATA_API_TOKEN")
+# Overridable so load tests can run against a local fake server.
+BRIGHTDATA_API_URL = os.getenv("BRIGHTDATA_API_URL", "https://api.brightdata.com").rstrip("/")
+
+DATASET_IDS = {
+    "LinkedIn": "gd_lpfll7v5hcqtkxl6l",
+    "Glassdoor": "gd_lpfbbndm1xnopbrcr0",
+    "Indeed": "gd_l7qekxkv2i7ve6hx1s",
+}
+
+# Trigger/poll/deliver flows allowed to talk to Bright Data at once (per process).
+BRIGHTDATA_CONCURRENCY = int(os.getenv("BRIGHTDATA_CONCURRENCY", "8"))
+BRIGHTDATA_TIMEOUT = float(os.getenv("BRIGHTDATA_TIMEOUT", "30"))
+BRIGHTDATA_POLL_BASE_DELAY = float(os.getenv("BRIGHTDATA_POLL_BASE_DELAY", "2"))
+BRIGHTDATA_POLL_MAX_DELAY = float(os.getenv("BRIGHTDATA_POLL_MAX_DELAY", "60"))
+# How long a discovery collection may take to become ready before the flow gives up.
+BRIGHTDATA_READY_TIMEOUT = float(os.getenv("BRIGHTDATA_READY_TIMEOUT", "1200"))
+
+HEADERS = {
+    "Authorization": f"Bearer {API_TOKEN}",
+    "Content-Type": "application/json",
+}
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class SnapshotNotDelivered(Exception):
+    pass
+
+
+def trigger_url(platform: str) -> str:
+    return (
+        f"{BRIGHTDATA_API_URL}/datasets/v3/trigger?dataset_id={DATASET_IDS[platform]}"
+        "&include_errors=true&type=discover_new&discover_by=keyword"
+    )
+
+
+def build_payloads(role: str, location: str, additional_details: Dict) -> Dict[str, Dict]:
+    """Per-platform Bright Data discovery payloads for one role."""
+    return {
+        "LinkedIn": {
+            "location": location,
+            "keyword": role,
+            "country": additional_details.get("country", ""),
+            "time_range": "Past 24 hours",
+            "job_type": additional_details.get("job_type", ""),
+            "experience_level": additional_details.get("experience_level", ""),
+            "remote": additional_details.get("remote", "")
+        },
+        "Glassdoor": {
+            "location": location,
+            "keyword": role,
+            "country": additional_details.get("country", "")
+        },
+        "Indeed": {
+            "country": additional_details.get("country", ""),
+            "domain": "indeed.com",
+            "keyword_search": role,
+            "location": location,
+            "date_posted": "Last 24 hours",
+            "posted_by": ""
+        }
+    }
+
+
+_WINDOW = re.compile(r"(?:(\d+)\s*)?(hour|day|week|month)s?", re.IGNORECASE)
+_WINDOW_UNITS = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1), "month": timedelta(days=30)}
+
+
+def ingest_window(payload: Dict) -> Optional[timedelta]:
+    """
+    How far back a discovery request reaches ("Past 24 hours" -> 24h).
+
+    None when the request has no time filter and returns every current posting.
+    """
+    value = payload.get("time_range") or payload.get("date_posted")
+    match = _WINDOW.search(value) if isinstance(value, str) else None
+    if not match:
+        return None
+    return int(match.group(1) or 1) * _WINDOW_UNITS[match.group(2).lower()]
+
+
+def normalize_payload(payload: Dict) -> Dict:
+    """Trim and collapse whitespace in string filters so equivalent requests send identical payloads."""
+    return {
+        key: " ".join(value.split()) if isinstance(value, str) else value
+        for key, value in payload.items()
+    }
+
+
+def payload_fingerprint(platform: str, payload: Dict) -> str:
+    """
+    Stable identity of a discovery request.
+
+    Two payloads that would make Bright Data collect the same results map to
+    the same fingerprint: keys are sorted, strings are whitespace-normalized
+    and case-folded, and empty filters are dropped.
+    """
+    canonical = {
+        key: value.casefold() if isinstance(value, str) else value
+        for key, value in normalize_payload(payload).items()
+        if value not in ("", None)
+    }
+    encoded = json.dumps([platform, canonical], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def get_brightdata_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=httpx.Timeout(BRIGHTDATA_TIMEOUT),
+            limits=httpx.Limits(max_connections=BRIGHTDATA_CONCURRENCY * 2),
+        )
+    return _client
+
+
+def get_brightdata_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(BRIGHTDATA_CONCURRENCY)
+    return _semaphore
+
+
+async def close_brightdata_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def backoff_delay(attempt: int, base_delay: float = BRIGHTDATA_POLL_BASE_DELAY) -> float:
+    """Capped exponential backoff with full jitter."""
+    return random.uniform(0, min(BRIGHTDATA_POLL_MAX_DELAY, base_delay * (2 ** attempt)))
+
+
+async def trigger_snapshot(platform: str, payload: Dict) -> str:
+    """Start a discovery collection and return its snapshot id."""
+    response = await get_brightdata_client().post(trigger_url(platform), json=payload)
+    response.raise_for_status()
+    snapshot_id = response.json().get("snapshot_id")
+    if not snapshot_id:
+        raise ValueError(f"Bright Data trigger for {platform} returned no snapshot_id")
+    return snapshot_id
+
+
+async def wait_until_ready(
+    snapshot_id: str,
+    timeout: float = BRIGHTDATA_READY_TIMEOUT,
+    base_delay: float = BRIGHTDATA_POLL_BASE_DELAY,
+) -> None:
+    """
+    Poll collection progress without blocking the event loop.
+
+    The jittered backoff only spaces the polls out; how long to wait
+    overall is ``timeout`` seconds, however many polls that takes.
+    """
+    client = get_brightdata_client()
+    url = f"{BRIGHTDATA_API_URL}/datasets/v3/progress/{snapshot_id}"
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempt = 0
+    while True:
+        try:
+            response = await client.get(url)
+            if response.status_code == 200:
+                status = response.json().get("status")
+                if status == "ready":
+                    return
+                if status == "failed":
+                    raise SnapshotNotDelivered(f"Snapshot {snapshot_id} collection failed")
+            else:
+                logger.warning(f"Unexpected progress response for snapshot {snapshot_id}: {response.status_code}")
+        except httpx.HTTPError as e:
+            logger.error(f"Error while polling snapshot {snapshot_id}: {str(e)}")
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(backoff_delay(attempt, base_delay), remaining))
+        attempt += 1
+    raise SnapshotNotDelivered(f"Snapshot {snapshot_id} was not ready after {timeout:g}s ({attempt + 1} polls)")
+
+
+async def deliver_snapshot(
+    snapshot_id: str,
+    s3_directory: str,
+    max_retries: int = 5,
+    base_delay: float = BRIGHTDATA_POLL_BASE_DELAY,
+) -> None:
+    """Ask Bright Data to push a ready snapshot to our bucket."""
+    client = get_brightdata_client()
+    url = f"{BRIGHTDATA_API_URL}/datasets/v3/deliver/{snapshot_id}"
+    delivery_payload = {
+        "deliver": {
+            "type": "s3",
+            "filename": {
+                "template": f"{snapshot_id}",
+                "extension": "json"
+            },
+            "bucket": os.getenv("S3_BUCKET"),
+            "credentials": {
+                "aws-access-key": os.getenv("AWS_ACCESS_KEY"),
+                "aws-secret-key": os.getenv("AWS_SECRET_KEY"),
+            },
+            "directory": s3_directory
+        },
+        "compress": False
+    }
+    for attempt in range(max_retries):
+        try:
+            response = await client.post(url, json=delivery_payload)
+            if response.status_code == 200:
+                return
+            if response.status_code < 500 and response.status_code != 429:
+                raise SnapshotNotDelivered(
+                    f"Delivery of snapshot {snapshot_id} rejected: {response.status_code} {response.text}"
+                )
+            logger.warning(f"Delivery of snapshot {snapshot_id} returned {response.status_code}, retrying")
+        except httpx.HTTPError as e:
+            logger.error(f"Error while delivering snapshot {snapshot_id}: {str(e)}")
+        await asyncio.sleep(backoff_delay(attempt, base_delay))
+    raise SnapshotNotDelivered(f"Snapshot {snapshot_id} was not delivered after {max_retries} retries")
@@ -0,0 +1,318 @@
+# app/dedup.py
+"""
+Cross-platform duplicate detection for job postings.
+
+The same job is scraped from several platforms and under several roles.
+Every posting gets two fingerprints at ingest:
+
+* ``dedup_key``: sha1 of the normalized company, title and city;
+* ``minhash``: a MinHash signature of the description's word shingles,
+  split into LSH bands that are stored in ``posting_lsh_buckets``.
+
+New postings are only compared with postings sharing their key or one of
+their bands, so clustering is incremental. A candidate is a duplicate when
+it has the same key and a similar description (or either has none), or the
+same company and a near-identical description. Each cluster is identified
+by its first posting's id (``cluster_id``), which serves as the canonical
+posting; the others are listed as its ``sources``.
+
+Postings ingested before clustering existed can be processed with
+
+    python -m app.dedup --backfill
+"""
+import argparse
+import hashlib
+import logging
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, exists
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, Query, aliased
+
+from app.models.job_posting import JobPosting
+from app.models.posting_bucket import PostingBucket
+from app.role_matcher import tokenize
+from app.subscriptions import subscribed_to
+from app.versions import bump_versions, scope_subscribers
+
+MINHASH_PERMUTATIONS = 64
+# 16 bands of 4 rows: descriptions with Jaccard similarity around 0.5 and
+# above almost always share a band.
+LSH_BANDS = 16
+SHINGLE_WORDS = 3
+# Descriptions with fewer shingles are too short to compare.
+MIN_SHINGLES = 5
+# Estimated Jaccard similarity needed with the same key / with only the same company.
+DUPLICATE_KEY_SIMILARITY = 0.3
+DUPLICATE_TEXT_SIMILARITY = 0.8
+
+COMPANY_SUFFIXES = frozenset(
+    "inc inc. llc ltd ltd. limited pvt pvt. private corp corp. corporation co co. company plc gmbh llp technologies".split()
+)
+
+# Fixed seed: signatures are stored, so the hash family must not change between processes.
+_rng = np.random.default_rng(20241218)
+_MULTIPLIERS = _rng.integers(1, 2 ** 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2 ** 63, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_SIGNATURE_DTYPE = np.dtype("<u4")
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_company(company: Optional[str]) -> str:
+    words = tokenize(company or "")
+    while words and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def duplicate_key(company: Optional[str], title: Optional[str], location: Optional[str]) -> str:
+    """Key shared by copies of a posting: company without legal suffix, title words and city."""
+    city = (location or "").split(",")[0]
+    key = "|".join((normalize_company(company), " ".join(tokenize(title or "")), " ".join(tokenize(city))))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def minhash_signature(text: Optional[str]) -> Optional[np.ndarray]:
+    """MinHash of the text's word shingles, or None when the text is too short."""
+    words = tokenize(text or "")
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # Multiply-shift hashing: uint64 arithmetic wraps, the high 32 bits are the permuted value.
+    permuted = (hashes[:, None] * _MULTIPLIERS + _OFFSETS) >> np.uint64(32)
+    return permuted.min(axis=0).astype(_SIGNATURE_DTYPE)
+
+
+def decode_signature(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    return np.frombuffer(blob, dtype=_SIGNATURE_DTYPE) if blob else None
+
+
+def lsh_bands(signature: Optional[np.ndarray]) -> List[int]:
+    """Signed 64-bit bucket id per band (band number included, so bands never collide with each other)."""
+    if signature is None:
+        return []
+    bands = []
+    for band, rows in enumerate(np.split(signature, LSH_BANDS)):
+        digest = hashlib.blake2b(bytes([band]) + rows.tobytes(), digest_size=8).digest()
+        bands.append(int.from_bytes(digest, "big", signed=True))
+    return bands
+
+
+def similarity(a: Optional[np.ndarray], b: Optional[np.ndarray]) -> Optional[float]:
+    """Estimated Jaccard similarity of two signatures; None if either is missing."""
+    if a is None or b is None:
+        return None
+    return float(np.mean(a == b))
+
+
+def dedup_columns(company: Optional[str], title: Optional[str], location: Optional[str], description: Optional[str]) -> Dict:
+    """Duplicate-detection columns for one posting, computed at ingest."""
+    signature = minhash_signature(description)
+    return {
+        "dedup_key": duplicate_key(company, title, location),
+        "minhash": signature.tobytes() if signature is not None else None,
+    }
+
+
+class _Member:
+    __slots__ = ("id", "cluster_id", "company", "key", "signature")
+
+    def __init__(self, posting_id, cluster_id, company, key, minhash):
+        self.id = posting_id
+        self.cluster_id = cluster_id
+        self.company = normalize_company(company)
+        self.key = key
+        self.signature = decode_signature(minhash)
+
+
+def is_duplicate(a: _Member, b: _Member) -> bool:
+    score = similarity(a.signature, b.signature)
+    if a.key == b.key:
+        return score is None or score >= DUPLICATE_KEY_SIMILARITY
+    return score is not None and score >= DUPLICATE_TEXT_SIMILARITY and (
+        not a.company or not b.company or a.company == b.company
+    )
+
+
+def cluster_postings(db: Session, posting_ids: Iterable[int]) -> int:
+    """
+    Assign ``cluster_id`` to postings that have none yet.
+
+    Candidates are read with two indexed lookups (same key, shared LSH band)
+    for the whole batch; postings in the batch are also matched against
+    each other. Returns the number of postings that joined an existing
+    cluster or another posting of the batch.
+    """
+    columns = (JobPosting.id, JobPosting.cluster_id, JobPosting.company, JobPosting.dedup_key, JobPosting.minhash)
+    new = [
+        _Member(*row)
+        for row in db.query(*columns)
+        .filter(JobPosting.id.in_(list(posting_ids)), JobPosting.cluster_id.is_(None))
+        .order_by(JobPosting.id)
+        .all()
+    ]
+    if not new:
+        return 0
+
+    bands = {member.id: lsh_bands(member.signature) for member in new}
+    members: Dict[int, _Member] = {}
+    by_key: Dict[str, List[int]] = defaultdict(list)
+    by_band: Dict[int, List[int]] = defaultdict(list)
+
+    all_bands = {band for member_bands in bands.values() for band in member_bands}
+    if all_bands:
+        for band, *row in db.query(PostingBucket.band, *columns)\
+                .join(JobPosting, JobPosting.id == PostingBucket.posting_id)\
+                .filter(PostingBucket.band.in_(all_bands), JobPosting.cluster_id.isnot(None))\
+                .all():
+            members.setdefault(row[0], _Member(*row))
+            by_band[band].append(row[0])
+    for row in db.query(*columns)\
+            .filter(JobPosting.dedup_key.in_({member.key for member in new}), JobPosting.cluster_id.isnot(None))\
+            .all():
+        members.setdefault(row[0], _Member(*row))
+        by_key[row[3]].append(row[0])
+
+    merged = 0
+    assignments: Dict[int, int] = {}
+    # Clusters found to be the same cluster: old cluster_id -> surviving one.
+    relabel: Dict[int, int] = {}
+
+    def resolve(cluster: int) -> int:
+        while cluster in relabel:
+            cluster = relabel[cluster]
+        return cluster
+
+    for member in new:
+        candidates = set(by_key[member.key]).union(*(by_band[band] for band in bands[member.id]))
+        clusters = {resolve(members[c].cluster_id) for c in candidates if is_duplicate(member, members[c])}
+        member.cluster_id = min(clusters) if clusters else member.id
+        for cluster in clusters - {member.cluster_id}:
+            relabel[cluster] = member.cluster_id
+        merged += bool(clusters)
+        assignments[member.id] = member.cluster_id
+
+        members[member.id] = member
+        by_key[member.key].append(member.id)
+        for band in bands[member.id]:
+            by_band[band].append(member.id)
+
+    db.bulk_update_mappings(JobPosting, [
+        {"id": posting_id, "cluster_id": resolve(cluster_id)}
+        for posting_id, cluster_id in assignments.items()
+    ])
+    for old in relabel:
+        db.query(JobPosting).filter(JobPosting.cluster_id == old)\
+            .update({JobPosting.cluster_id: resolve(old)}, synchronize_session=False)
+
+    # Joined or merged clusters change the sources and the collapsed listings
+    # of every platform/role they span, not just the one being ingested.
+    touched = {resolve(cluster_id) for posting_id, cluster_id in assignments.items() if resolve(cluster_id) != posting_id}
+    touched |= {resolve(old) for old in relabel}
+    if touched:
+        scopes = db.query(JobPosting.platform, JobPosting.role)\
+            .filter(JobPosting.cluster_id.in_(touched))\
+            .distinct()\
+            .all()
+        bump_versions(db, scope_subscribers(db, [tuple(scope) for scope in scopes]))
+
+    bucket_rows = [{"band": band, "posting_id": posting_id} for posting_id, member_bands in bands.items() for band in member_bands]
+    if bucket_rows:
+        dialect = db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        db.execute(insert(PostingBucket.__table__).values(bucket_rows).on_conflict_do_nothing())
+    db.commit()
+    return merged
+
+
+def collapse_duplicates(
+    db: Session,
+    query: Query,
+    user_id: Optional[str] = None,
+    platform: Optional[str] = None,
+    role: Optional[str] = None,
+) -> Query:
+    """
+    Keep one posting per cluster: the earliest one visible under the same
+    user/platform/role scope (usually the canonical posting itself).
+    """
+    earlier = aliased(JobPosting)
+    conditions = [
+        earlier.cluster_id == JobPosting.cluster_id,
+        earlier.id < JobPosting.id,
+        earlier.removed_at.is_(None),
+    ]
+    if user_id:
+        conditions.append(subscribed_to(db, user_id, earlier.platform, earlier.role))
+    if platform:
+        conditions.append(earlier.platform == platform)
+    if role:
+        conditions.append(earlier.role == role)
+    return query.filter(~exists().where(and_(*conditions)))
+
+
+def duplicate_sources(db: Session, postings: Sequence[JobPosting]) -> Dict[int, List[Dict]]:
+    """Every copy of each posting's cluster, keyed by posting id: platform, role and link."""
+    clusters = {posting.cluster_id for posting in postings if posting.cluster_id is not None}
+    by_cluster: Dict[int, List[Dict]] = defaultdict(list)
+    if clusters:
+        copies = db.query(JobPosting.id, JobPosting.cluster_id, JobPosting.platform, JobPosting.role, JobPosting.url)\
+            .filter(JobPosting.cluster_id.in_(clusters), JobPosting.removed_at.is_(None))\
+            .order_by(JobPosting.id)\
+            .all()
+        for posting_id, cluster_id, platform, role, url in copies:
+            by_cluster[cluster_id].append({"id": posting_id, "platform": platform, "role": role, "url": url})
+    return {
+        posting.id: by_cluster.get(posting.cluster_id)
+        or [{"id": posting.id, "platform": posting.platform, "role": posting.role, "url": posting.url}]
+        for posting in postings
+    }
+
+
+def backfill_clusters(db: Session, batch_size: int = 500) -> int:
+    """Compute duplicate columns and clusters for postings ingested before they existed."""
+    processed = 0
+    last_id = 0
+    while True:
+        rows = db.query(JobPosting.id, JobPosting.company, JobPosting.title, JobPosting.location, JobPosting.description)\
+            .filter(JobPosting.cluster_id.is_(None), JobPosting.id > last_id)\
+            .order_by(JobPosting.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return processed
+        db.bulk_update_mappings(JobPosting, [
+            {"id": posting_id, **dedup_columns(company, title, location, description)}
+            for posting_id, company, title, location, description in rows
+        ])
+        db.commit()
+        cluster_postings(db, [row[0] for row in rows])
+        processed += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"Clustered {processed} postings")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job posting duplicate detection maintenance")
+    parser.add_argument("--backfill", action="store_true", help="Cluster postings that have no cluster yet")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    if args.backfill:
+        from app.db import SessionLocal
+
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            processed = backfill_clusters(db, args.batch_size)
+        logger.info(f"Done: {processed} postings in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,528 @@
+# app/ingest.py
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from sqlalchemy import func, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.dedup import cluster_postings, dedup_columns
+from app.jsonstream import aiter_json_documents
+from app.models.ingest_watermark import IngestWatermark
+from app.models.job_posting import JobPosting
+from app.models.posting_scope import PostingScope
+from app.ranking import posting_features
+from app.s3 import get_http_client, snapshot_object_url
+from app.versions import bump_versions, subscribers
+
+INGEST_BATCH_SIZE = 500
+# Length of the plain-text description teaser stored for job cards
+EXCERPT_LENGTH = 200
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_SYMBOLS = {"₹": "INR", "$": "USD", "€": "EUR", "£": "GBP"}
+# Spellings of a salary's pay period ("a month", "HOURLY", "yr"); values are app.ranking.PAY_PERIOD_FACTORS keys
+PAY_PERIODS = {
+    "hour": "hour", "hourly": "hour", "hr": "hour",
+    "day": "day", "daily": "day",
+    "week": "week", "weekly": "week", "wk": "week",
+    "month": "month", "monthly": "month", "mo": "month",
+    "year": "year", "yearly": "year", "yr": "year", "annual": "year", "annually": "year", "annum": "year",
+}
+
+_RELATIVE_AGE = re.compile(r"(\d+)\+?\s*(minute|hour|day|week|month|year)s?\s+ago", re.IGNORECASE)
+_AMOUNT = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([kK])?")
+_PAY_PERIOD = re.compile(r"\b(" + "|".join(sorted(PAY_PERIODS, key=len, reverse=True)) + r")s?\b", re.IGNORECASE)
+_TAGS = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+_REMOTE = re.compile(r"\b(remote|work from home|wfh)\b", re.IGNORECASE)
+_JUST_NOW = re.compile(r"\b(just|today|now)\b")
+_UNIT_DAYS = {"minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30, "year": 365}
+
+
+def parse_posted_at(value, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Parse ISO timestamps and relative ages such as "3 days ago" or "Just posted"."""
+    if not value or not isinstance(value, str):
+        return None
+    now = now or datetime.utcnow()
+    text = value.strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if parsed.tzinfo is not None:
+            parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+        return parsed
+    except ValueError:
+        pass
+    lowered = text.lower()
+    if _JUST_NOW.search(lowered):
+        return now
+    if "yesterday" in lowered:
+        return now - timedelta(days=1)
+    match = _RELATIVE_AGE.search(lowered)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        return now - timedelta(days=amount * _UNIT_DAYS[unit])
+    return None
+
+
+def parse_salary_text(text: Optional[str]) -> Tuple[Optional[float], Optional[float], Optional[str]]:
+    """Parse strings like "₹25,000 - ₹40,000 a month" into (min, max, currency)."""
+    if not text:
+        return None, None, None
+    currency = next((code for symbol, code in CURRENCY_SYMBOLS.items() if symbol in text), None)
+    amounts = []
+    for number, thousands in _AMOUNT.findall(text):
+        amount = float(number.replace(",", ""))
+        amounts.append(amount * 1000 if thousands else amount)
+    if not amounts:
+        return None, None, currency
+    return min(amounts), max(amounts), currency
+
+
+def parse_pay_period(value) -> Optional[str]:
+    """Normalize "a month", "per hour", "YEARLY" and the like to hour/day/week/month/year."""
+    if not value or not isinstance(value, str):
+        return None
+    match = _PAY_PERIOD.search(value)
+    return PAY_PERIODS[match.group(1).lower()] if match else None
+
+
+def posting_pay_period(platform: str, item: Dict) -> Optional[str]:
+    """The pay period ``normalize_posting`` reads from a raw record."""
+    if platform == "LinkedIn":
+        return parse_pay_period((item.get("base_salary") or {}).get("payment_period"))
+    if platform == "Glassdoor":
+        return parse_pay_period(item.get("pay_period"))
+    return parse_pay_period(item.get("salary_formatted"))
+
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """Drop query strings and fragments (tracking parameters) from a posting URL."""
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+
+def posting_hash(platform: str, url: Optional[str], title: str, company: Optional[str], location: Optional[str]) -> str:
+    key = canonical_url(url) or "|".join((title or "", company or "", location or "")).lower()
+    return hashlib.sha1(f"{platform}|{key}".encode("utf-8")).hexdigest()
+
+
+def strip_html(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return value
+    return _TAGS.sub(" ", value)
+
+
+def make_excerpt(description: Optional[str], length: int = EXCERPT_LENGTH) -> Optional[str]:
+    """First ``length`` characters of a description with whitespace collapsed, cut at a word boundary."""
+    if not description:
+        return None
+    text = _WHITESPACE.sub(" ", description).strip()
+    if len(text) <= length:
+        return text or None
+    cut = text[:length]
+    if " " in cut[length // 2:]:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip(" ,.;:-") + "…"
+
+
+def card_summary(item: Dict, description: Optional[str]) -> Dict:
+    """Columns a job card shows besides the normalized ones, taken from the raw record once at ingest."""
+    try:
+        rating = float(item["company_rating"]) if item.get("company_rating") is not None else None
+    except (TypeError, ValueError):
+        rating = None
+    return {
+        "excerpt": make_excerpt(description),
+        "employment_type": item.get("job_employment_type") or item.get("job_type"),
+        "company_logo": item.get("company_logo") or item.get("logo_url"),
+        "company_rating": rating,
+    }
+
+
+def normalize_posting(platform: str, role: str, snapshot_id: str, item: Dict, now: Optional[datetime] = None) -> Optional[Dict]:
+    """
+    Map one LinkedInJob / GlassdoorJob / IndeedJob record onto ``job_postings`` columns.
+
+    Returns None for records without a title (Bright Data includes error
+    records in the delivered file when ``include_errors=true``).
+    """
+    title = item.get("job_title")
+    if not title or item.get("error"):
+        return None
+
+    salary_min = salary_max = salary_currency = None
+    if platform == "LinkedIn":
+        location = item.get("job_location")
+        posted_at = parse_posted_at(item.get("job_posted_date"), now) or parse_posted_at(item.get("job_posted_time"), now)
+        base_salary = item.get("base_salary") or {}
+        salary_min = base_salary.get("min_amount")
+        salary_max = base_salary.get("max_amount")
+        salary_currency = base_salary.get("currency")
+        description = strip_html(item.get("job_description_formatted")) or item.get("job_summary")
+    elif platform == "Glassdoor":
+        location = item.get("job_location")
+        posted_at = parse_posted_at(item.get("job_posted_date"), now)
+        salary_min = salary_max = item.get("pay_median_glassdoor")
+        salary_currency = item.get("pay_range_currency")
+        description = item.get("job_overview")
+    else:
+        location = item.get("location")
+        posted_at = parse_posted_at(item.get("date_posted_parsed"), now) or parse_posted_at(item.get("date_posted"), now)
+        salary_min, salary_max, salary_currency = parse_salary_text(item.get("salary_formatted"))
+        description = item.get("description_text")
+
+    company = item.get("company_name")
+    url = item.get("url")
+    remote_text = " ".join(filter(None, (location, title, item.get("job_work_type"))))
+    is_remote = item.get("is_remote") is True or bool(_REMOTE.search(remote_text))
+    return {
+        "platform": platform,
+        "role": role,
+        "snapshot_id": snapshot_id,
+        "title": title,
+        "company": company,
+        "location": location,
+        "is_remote": is_remote,
+        "posted_at": posted_at or now or datetime.utcnow(),
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "salary_currency": salary_currency,
+        "salary_period": posting_pay_period(platform, item),
+        "url": url,
+        "dedup_hash": posting_hash(platform, url, title, company, location),
+        "description": description,
+        "raw": item,
+        **card_summary(item, description),
+        **posting_features(title, description),
+        **dedup_columns(company, title, location, description),
+    }
+
+
+def upsert_postings(db: Session, rows: List[Dict]) -> int:
+    """
+    Insert postings, refreshing existing (role, dedup_hash) rows in a single
+    statement, then cluster the new ones with their cross-platform duplicates.
+    """
+    if not rows:
+        return 0
+    # The same posting can appear twice in one file; keep the last copy.
+    rows = list({(row["role"], row["dedup_hash"]): row for row in rows}.values())
+    now = datetime.utcnow()
+    for row in rows:
+        row.setdefault("created_at", now)
+        row["updated_at"] = now
+
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(JobPosting.__table__).values(rows)
+    updated = {
+        column: stmt.excluded[column]
+        for column in rows[0]
+        if column not in ("role", "dedup_hash", "created_at")
+    }
+    # Relative ages ("2 days ago") only resolve once; keep the first parsed date.
+    updated["posted_at"] = func.coalesce(JobPosting.__table__.c.posted_at, stmt.excluded.posted_at)
+    stmt = stmt.on_conflict_do_update(index_elements=["role", "dedup_hash"], set_=updated)
+    db.execute(stmt)
+    db.commit()
+
+    keys = {(row["role"], row["dedup_hash"]) for row in rows}
+    unclustered = db.query(JobPosting.id, JobPosting.role, JobPosting.dedup_hash)\
+        .filter(
+            JobPosting.role.in_({role for role, _ in keys}),
+            JobPosting.dedup_hash.in_({dedup_hash for _, dedup_hash in keys}),
+            JobPosting.cluster_id.is_(None),
+        ).all()
+    cluster_postings(db, [posting_id for posting_id, role, dedup_hash in unclustered if (role, dedup_hash) in keys])
+    return len(rows)
+
+
+def scope_key(platform: str, role: str, location: Optional[str]) -> str:
+    """Identity of one (platform, role, location) search, case- and whitespace-insensitive."""
+    parts = [" ".join((part or "").casefold().split()) for part in (platform, role, location)]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def store_batch(db: Session, role: str, scope: str, rows: List[Dict], seen_at: datetime) -> int:
+    """
+    Insert the postings of ``rows`` that are not stored yet; for the others
+    only record that they were seen again (and revive them if they had been
+    tombstoned). Either way ``scope`` is recorded as delivering them. Returns
+    the number of new postings.
+    """
+    if not rows:
+        return 0
+    known = dict(
+        db.query(JobPosting.dedup_hash, JobPosting.id)
+        .filter(JobPosting.role == role, JobPosting.dedup_hash.in_({row["dedup_hash"] for row in rows}))
+        .all()
+    )
+    new_rows = [row for row in rows if row["dedup_hash"] not in known]
+    seen_ids = {known[row["dedup_hash"]] for row in rows if row["dedup_hash"] in known}
+    for row in new_rows:
+        row.update(last_seen_at=seen_at, removed_at=None)
+    if seen_ids:
+        snapshot_id = rows[0]["snapshot_id"]
+        db.query(JobPosting).filter(JobPosting.id.in_(seen_ids)).update(
+            {
+                JobPosting.snapshot_id: snapshot_id,
+                JobPosting.last_seen_at: seen_at,
+                JobPosting.removed_at: None,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    stored = upsert_postings(db, new_rows)
+    if new_rows:
+        seen_ids.update(
+            posting_id for posting_id, in db.query(JobPosting.id)
+            .filter(JobPosting.role == role, JobPosting.dedup_hash.in_({row["dedup_hash"] for row in new_rows}))
+        )
+    mark_in_scope(db, scope, seen_ids, seen_at)
+    return stored
+
+
+def mark_in_scope(db: Session, scope: str, posting_ids: Set[int], seen_at: datetime) -> None:
+    """Record that ``scope`` delivered these postings at ``seen_at``."""
+    if not posting_ids:
+        return
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(PostingScope.__table__).values([
+        {"posting_id": posting_id, "scope_key": scope, "last_seen_at": seen_at, "removed_at": None}
+        for posting_id in posting_ids
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["posting_id", "scope_key"],
+        set_={"last_seen_at": stmt.excluded.last_seen_at, "removed_at": None},
+    )
+    db.execute(stmt)
+    db.commit()
+
+
+def tombstone_missing(db: Session, scope: str, seen_at: datetime, window: Optional[timedelta]) -> int:
+    """
+    Drop postings that the latest snapshot of ``scope`` no longer delivered
+    from that scope, and mark the ones no other scope still delivers as
+    removed. Returns the number of postings removed.
+
+    For time-windowed searches ("Past 24 hours") only postings that should
+    still be inside the window count as gone; older ones simply aged out of
+    the search and are left alone.
+    """
+    query = db.query(PostingScope.posting_id).filter(
+        PostingScope.scope_key == scope,
+        PostingScope.last_seen_at < seen_at,
+        PostingScope.removed_at.is_(None),
+    )
+    if window is not None:
+        query = query.join(JobPosting, JobPosting.id == PostingScope.posting_id)\
+            .filter(JobPosting.posted_at >= seen_at - window)
+    gone = [posting_id for posting_id, in query.all()]
+    removed = 0
+    for start in range(0, len(gone), 1000):
+        chunk = gone[start:start + 1000]
+        db.query(PostingScope)\
+            .filter(PostingScope.scope_key == scope, PostingScope.posting_id.in_(chunk))\
+            .update({PostingScope.removed_at: seen_at}, synchronize_session=False)
+        live_elsewhere = db.query(PostingScope.posting_id).filter(
+            PostingScope.posting_id == JobPosting.id,
+            PostingScope.removed_at.is_(None),
+        ).exists()
+        removed += db.query(JobPosting)\
+            .filter(JobPosting.id.in_(chunk), JobPosting.removed_at.is_(None), ~live_elsewhere)\
+            .update({JobPosting.removed_at: seen_at}, synchronize_session=False)
+    db.commit()
+    return removed
+
+
+def update_watermark(
+    db: Session,
+    scope: str,
+    platform: str,
+    role: str,
+    location: Optional[str],
+    snapshot_id: str,
+    newest_posted_at: Optional[datetime],
+    stats: Dict,
+) -> None:
+    watermark = db.get(IngestWatermark, scope) or IngestWatermark(
+        scope_key=scope, platform=platform, role=role, location=location
+    )
+    watermark.last_snapshot_id = snapshot_id
+    if newest_posted_at and (watermark.last_posted_at is None or newest_posted_at > watermark.last_posted_at):
+        watermark.last_posted_at = newest_posted_at
+    watermark.last_ingested_at = datetime.utcnow()
+    watermark.postings_seen = stats["seen"]
+    watermark.postings_new = stats["new"]
+    watermark.postings_removed = stats["removed"]
+    db.merge(watermark)
+    # Listings of everyone subscribed to this platform/role may have changed.
+    bump_versions(db, subscribers(db, platform, role))
+    db.commit()
+
+
+def bump_scope_versions(db: Session, platform: str, role: str) -> None:
+    """Bump the versions of everyone subscribed to this platform/role."""
+    bump_versions(db, subscribers(db, platform, role))
+    db.commit()
+
+
+async def ingest_snapshot(
+    db: Session,
+    snapshot_id: str,
+    platform: str,
+    role: str,
+    url: Optional[str] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+    location: Optional[str] = None,
+    window: Optional[timedelta] = None,
+) -> Dict:
+    """
+    Stream a delivered snapshot file from S3 into ``job_postings``, incrementally.
+
+    The file is parsed element by element and handled in batches, so memory
+    stays bounded by ``batch_size`` postings regardless of the file size.
+    Only postings not stored before are written in full; known ones just get
+    ``last_seen_at`` bumped. Once the whole file has been read, postings of
+    the same (platform, role, location) scope that were not delivered again
+    leave the scope, restricted to ``window`` for time-windowed searches;
+    those no other scope delivers are tombstoned (``removed_at``). Then the
+    scope's watermark is updated.
+
+    Returns counts: ``seen``, ``new`` and ``removed`` postings. If ingestion
+    fails after batches were stored, the subscribers' versions are still
+    bumped, since those batches are committed.
+    """
+    url = url or snapshot_object_url(platform, role, snapshot_id)
+    scope = scope_key(platform, role, location)
+    client = get_http_client()
+    now = datetime.utcnow()
+    stats = {"seen": 0, "new": 0, "removed": 0}
+    newest_posted_at = None
+    batch = []
+    stored = False
+    try:
+        async with client.stream("GET", url) as response:
+            response.raise_for_status()
+            async for item in aiter_json_documents(response.aiter_bytes()):
+                if not isinstance(item, dict):
+                    continue
+                row = normalize_posting(platform, role, snapshot_id, item, now)
+                if row is None:
+                    continue
+                stats["seen"] += 1
+                if newest_posted_at is None or row["posted_at"] > newest_posted_at:
+                    newest_posted_at = row["posted_at"]
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    stored = True
+                    stats["new"] += await asyncio.to_thread(store_batch, db, role, scope, batch, now)
+                    batch = []
+        stored = stored or bool(batch)
+        stats["new"] += await asyncio.to_thread(store_batch, db, role, scope, batch, now)
+        # An empty delivery is more likely a failed collection than every posting disappearing.
+        if stats["seen"]:
+            stats["removed"] = await asyncio.to_thread(tombstone_missing, db, scope, now, window)
+        await asyncio.to_thread(
+            update_watermark, db, scope, platform, role, location, snapshot_id, newest_posted_at, stats
+        )
+    except Exception:
+        # Hand the failed transaction's connection back before waiting for a thread: with every
+        # executor thread waiting on a full pool, holding it across the await would deadlock.
+        db.rollback()
+        # update_watermark never ran; listings changed by the committed batches must not be answered with 304.
+        if stored:
+            try:
+                await asyncio.to_thread(bump_scope_versions, db, platform, role)
+            except Exception as e:
+                logger.error(f"Could not bump versions after failed ingest of snapshot {snapshot_id}: {str(e)}")
+        raise
+    logger.info(
+        f"Ingested snapshot {snapshot_id} ({platform}, {role}, {location}): {stats['seen']} postings, "
+        f"{stats['new']} new, {stats['removed']} removed"
+    )
+    return stats
+
+
+def backfill_card_summaries(db: Session, batch_size: int = 500) -> int:
+    """Compute card columns for postings ingested before they existed."""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.query(JobPosting.id, JobPosting.raw, JobPosting.description)\
+            .filter(JobPosting.excerpt.is_(None), JobPosting.description.isnot(None), JobPosting.id > last_id)\
+            .order_by(JobPosting.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return updated
+        db.bulk_update_mappings(JobPosting, [
+            {"id": posting_id, **card_summary(raw if isinstance(raw, dict) else {}, description)}
+            for posting_id, raw, description in rows
+        ])
+        db.commit()
+        updated += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"Backfilled card summaries for {updated} postings")
+
+
+def backfill_salary_periods(db: Session, batch_size: int = 500) -> int:
+    """Read the pay period of salaried postings ingested before the column existed."""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.query(JobPosting.id, JobPosting.platform, JobPosting.raw)\
+            .filter(
+                JobPosting.salary_period.is_(None),
+                or_(JobPosting.salary_min.isnot(None), JobPosting.salary_max.isnot(None)),
+                JobPosting.id > last_id,
+            )\
+            .order_by(JobPosting.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return updated
+        periods = [
+            {"id": posting_id, "salary_period": posting_pay_period(platform, raw if isinstance(raw, dict) else {})}
+            for posting_id, platform, raw in rows
+        ]
+        # Postings whose source never said stay None (yearly) and are simply rescanned next time.
+        db.bulk_update_mappings(JobPosting, [row for row in periods if row["salary_period"]])
+        db.commit()
+        updated += sum(1 for row in periods if row["salary_period"])
+        last_id = rows[-1][0]
+        logger.info(f"Backfilled salary periods for {updated} postings")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job posting ingestion maintenance")
+    parser.add_argument("--backfill", action="store_true", help="Compute missing card columns and salary periods")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    if args.backfill:
+        from app.db import SessionLocal
+
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            updated = backfill_card_summaries(db, args.batch_size)
+            updated += backfill_salary_periods(db, args.batch_size)
+        logger.info(f"Done: {updated} postings in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# app/jsonstream.py
+import codecs
+import json
+from typing import AsyncIterator, Iterable, Iterator, List
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class JSONDocumentStream:
+    """
+    Incremental parser for snapshot files.
+
+    Accepts either a top-level JSON array (``[{...}, {...}]``) or a sequence of
+    whitespace/newline separated values (NDJSON) and yields one element at a
+    time, so only the element being parsed is held in memory.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._mode = None  # "array" or "sequence" once the first value starts
+        self._done = False
+        # Buffer length needed before a failed decode is retried; doubling it
+        # keeps re-scanning of a partially received element linear overall.
+        self._retry_at = 0
+
+    def feed(self, chunk: bytes) -> List:
+        self._buf += self._text.decode(chunk)
+        return self._drain(eof=False)
+
+    def close(self) -> List:
+        self._buf += self._text.decode(b"", final=True)
+        items = self._drain(eof=True)
+        if not self._done and self._mode == "array":
+            raise ValueError("Unterminated JSON array")
+        rest = self._buf[self._pos:].strip(_WHITESPACE)
+        if rest:
+            raise ValueError(f"Trailing data after JSON documents: {rest[:40]!r}")
+        return items
+
+    def _skip(self, chars: str) -> None:
+        while self._pos < len(self._buf) and self._buf[self._pos] in chars:
+            self._pos += 1
+
+    def _drain(self, eof: bool) -> List:
+        items = []
+        if not eof and len(self._buf) < self._retry_at:
+            return items
+        while not self._done:
+            if self._mode is None:
+                self._skip(_WHITESPACE)
+                if self._pos >= len(self._buf):
+                    break
+                if self._buf[self._pos] == "[":
+                    self._mode = "array"
+                    self._pos += 1
+                else:
+                    self._mode = "sequence"
+            self._skip(_WHITESPACE + ("," if self._mode == "array" else ""))
+            if self._pos >= len(self._buf):
+                break
+            if self._mode == "array" and self._buf[self._pos] == "]":
+                self._pos += 1
+                self._done = True
+                break
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                self._retry_at = 2 * len(self._buf)
+                break
+            if end == len(self._buf) and not eof and not isinstance(value, (dict, list)):
+                # A scalar touching the end of the buffer may still be growing.
+                break
+            items.append(value)
+            self._pos = end
+        # Drop consumed text so the buffer only holds the current element.
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._retry_at = max(0, self._retry_at - self._pos)
+            self._pos = 0
+        return items
+
+
+def iter_json_documents(chunks: Iterable[bytes]) -> Iterator:
+    stream = JSONDocumentStream()
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
+
+
+async def aiter_json_documents(chunks: AsyncIterator[bytes]) -> AsyncIterator:
+    stream = JSONDocumentStream()
+    async for chunk in chunks:
+        for item in stream.feed(chunk):
+            yield item
+    for item in stream.close():
+        yield item
@@ -0,0 +1,78 @@
+# app/listing.py
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Query, Session
+
+from app.models.job_posting import JobPosting
+from app.schemas.job_posting import SUMMARY_FIELDS
+
+# The posting id is always returned; scores, sources and snippets are keyed on it.
+REQUIRED_FIELDS = ("id",)
+# Carried once by the enclosing snapshot item instead of by every posting
+SNAPSHOT_FIELDS = ("platform", "role", "snapshot_id")
+
+
+def field_list(value: Optional[str]) -> Optional[set]:
+    """Parse a comma-separated ``fields=`` / ``exclude=`` parameter; None when absent."""
+    return {field.strip() for field in value.split(",") if field.strip()} if value else None
+
+
+def project(item: Dict, fields: Optional[set], exclude: Optional[set]) -> Dict:
+    """Keep only ``fields`` (when given) and drop ``exclude`` from a posting's top-level keys."""
+    if fields is not None:
+        item = {key: value for key, value in item.items() if key in fields}
+    if exclude:
+        item = {key: value for key, value in item.items() if key not in exclude}
+    return item
+
+
+def summary_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """
+    Summary fields selected by a ``fields=`` parameter, in schema order.
+
+    Raises ValueError naming the unknown fields, since anything outside the
+    summary (the description, the raw record) is only served by the detail
+    endpoint.
+    """
+    requested = field_list(fields)
+    if requested is None:
+        return SUMMARY_FIELDS
+    unknown = requested - set(SUMMARY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(field for field in SUMMARY_FIELDS if field in requested or field in REQUIRED_FIELDS)
+
+
+def summary_records(postings: Iterable[JobPosting], fields: Sequence[str] = SUMMARY_FIELDS) -> List[Dict]:
+    """
+    Plain dicts of the summary columns of loaded postings.
+
+    Reads the attributes directly instead of going through
+    ``JobPostingSummary.model_validate``; the columns already have the
+    schema's types.
+    """
+    return [{field: getattr(posting, field) for field in fields} for posting in postings]
+
+
+def summaries_by_snapshot(
+    db: Session, snapshot_ids: Sequence[str], fields: Sequence[str] = SUMMARY_FIELDS
+) -> Dict[str, List[Dict]]:
+    """
+    Live postings of each snapshot as summary records, newest first.
+
+    A posting belongs to the latest snapshot that delivered it, so postings a
+    newer snapshot delivered again are listed under that one only. Only the
+    selected columns are read; the description and raw record never leave
+    the database. ``SNAPSHOT_FIELDS`` are left out of the records since the
+    snapshot item already has them.
+    """
+    fields = [field for field in fields if field not in SNAPSHOT_FIELDS]
+    columns = [getattr(JobPosting, field) for field in fields]
+    query: Query = db.query(JobPosting.snapshot_id, *columns)\
+        .filter(JobPosting.snapshot_id.in_(snapshot_ids), JobPosting.removed_at.is_(None))\
+        .order_by(JobPosting.posted_at.desc(), JobPosting.id.desc())
+    grouped: Dict[str, List[Dict]] = defaultdict(list)
+    for snapshot_id, *values in query.all():
+        grouped[snapshot_id].append(dict(zip(fields, values)))
+    return grouped
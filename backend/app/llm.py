@@ -0,0 +1,100 @@
+# app/llm.py
+import asyncio
+import logging
+import os
+import random
+from typing import Dict, List, Optional
+
+import httpx
+import openai
+from openai import AsyncOpenAI
+
+# Any OpenAI-compatible endpoint; load tests point this at a local fake server.
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+# Completions in flight at once (per process); further callers wait for a slot.
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "16"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "20"))
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[AsyncOpenAI] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """Return the process-wide async client; its connection pool is shared by every router."""
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=LLM_BASE_URL,
+            timeout=LLM_TIMEOUT,
+            # Retries are done in chat_completion so they do not hold a concurrency slot.
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=LLM_CONCURRENCY * 2,
+                    max_keepalive_connections=LLM_CONCURRENCY,
+                ),
+                timeout=httpx.Timeout(LLM_TIMEOUT),
+            ),
+        )
+    return _client
+
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+    return _semaphore
+
+
+async def close_llm_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def retry_delay(attempt: int, error: Optional[Exception] = None) -> float:
+    """Server-provided Retry-After when present, otherwise capped exponential backoff with full jitter."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+async def chat_completion(messages: List[Dict], model: str = "gpt-4o", **kwargs) -> str:
+    """
+    Run a chat completion and return the reply text.
+
+    Rate limits, server errors, timeouts and connection failures are retried
+    up to ``LLM_MAX_RETRIES`` times; other errors are raised immediately.
+    """
+    client = get_llm_client()
+    for attempt in range(LLM_MAX_RETRIES + 1):
+        try:
+            async with get_llm_semaphore():
+                completion = await client.chat.completions.create(model=model, messages=messages, **kwargs)
+            return completion.choices[0].message.content
+        except Exception as e:
+            if attempt == LLM_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = retry_delay(attempt, e)
+            logger.warning(f"LLM call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
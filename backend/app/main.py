@@ -1,20 +1,41 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
-from app.routers import users, ai, snapshot
+from fastapi import FastAPI, Depends, HTTPException, Request, UploadFile, File
+from app.routers import users, ai, snapshot, jobs, admin
 from fastapi.background import BackgroundTasks
-from app.tasks import process_job_roles
+from app.tasks import enqueue_scrape_job, job_status
+from app.models.scrape_job import ScrapeJob
 from fastapi import Depends
-from app.db import get_db
-from app.routers.snapshot import SnapshotManager
+from app.db import get_db, SessionLocal
 from sqlalchemy.orm import Session
 from typing import List, Dict
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 import json
-# import openai
-from openai import OpenAI
-import pdfplumber
+import asyncio
+import hashlib
+import logging
 import os
 from app.models.user import UserRecommendations
+from app.s3 import close_http_client
+from app.brightdata import close_brightdata_client
+from app.search import ensure_sqlite_fts
+from app.resume import (
+    RESUME_MAX_BYTES,
+    RESUME_MODEL,
+    RESUME_PROMPT_VERSION,
+    RESUME_SYSTEM_PROMPT,
+    ResumeRejected,
+    extract_resume_text,
+    shutdown_extract_pool,
+)
+from app.resume_cache import resume_cache
+from app.llm import chat_completion, close_llm_client
+from app.scheduler import SCHEDULER_ENABLED, shutdown_scheduler, start_scheduler
+from app.db import engine
+from app.compression import CompressionMiddleware
+from app.responses import PRIVATE_REVALIDATE, json_response, not_modified, not_modified_response
+from app.versions import user_etag
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Job Role Recommendation System",
@@ -29,14 +50,29 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-client = OpenAI(
-    api_key=os.getenv("OPENAI_API_KEY")
-)
+# Negotiated gzip / brotli / zstd for responses above COMPRESSION_MIN_BYTES
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(ai.router, prefix="/ai", tags=["AI"])
 app.include_router(snapshot.router, prefix="/snapshots", tags=["Snapshots"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+
+@app.on_event("startup")
+async def startup():
+    # Local SQLite runs get an FTS5 index; Postgres uses the migrated GIN index.
+    ensure_sqlite_fts(engine)
+    if SCHEDULER_ENABLED:
+        start_scheduler()
+
+@app.on_event("shutdown")
+async def shutdown():
+    shutdown_scheduler()
+    await close_http_client()
+    await close_brightdata_client()
+    shutdown_extract_pool()
+    await close_llm_client()
 
 # Root endpoint
 @app.get("/")
@@ -53,51 +89,66 @@ class JobRequest(BaseModel):
     additional_details: Dict
     user_id: str
 
-@app.post("/process-jobs")
-async def process_jobs(request: JobRequest, db: Session = Depends(get_db)):
-    manager = SnapshotManager(db)
-    results = await manager.process_job_roles(
+@app.post("/process-jobs", status_code=202)
+def process_jobs(request: JobRequest, db: Session = Depends(get_db)):
+    """Queue a scrape for the given roles; run by app.worker. Poll GET /process-jobs/{job_id}."""
+    job = enqueue_scrape_job(
+        db,
+        user_id=request.user_id,
         roles=request.roles,
         location=request.location,
-        additional_details=request.additional_details,
-        user_id=request.user_id
+        additional_details=request.additional_details
     )
-    return {"results": results}
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/process-jobs/{job_id}")
+def get_process_job(job_id: str, db: Session = Depends(get_db)):
+    job = db.query(ScrapeJob).filter(ScrapeJob.id == job_id).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
+
+def _with_session(fn, *args):
+    # Short-lived session: no connection is held while the completion runs.
+    with SessionLocal() as db:
+        return fn(db, *args)
 
 @app.post("/resume/upload")
 async def upload_resume(file: UploadFile = File(...), userId: str = None):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
+    data = await file.read(RESUME_MAX_BYTES + 1)
+    if len(data) > RESUME_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Resume must be at most {RESUME_MAX_BYTES} bytes")
+
+    # Re-uploads of the same file are served from the parse cache.
+    content_hash = hashlib.sha256(data).hexdigest()
+    cached = await asyncio.to_thread(_with_session, resume_cache.get, content_hash, RESUME_PROMPT_VERSION)
+    if cached and cached["result"] is not None:
+        return cached["result"]
+
+    if cached:
+        content = cached["text"]
+    else:
+        try:
+            content = await extract_resume_text(data)
+        except ResumeRejected as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if not content.strip():
+        raise HTTPException(status_code=422, detail="No text could be extracted from the PDF")
+
     try:
-        # Read PDF content
-        content = ""
-        with pdfplumber.open(file.file) as pdf:
-            for page in pdf.pages:
-                content += page.extract_text()
-
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": """You must respond with only a valid JSON object, no markdown, no code blocks. Extract these fields from the resume:
-                    - current_title: string
-                    - current_industry: string
-                    - experience_years: number
-                    - education: array of strings
-                    - skills: array of strings
-                    - certifications: array of strings (if present)
-                    - location: string
-                    - phone: string
-                    - linkedin: string (if present)
-                    - preferred_job_titles: array of strings (determined by you)
-                    - preferred_industries: array of strings (determined by you)
-                    Only include information explicitly found in the resume."""},
+        reply = await chat_completion(
+            [
+                {"role": "system", "content": RESUME_SYSTEM_PROMPT},
                 {"role": "user", "content": content}
-            ]
+            ],
+            model=RESUME_MODEL
         )
         
         # Get just the content string and parse it directly
-        extracted_data = json.loads(response.choices[0].message.content)
+        extracted_data = json.loads(reply)
         
         # Ensure all expected fields exist, even if empty
         default_fields = {
@@ -114,20 +165,29 @@ async def upload_resume(file: UploadFile = File(...), userId: str = None):
         
         # Merge extracted data with defaults
         complete_data = {**default_fields, **extracted_data}
-        
+
+        await asyncio.to_thread(_with_session, resume_cache.put, content_hash, content, complete_data, RESUME_PROMPT_VERSION)
         return complete_data
 
     except json.JSONDecodeError as e:
-        print("JSON parsing error:", e)
-        print("Raw response:", response.choices[0].message.content)
+        # The reply holds the resume's personal data: only its size is logged above debug.
+        logger.error(f"Resume parse reply is not valid JSON ({len(reply)} chars): {str(e)}")
+        logger.debug(f"Unparseable resume reply: {reply}")
+        # Keep the extracted text so a retry only redoes the completion.
+        await asyncio.to_thread(_with_session, resume_cache.put, content_hash, content, None, RESUME_PROMPT_VERSION)
         raise HTTPException(status_code=500, detail="Failed to parse resume data")
     except Exception as e:
-        print("Error processing resume:", str(e))
+        logger.error(f"Error processing resume: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
-    
+
 @app.get("/roles/{user_id}")
-async def get_user_roles(user_id: str, db: Session = Depends(get_db)):
+def get_user_roles(user_id: str, request: Request, db: Session = Depends(get_db)):
+    # Unchanged since the client's copy: answered from the version counter alone.
+    etag = user_etag(db, "roles", user_id)
+    headers = {"Cache-Control": PRIVATE_REVALIDATE}
+    if not_modified(request, etag):
+        return not_modified_response(etag, headers)
     # load the user recommendations model
     user_recommendations = db.query(UserRecommendations).filter(UserRecommendations.user_id == user_id).first()
     if user_recommendations:
-        return user_recommendations.recommendations
\ No newline at end of file
+        return json_response(request, list(user_recommendations.recommendations), etag=etag, headers=headers)
\ No newline at end of file
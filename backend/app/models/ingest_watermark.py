@@ -0,0 +1,21 @@
+# app/models/ingest_watermark.py
+from sqlalchemy import Column, String, Integer, DateTime
+from app.db import Base
+
+class IngestWatermark(Base):
+    """Incremental ingestion state of one (platform, role, location) scope."""
+    __tablename__ = "ingest_watermarks"
+
+    # app.ingest.scope_key(platform, role, location)
+    scope_key = Column(String(64), primary_key=True)
+    platform = Column(String, nullable=False)
+    role = Column(String, nullable=False)
+    location = Column(String, nullable=True)
+    last_snapshot_id = Column(String, nullable=True)
+    # Newest posted_at delivered for this scope so far
+    last_posted_at = Column(DateTime, nullable=True)
+    last_ingested_at = Column(DateTime, nullable=True)
+    # Counts from the last ingested snapshot
+    postings_seen = Column(Integer, nullable=False, default=0)
+    postings_new = Column(Integer, nullable=False, default=0)
+    postings_removed = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,67 @@
+# app/models/job_posting.py
+from sqlalchemy import Column, String, Integer, SmallInteger, Float, Boolean, Text, JSON, DateTime, LargeBinary, Index, UniqueConstraint
+from sqlalchemy.orm import deferred
+from app.db import Base
+from datetime import datetime
+
+class JobPosting(Base):
+    """One posting from a delivered snapshot, normalized across LinkedIn, Glassdoor and Indeed."""
+    __tablename__ = "job_postings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    platform = Column(String, nullable=False)
+    role = Column(String, nullable=False)
+    # Most recent snapshot the posting was delivered in
+    snapshot_id = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    company = Column(String, nullable=True)
+    location = Column(String, nullable=True)
+    is_remote = Column(Boolean, nullable=False, default=False)
+    # Falls back to the time the posting was first ingested when the source has no date
+    posted_at = Column(DateTime, nullable=False)
+    salary_min = Column(Float, nullable=True)
+    salary_max = Column(Float, nullable=True)
+    salary_currency = Column(String, nullable=True)
+    # hour/day/week/month/year the amounts are quoted per; None when the source does not say
+    salary_period = Column(String(8), nullable=True)
+    url = Column(String, nullable=True)
+    # Card fields precomputed at ingest (app.ingest.card_summary), so listings
+    # never need the description or the raw record
+    excerpt = Column(String(300), nullable=True)
+    employment_type = Column(String, nullable=True)
+    company_logo = Column(String, nullable=True)
+    company_rating = Column(Float, nullable=True)
+    # sha1 of platform + canonical url (or title/company/location when there is no url)
+    dedup_hash = Column(String(40), nullable=False)
+    # Large fields are only loaded when a posting is opened
+    description = deferred(Column(Text, nullable=True))
+    raw = deferred(Column(JSON, nullable=True))
+    # Ranking inputs precomputed at ingest (app.ranking.posting_features)
+    title_features = deferred(Column(LargeBinary, nullable=True))
+    skill_features = deferred(Column(LargeBinary, nullable=True))
+    seniority = Column(SmallInteger, nullable=True)
+    min_experience_years = Column(Float, nullable=True)
+    # Cross-platform duplicates (app.dedup): sha1 of normalized company/title/city,
+    # MinHash of the description, and the id of the cluster's canonical (first) posting
+    dedup_key = Column(String(40), nullable=True)
+    minhash = deferred(Column(LargeBinary, nullable=True))
+    cluster_id = Column(Integer, nullable=True)
+    # Incremental ingestion (app.ingest): when any scope last delivered the posting,
+    # and when the last scope stopped delivering it (per-scope membership is app.models.posting_scope)
+    last_seen_at = Column(DateTime, nullable=True)
+    removed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("role", "dedup_hash", name="uq_job_postings_role_dedup_hash"),
+        # Keyset pagination orders by (posted_at, id); each filter has a matching prefix.
+        Index("ix_job_postings_posted_at_id", "posted_at", "id"),
+        Index("ix_job_postings_platform_role_posted_at_id", "platform", "role", "posted_at", "id"),
+        Index("ix_job_postings_role_posted_at_id", "role", "posted_at", "id"),
+        Index("ix_job_postings_snapshot_id", "snapshot_id"),
+        Index("ix_job_postings_company", "company"),
+        Index("ix_job_postings_dedup_key", "dedup_key"),
+        # Duplicate collapsing looks for an earlier member of the same cluster.
+        Index("ix_job_postings_cluster_id_id", "cluster_id", "id"),
+    )
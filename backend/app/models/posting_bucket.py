@@ -0,0 +1,14 @@
+# app/models/posting_bucket.py
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, Index
+from app.db import Base
+
+class PostingBucket(Base):
+    """One LSH band of a posting's description MinHash (see app.dedup)."""
+    __tablename__ = "posting_lsh_buckets"
+
+    band = Column(BigInteger, primary_key=True)
+    posting_id = Column(Integer, ForeignKey("job_postings.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_posting_lsh_buckets_posting_id", "posting_id"),
+    )
@@ -0,0 +1,20 @@
+# app/models/posting_scope.py
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index
+from app.db import Base
+
+class PostingScope(Base):
+    """
+    A posting's membership in one (platform, role, location) search scope
+    (app.ingest.scope_key): when that scope last delivered it, and when it
+    stopped. A posting is removed once no scope delivers it any more.
+    """
+    __tablename__ = "posting_scopes"
+
+    posting_id = Column(Integer, ForeignKey("job_postings.id", ondelete="CASCADE"), primary_key=True)
+    scope_key = Column(String(64), primary_key=True)
+    last_seen_at = Column(DateTime, nullable=False)
+    removed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_posting_scopes_scope_key_last_seen_at", "scope_key", "last_seen_at"),
+    )
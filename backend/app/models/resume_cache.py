@@ -0,0 +1,21 @@
+# app/models/resume_cache.py
+from sqlalchemy import Column, String, Integer, Text, JSON, DateTime, Index
+from app.db import Base
+from datetime import datetime
+
+class ResumeCacheEntry(Base):
+    """Extracted text and structured result of a resume upload, keyed by the SHA-256 of the file."""
+    __tablename__ = "resume_parse_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    text = Column(Text, nullable=False)
+    # Structured result from the LLM and the prompt version that produced it.
+    result = Column(JSON, nullable=True)
+    prompt_version = Column(String(16), nullable=True)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_resume_parse_cache_last_used_at", "last_used_at"),
+    )
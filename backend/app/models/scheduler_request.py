@@ -0,0 +1,15 @@
+# app/models/scheduler_request.py
+from sqlalchemy import Column, String, Integer, JSON, DateTime
+from app.db import Base
+from datetime import datetime
+
+class SchedulerRequest(Base):
+    """An on-demand planning pass, queued by POST /admin/scheduler/run and run by the scheduler process."""
+    __tablename__ = "scheduler_requests"
+
+    id = Column(Integer, primary_key=True)
+    requested_by = Column(String, nullable=True)
+    requested_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True, index=True)
+    # Summary of the plan it ran: pairs in demand, enqueued and deferred entries
+    result = Column(JSON, nullable=True)
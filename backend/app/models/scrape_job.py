@@ -0,0 +1,31 @@
+# app/models/scrape_job.py
+import uuid
+from sqlalchemy import Column, String, Integer, Text, JSON, DateTime, Index
+from app.db import Base
+from datetime import datetime
+
+class ScrapeJob(Base):
+    """A queued /process-jobs request, claimed and run by app.worker."""
+    __tablename__ = "scrape_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, nullable=False)
+    roles = Column(JSON, nullable=False)
+    location = Column(String, nullable=False)
+    additional_details = Column(JSON, nullable=True)
+    # queued -> running -> completed | failed (running jobs whose lease expired are re-queued)
+    status = Column(String, nullable=False, default="queued")
+    # {role: {platform: {"status": ..., ...}}}, updated as each platform finishes
+    progress = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_scrape_jobs_status_created_at", "status", "created_at"),
+        Index("ix_scrape_jobs_user_id", "user_id"),
+    )
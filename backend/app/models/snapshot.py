@@ -1,9 +1,23 @@
 # app/models.py
-from sqlalchemy import Column, String, Integer, JSON, DateTime
+from sqlalchemy import Column, String, Integer, JSON, DateTime, Index, UniqueConstraint
 from app.db import Base
+from app.brightdata import payload_fingerprint
 from datetime import datetime
 
+
+def _payload_hash_default(context):
+    params = context.get_current_parameters()
+    if params.get("payload") is None:
+        return None
+    return payload_fingerprint(params["platform"], params["payload"])
+
+
 class Snapshot(Base):
+    """
+    Catalog of collected Bright Data snapshots, one row per snapshot.
+
+    Users are linked to snapshots through ``user_snapshots``.
+    """
     __tablename__ = "snapshots"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -11,5 +25,12 @@ class Snapshot(Base):
     platform = Column(String, nullable=False)
     snapshot_id = Column(String, nullable=False)
     payload = Column(JSON, nullable=True)
+    # payload_fingerprint(platform, payload); the reuse lookup key.
+    payload_hash = Column(String(64), nullable=True, default=_payload_hash_default)
     created_at = Column(DateTime, default=datetime.utcnow)
-    user_id = Column(String, nullable=True, default="1")
+
+    __table_args__ = (
+        UniqueConstraint("snapshot_id", name="uq_snapshots_snapshot_id"),
+        Index("ix_snapshots_role_platform", "role", "platform"),
+        Index("ix_snapshots_platform_payload_hash_created_at", "platform", "payload_hash", "created_at"),
+    )
@@ -0,0 +1,13 @@
+# app/models/trigger_request.py
+from sqlalchemy import Column, String, Integer, DateTime
+from app.db import Base
+from datetime import datetime
+
+class TriggerRequest(Base):
+    """One served role/platform request and how it was satisfied: triggered, reused or coalesced."""
+    __tablename__ = "trigger_requests"
+
+    id = Column(Integer, primary_key=True)
+    platform = Column(String, nullable=False)
+    outcome = Column(String(16), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ARRAY
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, ARRAY, DateTime, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from pydantic import BaseModel
 from typing import Optional
@@ -25,6 +25,8 @@ class UserProfile(Base):
     preferred_job_titles = Column(Text, nullable=True)
     preferred_industries = Column(Text, nullable=True)
     salary_expectations = Column(Float, nullable=True)
+    # ISO code of salary_expectations; postings paid in another currency get a neutral salary fit
+    salary_currency = Column(String, nullable=True)
     relocation_willingness = Column(Boolean, default=False)
     linkedin = Column(String, nullable=True)
     portfolio = Column(String, nullable=True)
@@ -38,6 +40,13 @@ class UserRecommendations(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String, nullable=False)  # Assume user_id is a string
     recommendations = Column(ARRAY(String), nullable=False)  
+    # app.recommendations.profile_fingerprint of the profile these were generated from.
+    profile_fingerprint = Column(String(64), nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_user_recommendations_user_id"),
+    )
     
 class UserCreate(BaseModel):
     email: str
@@ -66,6 +75,7 @@ class UserProfileUpdate(BaseModel):
     preferred_job_titles: Optional[str] = None
     preferred_industries: Optional[str] = None
     salary_expectations: Optional[float] = None
+    salary_currency: Optional[str] = None
     relocation_willingness: Optional[bool] = None
     linkedin: Optional[str] = None
     portfolio: Optional[str] = None
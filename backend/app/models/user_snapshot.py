@@ -0,0 +1,19 @@
+# app/models/user_snapshot.py
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Index, UniqueConstraint
+from app.db import Base
+from datetime import datetime
+
+class UserSnapshot(Base):
+    """A user's subscription to a catalog snapshot."""
+    __tablename__ = "user_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(String, nullable=False)
+    snapshot_fk = Column(Integer, ForeignKey("snapshots.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Also serves per-user listing: user_id -> snapshot_fk without touching the table.
+        UniqueConstraint("user_id", "snapshot_fk", name="uq_user_snapshots_user_id_snapshot_fk"),
+        Index("ix_user_snapshots_snapshot_fk", "snapshot_fk"),
+    )
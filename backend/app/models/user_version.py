@@ -0,0 +1,12 @@
+# app/models/user_version.py
+from sqlalchemy import Column, String, Integer, DateTime
+from app.db import Base
+from datetime import datetime
+
+class UserVersion(Base):
+    """Change counter of a user's recommendations and subscribed snapshots (app.versions)."""
+    __tablename__ = "user_versions"
+
+    user_id = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,337 @@
+# app/ranking.py
+"""
+Relevance ranking of job postings against a user profile.
+
+Each posting's text is reduced at ingest time to sorted, de-duplicated
+16-bit feature hashes (title words; title and description words and word
+bigrams) plus a seniority level and the years of experience it asks for.
+Ranking loads those columns for the candidate postings into flat NumPy
+arrays and scores all of them at once: skill overlap, title match,
+seniority fit, salary fit and recency decay, combined with
+``RANKING_WEIGHTS``.
+
+Postings ingested before the feature columns existed can be filled in with
+
+    python -m app.ranking --backfill
+"""
+import argparse
+import logging
+import os
+import re
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Query, Session
+
+from app.models.job_posting import JobPosting
+from app.models.user import UserProfile
+from app.role_matcher import tokenize
+
+RANKING_RECENCY_HALF_LIFE_DAYS = float(os.getenv("RANKING_RECENCY_HALF_LIFE_DAYS", "7"))
+RANKING_WEIGHTS = {
+    "skills": 0.4,
+    "title": 0.2,
+    "seniority": 0.15,
+    "salary": 0.1,
+    "recency": 0.15,
+}
+# Profiles without a salary currency of their own are compared in this one; empty compares every posting.
+RANKING_SALARY_CURRENCY = os.getenv("RANKING_SALARY_CURRENCY", "")
+# Multipliers from a posting's pay period (app.ingest.PAY_PERIODS) to a yearly amount; no period means yearly.
+PAY_PERIOD_FACTORS = {"hour": 2080, "day": 260, "week": 52, "month": 12, "year": 1}
+# Long descriptions are mostly boilerplate after this point.
+MAX_DESCRIPTION_WORDS = 1500
+
+FEATURE_BUCKETS = 1 << 16
+FEATURE_DTYPE = np.dtype("<u2")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the this to we will with you your "
+    "who what which their they them us all any can may must should would about into over more other such".split()
+)
+
+# Checked in order; titles matching none of them are treated as mid-level (1).
+SENIORITY_PATTERNS = (
+    (4, re.compile(r"\b(director|head of|vp|vice president|chief|cto|ceo)\b", re.IGNORECASE)),
+    (3, re.compile(r"\b(lead|staff|principal|architect)\b", re.IGNORECASE)),
+    (2, re.compile(r"\b(senior|sr)\b|\b(ii|iii)\b", re.IGNORECASE)),
+    (0, re.compile(r"\b(intern|internship|trainee|graduate|fresher|entry[ -]level|junior|jr)\b", re.IGNORECASE)),
+)
+# Upper bounds (exclusive) of experience years for levels 0-3; above the last is level 4.
+SENIORITY_YEARS = (1, 4, 8, 12)
+
+_MIN_EXPERIENCE = re.compile(r"(\d{1,2})\s*(?:\+|(?:-|to)\s*\d{1,2})?\s*\+?\s*(?:years?|yrs?)", re.IGNORECASE)
+_SKILL_SEPARATORS = re.compile(r"[,;\n|]")
+
+logger = logging.getLogger(__name__)
+
+
+def _hash_terms(terms: Sequence[str]) -> np.ndarray:
+    hashes = np.fromiter((zlib.crc32(term.encode()) for term in terms), dtype=np.uint32, count=len(terms))
+    return (hashes % FEATURE_BUCKETS).astype(FEATURE_DTYPE)
+
+
+def _terms(text: Optional[str], bigrams: bool, max_words: Optional[int] = None) -> List[str]:
+    words = tokenize(text or "")[:max_words]
+    terms = [word for word in words if word not in STOPWORDS]
+    if bigrams:
+        terms.extend(f"{a} {b}" for a, b in zip(words, words[1:]) if a not in STOPWORDS and b not in STOPWORDS)
+    return terms
+
+
+def text_features(text: Optional[str], bigrams: bool = True, max_words: Optional[int] = None) -> np.ndarray:
+    """Sorted unique feature hashes of a text."""
+    return np.unique(_hash_terms(_terms(text, bigrams, max_words)))
+
+
+def encode_features(features: np.ndarray) -> bytes:
+    return features.astype(FEATURE_DTYPE).tobytes()
+
+
+def decode_features(blob: Optional[bytes]) -> np.ndarray:
+    return np.frombuffer(blob or b"", dtype=FEATURE_DTYPE)
+
+
+def title_seniority(title: Optional[str]) -> int:
+    for level, pattern in SENIORITY_PATTERNS:
+        if title and pattern.search(title):
+            return level
+    return 1
+
+
+def experience_seniority(years: Optional[float]) -> Optional[int]:
+    if years is None:
+        return None
+    return int(np.searchsorted(SENIORITY_YEARS, years, side="right"))
+
+
+def min_experience_years(description: Optional[str]) -> Optional[float]:
+    """The first "N years" / "N+ years" / "N-M years" requirement in a description."""
+    match = _MIN_EXPERIENCE.search(description or "")
+    return float(match.group(1)) if match else None
+
+
+def posting_features(title: Optional[str], description: Optional[str]) -> Dict:
+    """Ranking columns for one posting, computed once at ingest."""
+    return {
+        "title_features": encode_features(text_features(title, bigrams=False)),
+        "skill_features": encode_features(
+            text_features(f"{title or ''} {description or ''}", max_words=MAX_DESCRIPTION_WORDS)
+        ),
+        "seniority": title_seniority(title),
+        "min_experience_years": min_experience_years(description),
+    }
+
+
+def _split_list(value) -> List[str]:
+    # Profile fields are comma-separated text in the database and lists from the API.
+    if not value:
+        return []
+    items = value if isinstance(value, (list, tuple)) else _SKILL_SEPARATORS.split(str(value))
+    return [str(item).strip() for item in items if str(item).strip()]
+
+
+class RankingProfile:
+    """A user's side of the scoring: dense weight vectors over the feature buckets plus scalar preferences."""
+
+    def __init__(
+        self,
+        skills: Sequence[str] = (),
+        titles: Sequence[str] = (),
+        experience_years: Optional[float] = None,
+        salary_expectation: Optional[float] = None,
+        salary_currency: Optional[str] = None,
+    ):
+        self.skill_weights = np.zeros(FEATURE_BUCKETS, dtype=np.float32)
+        self.skill_total = 0.0
+        for skill in skills:
+            words = [word for word in tokenize(skill) if word not in STOPWORDS]
+            if not words:
+                continue
+            # Multi-word skills match on their bigrams, each worth a share of the skill.
+            terms = [" ".join(words)] if len(words) <= 2 else [f"{a} {b}" for a, b in zip(words, words[1:])]
+            hashes = _hash_terms(terms)
+            np.maximum.at(self.skill_weights, hashes, 1.0 / len(terms))
+            self.skill_total += 1.0
+
+        self.title_weights = np.zeros(FEATURE_BUCKETS, dtype=np.float32)
+        title_features = text_features(" ".join(titles), bigrams=False)
+        self.title_weights[title_features] = 1.0
+        self.title_total = len(title_features)
+
+        self.experience_years = experience_years
+        self.seniority = experience_seniority(experience_years)
+        self.salary_expectation = salary_expectation or None
+        self.salary_currency = (salary_currency or "").strip().upper() or None
+
+    @classmethod
+    def from_user(cls, user: Optional[UserProfile]) -> "RankingProfile":
+        if user is None:
+            return cls()
+        titles = _split_list(user.preferred_job_titles)
+        if user.current_title:
+            titles.append(user.current_title)
+        return cls(
+            _split_list(user.skills),
+            titles,
+            user.experience_years,
+            user.salary_expectations,
+            user.salary_currency or RANKING_SALARY_CURRENCY,
+        )
+
+
+class PostingMatrix:
+    """
+    Ranking columns of many postings as flat arrays.
+
+    Variable-length feature lists are concatenated into one index array with
+    a parallel array of row numbers, so per-posting sums are one ``bincount``
+    over the matching entries.
+    """
+
+    COLUMNS = (
+        JobPosting.id,
+        JobPosting.title_features,
+        JobPosting.skill_features,
+        JobPosting.seniority,
+        JobPosting.min_experience_years,
+        JobPosting.salary_min,
+        JobPosting.salary_max,
+        JobPosting.posted_at,
+        JobPosting.salary_currency,
+        JobPosting.salary_period,
+    )
+
+    def __init__(self, rows: Sequence[Tuple]):
+        n = len(rows)
+        self.ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=n)
+        self.title_idx, self.title_rows, self.title_lengths = self._ragged([row[1] for row in rows])
+        self.skill_idx, self.skill_rows, _ = self._ragged([row[2] for row in rows])
+        self.seniority = np.array([1 if row[3] is None else row[3] for row in rows], dtype=np.float32)
+        self.min_experience = np.array([row[4] for row in rows], dtype=np.float64)
+        salary_min = np.array([row[5] for row in rows], dtype=np.float64)
+        salary_max = np.array([row[6] for row in rows], dtype=np.float64)
+        per_year = np.array([PAY_PERIOD_FACTORS.get(row[9], 1) for row in rows], dtype=np.float64)
+        self.salary = np.fmax(salary_min, salary_max) * per_year
+        self.posted_at = np.array([row[7].timestamp() if row[7] else np.nan for row in rows], dtype=np.float64)
+        self.salary_currency = np.array([(row[8] or "").strip().upper() for row in rows], dtype=str)
+
+    @staticmethod
+    def _ragged(blobs: List[Optional[bytes]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        blobs = [blob or b"" for blob in blobs]
+        # One buffer for all postings instead of an array per posting.
+        indices = decode_features(b"".join(blobs))
+        lengths = np.fromiter((len(blob) for blob in blobs), dtype=np.int64, count=len(blobs)) // FEATURE_DTYPE.itemsize
+        rows = np.repeat(np.arange(len(blobs), dtype=np.int32), lengths)
+        return indices, rows, lengths
+
+    def _sum_weights(self, weights: np.ndarray, indices: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Per-posting sum of ``weights`` over its features; only the (few) matching features are summed."""
+        matched = np.flatnonzero(weights[indices])
+        return np.bincount(rows[matched], weights=weights[indices[matched]], minlength=len(self))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_query(cls, query: Query) -> "PostingMatrix":
+        return cls(query.with_entities(*cls.COLUMNS).all())
+
+    def components(self, profile: RankingProfile, now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """Each score component in [0, 1] for every posting; unknowns score 0.5."""
+        n = len(self)
+        now_ts = (now or datetime.utcnow()).timestamp()
+        neutral = np.full(n, 0.5)
+
+        if profile.skill_total:
+            hits = self._sum_weights(profile.skill_weights, self.skill_idx, self.skill_rows)
+            skills = np.minimum(hits / profile.skill_total, 1.0)
+        else:
+            skills = neutral
+
+        if profile.title_total:
+            hits = self._sum_weights(profile.title_weights, self.title_idx, self.title_rows)
+            title = hits / np.sqrt(profile.title_total * np.maximum(self.title_lengths, 1))
+        else:
+            title = neutral
+
+        if profile.seniority is not None:
+            seniority = 1 - np.abs(self.seniority - profile.seniority) / 4
+            shortfall = np.nan_to_num(self.min_experience - profile.experience_years, nan=0.0)
+            seniority = seniority * np.clip(1 - shortfall / 3, 0, 1)
+        else:
+            seniority = neutral
+
+        if profile.salary_expectation:
+            # Amounts in another currency are not comparable with the expectation.
+            unknown = np.isnan(self.salary)
+            if profile.salary_currency:
+                unknown |= (self.salary_currency != "") & (self.salary_currency != profile.salary_currency)
+            salary = np.where(unknown, 0.5, np.clip(self.salary / profile.salary_expectation, 0, 1))
+        else:
+            salary = neutral
+
+        age_days = np.nan_to_num(np.maximum(now_ts - self.posted_at, 0) / 86400, nan=365.0)
+        recency = 0.5 ** (age_days / RANKING_RECENCY_HALF_LIFE_DAYS)
+
+        return {"skills": skills, "title": title, "seniority": seniority, "salary": salary, "recency": recency}
+
+    def score(self, profile: RankingProfile, now: Optional[datetime] = None) -> np.ndarray:
+        components = self.components(profile, now)
+        return sum(RANKING_WEIGHTS[name] * values for name, values in components.items())
+
+    def top(self, profile: RankingProfile, offset: int, limit: int, now: Optional[datetime] = None) -> List[Tuple[int, float]]:
+        """(posting id, score) for ranks ``offset`` .. ``offset + limit``, best first."""
+        scores = self.score(profile, now)
+        end = min(offset + limit, len(scores))
+        if offset >= end:
+            return []
+        # Only the first ``end`` ranks need to be sorted.
+        best = np.argpartition(-scores, end - 1)[:end] if end < len(scores) else np.arange(len(scores))
+        best = best[np.lexsort((-self.ids[best], -scores[best]))][offset:end]
+        return [(int(self.ids[i]), round(float(scores[i]), 4)) for i in best]
+
+
+def backfill_posting_features(db: Session, batch_size: int = 1000) -> int:
+    """Compute ranking columns for postings ingested before they existed."""
+    updated = 0
+    last_id = 0
+    while True:
+        rows = db.query(JobPosting.id, JobPosting.title, JobPosting.description)\
+            .filter(JobPosting.skill_features.is_(None), JobPosting.id > last_id)\
+            .order_by(JobPosting.id)\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return updated
+        db.bulk_update_mappings(JobPosting, [
+            {"id": posting_id, **posting_features(title, description)}
+            for posting_id, title, description in rows
+        ])
+        db.commit()
+        updated += len(rows)
+        last_id = rows[-1][0]
+        logger.info(f"Backfilled ranking features for {updated} postings")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job posting ranking maintenance")
+    parser.add_argument("--backfill", action="store_true", help="Compute missing ranking columns")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    if args.backfill:
+        from app.db import SessionLocal
+
+        started = time.perf_counter()
+        with SessionLocal() as db:
+            updated = backfill_posting_features(db, args.batch_size)
+        logger.info(f"Done: {updated} postings in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
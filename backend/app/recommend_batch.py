@@ -0,0 +1,202 @@
+# app/recommend_batch.py
+"""
+Recompute stored job-role recommendations for every complete profile, e.g.
+after the recommendation prompt changed:
+
+    python -m app.recommend_batch --chunk-size 200 --concurrency 8
+
+Profiles are read in id order, one chunk at a time. Users whose stored
+recommendations already match their profile fingerprint (which includes the
+prompt version) are skipped unless ``--force`` is given. After each chunk is
+written, the last processed id is saved to ``--checkpoint``; rerunning with
+the same file after a crash or interruption continues from there. A run
+that reaches the last profile deletes the checkpoint, so the next run
+starts from the beginning. Users whose completion failed are counted and
+left as they were; the next full run picks them up again, since their
+fingerprint is still stale.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db import SessionLocal
+from app.llm import close_llm_client
+from app.models.snapshot import Snapshot
+from app.models.user import UserProfile, UserRecommendations
+from app.recommendations import generate_recommendations, profile_fingerprint, recommendation_profile
+from app.subscriptions import subscribe_many
+from app.versions import bump_versions
+
+RECOMMEND_BATCH_CHUNK_SIZE = int(os.getenv("RECOMMEND_BATCH_CHUNK_SIZE", "200"))
+RECOMMEND_BATCH_CONCURRENCY = int(os.getenv("RECOMMEND_BATCH_CONCURRENCY", "8"))
+
+logger = logging.getLogger(__name__)
+
+
+def load_checkpoint(path: str) -> Optional[str]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get("last_id")
+
+
+def save_checkpoint(path: str, last_id: str, stats: Dict) -> None:
+    if not path:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_id": last_id, "stats": stats, "saved_at": datetime.utcnow().isoformat()}, f)
+    # Atomic, so a crash never leaves a half-written checkpoint.
+    os.replace(tmp_path, path)
+
+
+def clear_checkpoint(path: str) -> None:
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def count_profiles(after_id: Optional[str]) -> int:
+    with SessionLocal() as db:
+        query = db.query(UserProfile).filter(UserProfile.is_profile_complete.is_(True))
+        if after_id is not None:
+            query = query.filter(UserProfile.id > after_id)
+        return query.count()
+
+
+def fetch_chunk(after_id: Optional[str], limit: int) -> List[Tuple[str, Dict, Optional[str]]]:
+    """The next ``limit`` complete profiles after ``after_id`` with their stored fingerprints."""
+    with SessionLocal() as db:
+        query = db.query(UserProfile).filter(UserProfile.is_profile_complete.is_(True))
+        if after_id is not None:
+            query = query.filter(UserProfile.id > after_id)
+        users = query.order_by(UserProfile.id).limit(limit).all()
+        stored = dict(
+            db.query(UserRecommendations.user_id, UserRecommendations.profile_fingerprint)
+            .filter(UserRecommendations.user_id.in_([user.id for user in users]))
+            .all()
+        )
+        return [(user.id, recommendation_profile(user), stored.get(user.id)) for user in users]
+
+
+def upsert_chunk(results: List[Tuple[str, List[str], str]]) -> None:
+    """Write one chunk of recommendations in a single statement and subscribe the users to existing snapshots."""
+    if not results:
+        return
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        dialect = db.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        stmt = insert(UserRecommendations.__table__).values([
+            {"user_id": user_id, "recommendations": recommendations, "profile_fingerprint": fingerprint, "updated_at": now}
+            for user_id, recommendations, fingerprint in results
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={
+                "recommendations": stmt.excluded.recommendations,
+                "profile_fingerprint": stmt.excluded.profile_fingerprint,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+
+        roles = {role for _, recommendations, _ in results for role in recommendations}
+        snapshots_by_role: Dict[str, List[int]] = {}
+        for snapshot_fk, role in db.query(Snapshot.id, Snapshot.role).filter(Snapshot.role.in_(roles)).all():
+            snapshots_by_role.setdefault(role, []).append(snapshot_fk)
+        bump_versions(db, [user_id for user_id, _, _ in results])
+        db.commit()
+        subscribe_many(db, (
+            (user_id, snapshot_fk)
+            for user_id, recommendations, _ in results
+            for role in recommendations
+            for snapshot_fk in snapshots_by_role.get(role, [])
+        ))
+
+
+async def run_batch(
+    chunk_size: int = RECOMMEND_BATCH_CHUNK_SIZE,
+    concurrency: int = RECOMMEND_BATCH_CONCURRENCY,
+    checkpoint: Optional[str] = None,
+    force: bool = False,
+) -> Dict:
+    last_id = load_checkpoint(checkpoint)
+    if last_id is not None:
+        logger.info(f"Resuming after user {last_id}")
+    total = await asyncio.to_thread(count_profiles, last_id)
+    stats = {"processed": 0, "updated": 0, "skipped": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+
+    async def recompute(user_id: str, profile: Dict, fingerprint: str):
+        async with semaphore:
+            try:
+                return user_id, await generate_recommendations(profile), fingerprint
+            except Exception as e:
+                logger.error(f"Recommendations for user {user_id} failed: {str(e)}")
+                return None
+
+    while True:
+        chunk = await asyncio.to_thread(fetch_chunk, last_id, chunk_size)
+        if not chunk:
+            break
+
+        pending = []
+        for user_id, profile, stored_fingerprint in chunk:
+            fingerprint = profile_fingerprint(profile)
+            if force or stored_fingerprint != fingerprint:
+                pending.append(recompute(user_id, profile, fingerprint))
+            else:
+                stats["skipped"] += 1
+        results = [result for result in await asyncio.gather(*pending) if result is not None]
+        await asyncio.to_thread(upsert_chunk, results)
+
+        last_id = chunk[-1][0]
+        stats["processed"] += len(chunk)
+        stats["updated"] += len(results)
+        stats["failed"] += len(pending) - len(results)
+        save_checkpoint(checkpoint, last_id, stats)
+
+        elapsed = time.perf_counter() - started
+        rate = stats["processed"] / elapsed if elapsed else 0.0
+        remaining = (total - stats["processed"]) / rate if rate else 0.0
+        logger.info(
+            f"{stats['processed']}/{total} users ({stats['updated']} updated, {stats['skipped']} skipped, "
+            f"{stats['failed']} failed), {rate:.1f} users/s, ~{remaining:.0f}s left"
+        )
+
+    # Finished: a checkpoint left behind would make the next run skip everyone.
+    clear_checkpoint(checkpoint)
+    stats["elapsed"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute job-role recommendations for all complete profiles")
+    parser.add_argument("--chunk-size", type=int, default=RECOMMEND_BATCH_CHUNK_SIZE)
+    parser.add_argument("--concurrency", type=int, default=RECOMMEND_BATCH_CONCURRENCY)
+    parser.add_argument("--checkpoint", default="recommend_batch.checkpoint.json",
+                        help="File recording the last processed user id; empty string disables it")
+    parser.add_argument("--force", action="store_true", help="Recompute even when the fingerprint is unchanged")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    async def serve():
+        try:
+            return await run_batch(args.chunk_size, args.concurrency, args.checkpoint, args.force)
+        finally:
+            await close_llm_client()
+
+    stats = asyncio.run(serve())
+    logger.info(f"Done: {stats}")
+
+
+if __name__ == "__main__":
+    main()
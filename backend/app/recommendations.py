@@ -0,0 +1,205 @@
+# app/recommendations.py
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.llm import chat_completion
+from app.models.snapshot import Snapshot
+from app.models.user import UserProfile, UserRecommendations
+from app.role_matcher import ROLE_MATCHER_VERSION, get_role_matcher
+from app.singleflight import SingleFlight
+from app.subscriptions import subscribe
+from app.versions import bump_versions
+
+RECOMMEND_MODEL = "gpt-4o"
+RECOMMEND_SYSTEM_PROMPT = "You are a job recommendation assistant. Your task is to analyze user profiles and recommend the top 3 applicable job roles. Only return job roles without any additional explanation. Example Output: [Job Role 1, Job Role 2, Job Role 3]"
+# "local": role matcher only; "llm": completion only; "hybrid": role matcher,
+# falling back to a completion when it is not confident.
+RECOMMEND_BACKEND = os.getenv("RECOMMEND_BACKEND", "hybrid")
+RECOMMEND_PROMPT_VERSION = hashlib.sha256(
+    f"{RECOMMEND_MODEL}\n{RECOMMEND_SYSTEM_PROMPT}\n{RECOMMEND_BACKEND}\n{ROLE_MATCHER_VERSION}".encode()
+).hexdigest()[:16]
+
+# The profile fields the prompt depends on; anything else (phone, portfolio, ...)
+# can change without recomputing recommendations.
+RECOMMENDATION_FIELDS = ("skills", "experience", "education", "certifications", "location", "desired_role")
+
+logger = logging.getLogger(__name__)
+
+# Recomputations running in this process, keyed by (user_id, fingerprint).
+_refreshes = SingleFlight()
+
+
+def recommendation_profile(user: UserProfile) -> Dict:
+    """The profile dict sent to the recommender, built from a stored user."""
+    return {
+        "name": user.name,
+        "skills": user.skills,
+        "experience": user.experience_years,
+        "education": user.education,
+        "certifications": user.certifications,
+        "location": user.location,
+        "desired_role": user.preferred_job_titles
+    }
+
+
+def _normalize(value) -> List[str]:
+    # Lists from the API and comma-separated text from the database (see
+    # _as_text) canonicalize to the same sorted items.
+    if value is None:
+        return []
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (list, tuple)):
+        value = _as_text([int(item) if isinstance(item, float) and item.is_integer() else item for item in value], default="")
+    parts = (" ".join(part.casefold().split()) for part in str(value).split(","))
+    return sorted(part for part in parts if part)
+
+
+def profile_fingerprint(profile: Dict) -> str:
+    """Hash of the recommendation-relevant fields and the prompt version."""
+    relevant = {field: _normalize(profile.get(field)) for field in RECOMMENDATION_FIELDS}
+    encoded = json.dumps([RECOMMEND_PROMPT_VERSION, relevant], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _as_text(value, default: str = "N/A") -> str:
+    # Profile fields arrive as lists from the API and as comma-separated text from the database.
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value) or default
+    return str(value) if value not in (None, "") else default
+
+
+def build_prompt(profile: Dict) -> str:
+    return f"""
+        Based on the following user profile, recommend **only applicable job roles**:
+        - Name: {profile.get('name', 'N/A')}
+        - Skills: {_as_text(profile.get('skills'))}
+        - Experience: {profile.get('experience', 'N/A')} years
+        - Education: {profile.get('education', 'N/A')}
+        - Certifications: {_as_text(profile.get('certifications'))}
+        - Location: {profile.get('location', 'N/A')}
+        - Desired role: {profile.get('desired_role', 'N/A')}
+        """
+
+
+def parse_recommendations(reply: str) -> List[str]:
+    return reply.strip("[]").replace("'", "").replace('"', "").split(", ")
+
+
+async def generate_recommendations(profile: Dict) -> List[str]:
+    if RECOMMEND_BACKEND == "local":
+        # Best guess even when unsure; only a profile sharing nothing with the taxonomy gets none.
+        return get_role_matcher().match(profile, min_confidence=1e-6) or []
+    if RECOMMEND_BACKEND == "hybrid":
+        matched = get_role_matcher().match(profile)
+        if matched is not None:
+            return matched
+        logger.info("Role matcher not confident, asking the LLM")
+    return await _llm_recommendations(profile)
+
+
+async def _llm_recommendations(profile: Dict) -> List[str]:
+    reply = await chat_completion(
+        [
+            {"role": "system", "content": RECOMMEND_SYSTEM_PROMPT},
+            {"role": "user", "content": build_prompt(profile)},
+        ],
+        model=RECOMMEND_MODEL
+    )
+    logger.info(f"Recommendation response: {reply}")
+    return parse_recommendations(reply)
+
+
+def stored_recommendations(db: Session, user_id: str) -> Optional[UserRecommendations]:
+    return db.query(UserRecommendations).filter(UserRecommendations.user_id == user_id).first()
+
+
+def save_recommendations(db: Session, user_id: str, recommendations: List[str], fingerprint: str) -> None:
+    """Store the user's recommendations and subscribe them to snapshots already collected for those roles."""
+    existing = stored_recommendations(db, user_id)
+    if existing:
+        existing.recommendations = recommendations
+        existing.profile_fingerprint = fingerprint
+        existing.updated_at = datetime.utcnow()
+    else:
+        db.add(UserRecommendations(
+            user_id=user_id,
+            recommendations=recommendations,
+            profile_fingerprint=fingerprint,
+            updated_at=datetime.utcnow()
+        ))
+    bump_versions(db, [user_id])
+    db.commit()
+
+    existing_snapshot_ids = db.query(Snapshot.id).filter(Snapshot.role.in_(recommendations)).all()
+    subscribe(db, user_id, [snapshot_fk for (snapshot_fk,) in existing_snapshot_ids])
+
+
+def _stored_fingerprint(user_id: str) -> Optional[str]:
+    with SessionLocal() as db:
+        stored = stored_recommendations(db, user_id)
+        return stored.profile_fingerprint if stored else None
+
+
+def _stored(user_id: str) -> Optional[Tuple[List[str], Optional[str]]]:
+    with SessionLocal() as db:
+        stored = stored_recommendations(db, user_id)
+        return (list(stored.recommendations), stored.profile_fingerprint) if stored else None
+
+
+def _save(user_id: str, recommendations: List[str], fingerprint: str) -> None:
+    with SessionLocal() as db:
+        save_recommendations(db, user_id, recommendations, fingerprint)
+
+
+async def current_recommendations(user_id: str, profile: Dict) -> List[str]:
+    """
+    The user's recommendations for ``profile``: the stored ones when their
+    fingerprint matches, otherwise freshly generated and saved.
+
+    For the request path: like ``refresh_recommendations`` it uses short
+    sessions in worker threads and holds no connection while the completion
+    runs, but errors are raised to the caller.
+    """
+    fingerprint = profile_fingerprint(profile)
+    stored = await asyncio.to_thread(_stored, user_id)
+    # Same relevant inputs and prompt as last time: no completion needed.
+    if stored and stored[1] == fingerprint:
+        return stored[0]
+    recommendations = await generate_recommendations(profile)
+    await asyncio.to_thread(_save, user_id, recommendations, fingerprint)
+    return recommendations
+
+
+async def refresh_recommendations(user_id: str, profile: Dict) -> Optional[List[str]]:
+    """
+    Recompute a user's recommendations unless they are current for ``profile``.
+
+    Meant to run outside the request path; uses its own sessions and never
+    holds a connection while the completion runs. Concurrent refreshes for
+    the same user and profile share one completion.
+    """
+    fingerprint = profile_fingerprint(profile)
+
+    async def run() -> Optional[List[str]]:
+        if await asyncio.to_thread(_stored_fingerprint, user_id) == fingerprint:
+            return None
+        recommendations = await generate_recommendations(profile)
+        await asyncio.to_thread(_save, user_id, recommendations, fingerprint)
+        logger.info(f"Recommendations refreshed for user {user_id}")
+        return recommendations
+
+    try:
+        recommendations, _ = await _refreshes.do((user_id, fingerprint), run)
+        return recommendations
+    except Exception as e:
+        logger.error(f"Error refreshing recommendations for user {user_id}: {str(e)}")
+        return None
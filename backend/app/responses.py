@@ -0,0 +1,104 @@
+# app/responses.py
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+# orjson is optional; without it the stdlib produces the same JSON, only slower.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Per-user resources: kept by the browser only and revalidated (If-None-Match) on every use.
+PRIVATE_REVALIDATE = "private, no-cache"
+
+# Serializes numpy scalars (ranking scores) and int dict keys like json.dumps does.
+_ORJSON_OPTIONS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(value: Any):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes; orjson when installed, else the stdlib with the same output."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for large payloads of plain dicts, lists, strings, numbers and datetimes.
+
+    Return it from an endpoint (rather than the bare content) to also skip
+    FastAPI's ``jsonable_encoder`` pass, which walks every nested value in
+    Python before serializing.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag (quoted) derived from ``parts``."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        digest.update(b"\x00")
+    return f'"{digest.hexdigest()}"'
+
+
+def _opaque_tags(header: str) -> Iterable[str]:
+    for tag in header.split(","):
+        tag = tag.strip()
+        # Weak comparison: compressed representations carry W/ (see app.compression).
+        yield tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """Whether the request's ``If-None-Match`` already names ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return any(tag == "*" or tag == etag for tag in _opaque_tags(header))
+
+
+def not_modified_response(etag: str, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag})
+
+
+def json_response(
+    request: Request,
+    content: Any,
+    etag: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    ``FastJSONResponse`` for ``content`` with an ETag, or an empty 304 when
+    the client's copy is current.
+
+    Without ``etag`` the tag is the hash of the rendered body, which saves
+    the transfer but not the work. Pass one derived from the inputs when
+    it can be known up front, and check ``not_modified`` before building
+    ``content``.
+    """
+    headers = dict(headers or {})
+    body = None
+    if etag is None:
+        body = dumps(content)
+        etag = make_etag(body)
+    if not_modified(request, etag):
+        return not_modified_response(etag, headers)
+    headers["ETag"] = etag
+    if body is not None:
+        return Response(body, media_type="application/json", headers=headers)
+    return FastJSONResponse(content, headers=headers)
@@ -0,0 +1,113 @@
+# app/resume.py
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+import pdfplumber
+
+# Uploads larger than this are rejected before parsing.
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(5 * 1024 * 1024)))
+# Pages past this are ignored; a CV longer than this is not a CV.
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "30"))
+# Pages parsed by one pool task. Documents up to this size are parsed by a single task.
+RESUME_PAGES_PER_TASK = int(os.getenv("RESUME_PAGES_PER_TASK", "4"))
+RESUME_EXTRACT_WORKERS = int(os.getenv("RESUME_EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+
+RESUME_MODEL = "gpt-4o"
+RESUME_SYSTEM_PROMPT = """You must respond with only a valid JSON object, no markdown, no code blocks. Extract these fields from the resume:
+                    - current_title: string
+                    - current_industry: string
+                    - experience_years: number
+                    - education: array of strings
+                    - skills: array of strings
+                    - certifications: array of strings (if present)
+                    - location: string
+                    - phone: string
+                    - linkedin: string (if present)
+                    - preferred_job_titles: array of strings (determined by you)
+                    - preferred_industries: array of strings (determined by you)
+                    Only include information explicitly found in the resume."""
+# Changes whenever the model or prompt does, so cached results from an older prompt are not served.
+RESUME_PROMPT_VERSION = hashlib.sha256(f"{RESUME_MODEL}\n{RESUME_SYSTEM_PROMPT}".encode()).hexdigest()[:16]
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class ResumeRejected(ValueError):
+    pass
+
+
+def _extract_pages(data: bytes, start: int, stop: int) -> Tuple[int, List[str]]:
+    """Runs in a pool process: page count of the document and the text of pages [start, stop)."""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        pages = pdf.pages
+        # Scanned or image-only pages have no text layer.
+        return len(pages), [(page.extract_text() or "") for page in pages[start:stop]]
+
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: the API process runs threads, which fork does not copy safely.
+        _pool = ProcessPoolExecutor(
+            max_workers=RESUME_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_extract_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def iter_resume_pages(data: bytes, max_pages: int = RESUME_MAX_PAGES) -> AsyncIterator[str]:
+    """
+    Yield the text of each page, in order, without blocking the event loop.
+
+    The first task parses the leading pages and reports the page count; the
+    remaining pages are split into chunks parsed in parallel by the pool.
+    Pages are yielded as soon as every page before them is done.
+    """
+    if len(data) > RESUME_MAX_BYTES:
+        raise ResumeRejected(f"Resume is larger than {RESUME_MAX_BYTES} bytes")
+
+    loop = asyncio.get_running_loop()
+    pool = get_extract_pool()
+    first_stop = min(RESUME_PAGES_PER_TASK, max_pages)
+    try:
+        page_count, first_pages = await loop.run_in_executor(pool, _extract_pages, data, 0, first_stop)
+    except Exception as e:
+        raise ResumeRejected(f"Could not read PDF: {str(e)}") from e
+
+    if page_count > max_pages:
+        logger.info(f"Resume has {page_count} pages; extracting the first {max_pages}")
+    last = min(page_count, max_pages)
+    chunks = [
+        loop.run_in_executor(pool, _extract_pages, data, start, min(start + RESUME_PAGES_PER_TASK, last))
+        for start in range(first_stop, last, RESUME_PAGES_PER_TASK)
+    ]
+    try:
+        for text in first_pages:
+            yield text
+        for chunk in chunks:
+            _, pages = await chunk
+            for text in pages:
+                yield text
+    finally:
+        for chunk in chunks:
+            chunk.cancel()
+
+
+async def extract_resume_text(data: bytes, max_pages: int = RESUME_MAX_PAGES) -> str:
+    """Text of the resume's pages joined by newlines."""
+    return "\n".join([text async for text in iter_resume_pages(data, max_pages)])
@@ -0,0 +1,117 @@
+# app/resume_cache.py
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.resume_cache import ResumeCacheEntry
+
+RESUME_CACHE_TTL = float(os.getenv("RESUME_CACHE_TTL", str(30 * 24 * 60 * 60)))
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "10000"))
+
+logger = logging.getLogger(__name__)
+
+
+class ResumeCache:
+    """
+    Resume parse results keyed by the SHA-256 of the uploaded file.
+
+    An entry holds the extracted text and the structured LLM result. The
+    result is only served for the prompt version that produced it; after a
+    prompt change the cached text is still reused and only the completion is
+    redone. Entries expire ``ttl`` seconds after they were stored, and the
+    least recently used ones are evicted beyond ``max_entries``.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "text_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def get(self, db: Session, content_hash: str, prompt_version: str) -> Optional[Dict]:
+        """Return ``{"text", "result"}`` for a known file; ``result`` is None when it must be recomputed."""
+        entry = db.get(ResumeCacheEntry, content_hash)
+        if entry is None:
+            self._count("misses")
+            return None
+
+        now = datetime.utcnow()
+        if entry.created_at < now - timedelta(seconds=self.ttl):
+            db.delete(entry)
+            db.commit()
+            self._count("expirations")
+            self._count("misses")
+            return None
+
+        entry.hits += 1
+        entry.last_used_at = now
+        db.commit()
+        if entry.result is not None and entry.prompt_version == prompt_version:
+            self._count("hits")
+            return {"text": entry.text, "result": entry.result}
+        self._count("text_hits")
+        return {"text": entry.text, "result": None}
+
+    def put(self, db: Session, content_hash: str, text: str, result: Optional[Dict], prompt_version: str) -> None:
+        now = datetime.utcnow()
+        entry = db.get(ResumeCacheEntry, content_hash)
+        if entry is None:
+            entry = ResumeCacheEntry(content_hash=content_hash, created_at=now, hits=0)
+            db.add(entry)
+        entry.text = text
+        entry.result = result
+        entry.prompt_version = prompt_version
+        entry.last_used_at = now
+        try:
+            db.commit()
+        except IntegrityError:
+            # The same file was stored by a concurrent upload.
+            db.rollback()
+            return
+        self.evict(db)
+
+    def evict(self, db: Session) -> None:
+        expired = db.query(ResumeCacheEntry)\
+            .filter(ResumeCacheEntry.created_at < datetime.utcnow() - timedelta(seconds=self.ttl))\
+            .delete(synchronize_session=False)
+        excess = db.query(func.count(ResumeCacheEntry.content_hash)).scalar() - self.max_entries
+        evicted = 0
+        if excess > 0:
+            oldest = db.query(ResumeCacheEntry.content_hash)\
+                .order_by(ResumeCacheEntry.last_used_at)\
+                .limit(excess)\
+                .subquery()
+            evicted = db.query(ResumeCacheEntry)\
+                .filter(ResumeCacheEntry.content_hash.in_(oldest.select()))\
+                .delete(synchronize_session=False)
+        db.commit()
+        self._count("expirations", expired)
+        self._count("evictions", evicted)
+
+    def stats(self, db: Optional[Session] = None) -> Dict:
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["text_hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        if db is not None:
+            stats["entries"] = db.query(func.count(ResumeCacheEntry.content_hash)).scalar()
+        return stats
+
+
+resume_cache = ResumeCache(ttl=RESUME_CACHE_TTL, max_entries=RESUME_CACHE_MAX_ENTRIES)
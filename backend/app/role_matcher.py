@@ -0,0 +1,177 @@
+# app/role_matcher.py
+import hashlib
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Hashed feature space; collisions are rare at this size for short documents.
+ROLE_MATCHER_DIMENSIONS = int(os.getenv("ROLE_MATCHER_DIMENSIONS", str(1 << 14)))
+# Below this cosine similarity for the best role the match is considered a guess.
+ROLE_MATCHER_MIN_CONFIDENCE = float(os.getenv("ROLE_MATCHER_MIN_CONFIDENCE", "0.15"))
+
+# Role name -> terms that describe it (skills, tools, alternative titles).
+ROLE_TAXONOMY: Dict[str, str] = {
+    "Software Engineer": "software engineer developer programming java python c++ go algorithms data structures git code review unit testing",
+    "Backend Engineer": "backend engineer server side api rest grpc python java go node.js django flask fastapi spring postgres sql redis microservices",
+    "Frontend Engineer": "frontend engineer front end developer javascript typescript react vue angular html css ui web next.js redux",
+    "Full Stack Developer": "full stack developer javascript typescript react node.js express python django api sql mongodb web applications",
+    "Mobile Developer": "mobile developer ios android swift kotlin objective-c react native flutter mobile apps",
+    "DevOps Engineer": "devops engineer ci cd jenkins github actions docker kubernetes terraform ansible aws gcp azure linux bash infrastructure as code",
+    "Site Reliability Engineer": "site reliability engineer sre observability monitoring prometheus grafana incident response kubernetes linux on-call slo",
+    "Cloud Engineer": "cloud engineer aws azure gcp cloud architecture terraform networking iam serverless lambda",
+    "Data Scientist": "data scientist machine learning statistics python r pandas numpy scikit-learn modeling experimentation a/b testing regression",
+    "Machine Learning Engineer": "machine learning engineer ml deep learning pytorch tensorflow model deployment mlops feature engineering python",
+    "Data Engineer": "data engineer etl elt pipelines spark hadoop kafka airflow sql data warehouse snowflake bigquery dbt python",
+    "Data Analyst": "data analyst sql excel tableau power bi dashboards reporting analytics business intelligence statistics",
+    "Business Intelligence Analyst": "business intelligence analyst bi tableau power bi looker sql data visualization kpi reporting",
+    "AI Research Scientist": "ai research scientist nlp computer vision deep learning transformers llm pytorch publications phd research",
+    "Security Engineer": "security engineer cybersecurity application security penetration testing siem threat modeling vulnerability owasp",
+    "QA Engineer": "qa engineer quality assurance test automation selenium cypress manual testing test plans regression",
+    "Database Administrator": "database administrator dba postgres mysql oracle sql server backup replication performance tuning",
+    "Embedded Systems Engineer": "embedded systems engineer firmware c c++ microcontrollers rtos arm hardware iot",
+    "Game Developer": "game developer unity unreal c# c++ gameplay graphics",
+    "Solutions Architect": "solutions architect system design architecture cloud enterprise integration stakeholders pre-sales",
+    "Engineering Manager": "engineering manager team lead people management hiring mentoring delivery agile scrum roadmap",
+    "Product Manager": "product manager product management roadmap user stories stakeholders market research prioritization agile jira",
+    "Project Manager": "project manager project management pmp planning budget schedule risk stakeholders agile scrum waterfall",
+    "Scrum Master": "scrum master agile scrum kanban sprint planning retrospectives jira coaching",
+    "UX Designer": "ux designer user experience user research wireframes prototyping figma sketch usability testing interaction design",
+    "UI Designer": "ui designer user interface visual design figma adobe xd typography design systems",
+    "Graphic Designer": "graphic designer adobe photoshop illustrator indesign branding visual design print",
+    "Technical Writer": "technical writer documentation api docs writing editing markdown",
+    "Business Analyst": "business analyst requirements gathering process modeling stakeholders sql excel documentation uml",
+    "Financial Analyst": "financial analyst financial modeling excel forecasting budgeting valuation accounting finance",
+    "Accountant": "accountant accounting bookkeeping tax audit gaap ifrs quickbooks reconciliation cpa",
+    "Marketing Manager": "marketing manager digital marketing campaigns brand strategy content marketing analytics",
+    "Digital Marketing Specialist": "digital marketing specialist seo sem google ads social media marketing email marketing analytics",
+    "Content Writer": "content writer copywriting blogging seo content creation editing",
+    "Sales Representative": "sales representative sales b2b b2c lead generation crm salesforce negotiation quota cold calling",
+    "Account Manager": "account manager client relationships account management upselling customer success crm",
+    "Customer Success Manager": "customer success manager onboarding retention churn customer support saas",
+    "Customer Support Specialist": "customer support specialist customer service help desk ticketing zendesk communication",
+    "Human Resources Manager": "human resources manager hr recruiting employee relations payroll benefits onboarding compliance",
+    "Recruiter": "recruiter talent acquisition sourcing interviewing hiring linkedin recruiter ats",
+    "Operations Manager": "operations manager operations logistics process improvement supply chain kpi team management",
+    "Supply Chain Analyst": "supply chain analyst logistics inventory procurement forecasting sap erp",
+    "Mechanical Engineer": "mechanical engineer cad solidworks autocad design manufacturing thermodynamics",
+    "Electrical Engineer": "electrical engineer circuits pcb design power systems matlab electronics",
+    "Civil Engineer": "civil engineer structural design autocad construction site engineering",
+    "Teacher": "teacher teaching education curriculum classroom lesson planning tutoring",
+    "Registered Nurse": "registered nurse nursing patient care clinical hospital healthcare",
+}
+
+# Changes whenever the taxonomy or feature space does, so stored recommendations are recomputed.
+ROLE_MATCHER_VERSION = hashlib.sha256(
+    repr((sorted(ROLE_TAXONOMY.items()), ROLE_MATCHER_DIMENSIONS)).encode()
+).hexdigest()[:16]
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+
+
+def tokenize(text: str) -> List[str]:
+    # Sentence punctuation is not part of the word ("python." -> "python"); "node.js" and "c++" are kept.
+    return [word.rstrip("./-") for word in _WORD.findall(text.casefold())]
+
+
+def _features(text: str) -> List[str]:
+    """Words, word bigrams and character trigrams of each word (so "postgresql" still matches "postgres")."""
+    words = tokenize(text)
+    features = list(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f" {word} "
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def _hash_indices(features: Sequence[str], dimensions: int) -> np.ndarray:
+    # crc32 rather than hash(): stable across processes, so vectors can be stored.
+    return np.fromiter((zlib.crc32(f.encode()) % dimensions for f in features), dtype=np.int64, count=len(features))
+
+
+def hashed_counts(text: str, dimensions: int = ROLE_MATCHER_DIMENSIONS) -> np.ndarray:
+    indices = _hash_indices(_features(text), dimensions)
+    return np.bincount(indices, minlength=dimensions).astype(np.float32)
+
+
+def _as_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+
+def profile_text(profile: Dict) -> str:
+    """The parts of a recommendation profile that describe what the user does."""
+    # Desired titles and skills carry the signal; repeat them so they outweigh education.
+    return " ".join([
+        _as_text(profile.get("desired_role")),
+        _as_text(profile.get("desired_role")),
+        _as_text(profile.get("skills")),
+        _as_text(profile.get("skills")),
+        _as_text(profile.get("certifications")),
+        _as_text(profile.get("education")),
+    ])
+
+
+class RoleMatcher:
+    """
+    Cosine-similarity top-k over a role taxonomy.
+
+    Each role is a TF-IDF vector of hashed word, bigram and character
+    trigram features, L2-normalized into a dense (roles x dimensions)
+    matrix, so matching one profile is a single matrix-vector product.
+    """
+
+    def __init__(self, taxonomy: Dict[str, str], dimensions: int = ROLE_MATCHER_DIMENSIONS):
+        self.roles = list(taxonomy)
+        self.dimensions = dimensions
+        counts = np.stack([hashed_counts(f"{role} {role} {terms}", dimensions) for role, terms in taxonomy.items()])
+        document_frequency = np.count_nonzero(counts, axis=0)
+        # Smoothed IDF; features that never occur in the taxonomy get weight 0 and cannot match.
+        self.idf = np.where(
+            document_frequency > 0,
+            np.log((1 + len(self.roles)) / (1 + document_frequency)) + 1,
+            0,
+        ).astype(np.float32)
+        self.matrix = self._normalize(np.log1p(counts) * self.idf)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def vectorize(self, text: str) -> np.ndarray:
+        return self._normalize(np.log1p(hashed_counts(text, self.dimensions)) * self.idf)
+
+    def top_k(self, text: str, k: int = 3) -> List[Tuple[str, float]]:
+        scores = self.matrix @ self.vectorize(text)
+        k = min(k, len(self.roles))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.roles[i], float(scores[i])) for i in best]
+
+    def match(self, profile: Dict, k: int = 3, min_confidence: float = ROLE_MATCHER_MIN_CONFIDENCE) -> Optional[List[str]]:
+        """Top ``k`` role names for a profile, or None when the best match is below ``min_confidence``."""
+        matches = self.top_k(profile_text(profile), k)
+        if not matches or matches[0][1] < min_confidence:
+            return None
+        return [role for role, _ in matches]
+
+
+_matcher: Optional[RoleMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_role_matcher() -> RoleMatcher:
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _matcher = RoleMatcher(ROLE_TAXONOMY)
+    return _matcher
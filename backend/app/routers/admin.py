@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.db import get_db, pool_stats
+from app.models.scheduler_request import SchedulerRequest
+from app.models.user import UserProfile
+from app.routers.users import get_admin_user
+from app.scheduler import request_plan, scheduler_status
+from app.resume_cache import resume_cache
+from app.snapshot_cache import snapshot_cache
+
+# Every route here is operator-only: see ADMIN_EMAILS in app.routers.users.
+router = APIRouter(dependencies=[Depends(get_admin_user)])
+
+
+def request_status(request: SchedulerRequest) -> dict:
+    return {
+        "request_id": request.id,
+        "status": "done" if request.finished_at else "queued",
+        "requested_by": request.requested_by,
+        "requested_at": request.requested_at,
+        "finished_at": request.finished_at,
+        "result": request.result,
+    }
+
+
+@router.get("/scheduler")
+def get_scheduler_status(db: Session = Depends(get_db)) -> dict:
+    """Refresh schedule, per-platform trigger budget, latest plan and scrape queue depth."""
+    return scheduler_status(db)
+
+
+@router.post("/scheduler/run", status_code=202)
+def run_scheduler_now(admin: UserProfile = Depends(get_admin_user), db: Session = Depends(get_db)) -> dict:
+    """
+    Ask the scheduler process for a planning pass now instead of at the next tick.
+
+    The pass runs there, against its trigger budget, within
+    ``SCHEDULER_POLL_SECONDS``; poll ``GET /admin/scheduler/run/{request_id}``
+    for the plan.
+    """
+    return request_status(request_plan(db, admin.email))
+
+
+@router.get("/scheduler/run/{request_id}")
+def get_scheduler_run(request_id: int, db: Session = Depends(get_db)) -> dict:
+    request = db.query(SchedulerRequest).filter(SchedulerRequest.id == request_id).first()
+    if request is None:
+        raise HTTPException(status_code=404, detail="Scheduler request not found")
+    return request_status(request)
+
+
+@router.get("/db/pool")
+def get_pool_stats() -> dict:
+    """Database pool occupancy (checked out, overflow) and checkout wait times of this process."""
+    return pool_stats()
+
+
+@router.get("/snapshots/cache/stats")
+def get_snapshot_cache_stats() -> dict:
+    """Hit/miss/eviction counters and current size of the snapshot cache."""
+    return snapshot_cache.stats()
+
+
+@router.delete("/snapshots/cache")
+def invalidate_snapshot_cache(snapshot_id: Optional[str] = None) -> dict:
+    """Drop one cached snapshot document, or the whole cache when no id is given."""
+    removed = snapshot_cache.invalidate(snapshot_id)
+    return {"invalidated": removed}
+
+
+@router.get("/resume/cache/stats")
+def get_resume_cache_stats(db: Session = Depends(get_db)) -> dict:
+    """Hit/miss/eviction counters of the resume parse cache (this process) and its size."""
+    return resume_cache.stats(db)
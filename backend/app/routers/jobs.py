@@ -0,0 +1,208 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session, Query as SAQuery, undefer
+from sqlalchemy import tuple_, text
+from typing import Optional, Tuple, Union
+from datetime import datetime
+import base64
+import json
+from app.db import get_db
+from app.dedup import collapse_duplicates, duplicate_sources
+from app.listing import summary_fields, summary_records
+from app.responses import json_response
+from app.models.job_posting import JobPosting
+from app.subscriptions import subscribed_to
+from app.schemas.job_posting import JobPostingDetail
+from app.search import apply_fulltext, highlight_snippets
+
+router = APIRouter()
+
+
+def encode_cursor(sort_value, posting_id: int) -> str:
+    """Opaque cursor for a (posted_at or relevance score, id) position."""
+    if isinstance(sort_value, datetime):
+        key = f"t{sort_value.isoformat()}"
+    else:
+        key = f"r{float(sort_value)!r}"
+    raw = f"{key}|{posting_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Union[datetime, float], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, posting_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        sort_value = datetime.fromisoformat(key[1:]) if key[0] == "t" else float(key[1:])
+        return sort_value, int(posting_id)
+    except (ValueError, IndexError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def build_search_query(
+    db: Session,
+    user_id: Optional[str] = None,
+    platform: Optional[str] = None,
+    role: Optional[str] = None,
+    location: Optional[str] = None,
+    remote: Optional[bool] = None,
+    q: Optional[str] = None,
+    dedupe: bool = False,
+) -> Tuple[SAQuery, Optional[object]]:
+    """
+    Filtered posting query; every filter is optional. With ``dedupe`` only
+    one posting per duplicate cluster is kept.
+
+    Returns the query and, when ``q`` is given and a full-text index is
+    available, its relevance score expression.
+    """
+    # Postings that stopped being delivered by their source are tombstoned, not deleted.
+    query = db.query(JobPosting).filter(JobPosting.removed_at.is_(None))
+
+    if user_id:
+        # Postings for the role/platform pairs the user has snapshots for.
+        query = query.filter(subscribed_to(db, user_id, JobPosting.platform, JobPosting.role))
+    if platform:
+        query = query.filter(JobPosting.platform == platform)
+    if role:
+        query = query.filter(JobPosting.role == role)
+    if location:
+        query = query.filter(JobPosting.location.ilike(f"%{location}%"))
+    if remote is not None:
+        query = query.filter(JobPosting.is_remote == remote)
+    if dedupe:
+        query = collapse_duplicates(db, query, user_id, platform, role)
+    score = None
+    if q:
+        query, score = apply_fulltext(db, query, q)
+    return query, score
+
+
+def approximate_count(db: Session, query: SAQuery) -> Tuple[int, bool]:
+    """
+    Row estimate for ``query``.
+
+    On Postgres the planner estimate is read from EXPLAIN, which costs the
+    same regardless of how many rows match. Other databases fall back to an
+    exact COUNT(*). Returns (count, is_estimate).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return query.order_by(None).count(), False
+    statement = query.order_by(None).statement.compile(
+        dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+    )
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"]), True
+
+
+@router.get("/search")
+def search_jobs(
+    request: Request,
+    user_id: Optional[str] = None,
+    platform: Optional[str] = None,
+    role: Optional[str] = None,
+    location: Optional[str] = None,
+    remote: Optional[bool] = None,
+    q: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = False,
+    dedupe: bool = True,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    Search postings with server-side filters and keyset pagination.
+
+    Results are ordered newest first by (posted_at, id), or by relevance when
+    ``q`` is given. Pass the returned ``next_cursor`` to get the following
+    page; each page is a single index range scan, so deep pages cost the same
+    as the first one.
+
+    Args:
+        user_id (str): Only postings for this user's subscribed roles/platforms.
+        platform (str): Exact platform (LinkedIn, Glassdoor, Indeed).
+        role (str): Exact role.
+        location (str): Case-insensitive substring of the location.
+        remote (bool): Only remote (or only on-site) postings.
+        q (str): Full-text query over title, company and description. Supports
+            "quoted phrases"; results are ranked and carry a highlighted ``snippet``.
+        cursor (str): ``next_cursor`` from the previous page.
+        limit (int): Page size.
+        include_total (bool): Also return an (approximate) total.
+        dedupe (bool): Return one posting per set of cross-platform duplicates,
+            with every copy listed in its ``sources``.
+        fields (str): Comma-separated summary fields to return (``id`` is
+            always included). Descriptions are only served by ``GET /jobs/{posting_id}``.
+
+    Returns:
+        dict: ``items``, ``next_cursor`` and, if requested, ``total``.
+    """
+    try:
+        selected = summary_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query, score = build_search_query(db, user_id, platform, role, location, remote, q, dedupe)
+
+    if score is not None:
+        # Relevance order: keyset on (score, id)
+        sort_key, page_query = score, query.add_columns(score.label("score"))
+    else:
+        sort_key, page_query = JobPosting.posted_at, query
+    if cursor:
+        sort_value, posting_id = decode_cursor(cursor)
+        if isinstance(sort_value, datetime) == (score is not None):
+            raise HTTPException(status_code=400, detail="Cursor does not match the query")
+        page_query = page_query.filter(tuple_(sort_key, JobPosting.id) < tuple_(sort_value, posting_id))
+    rows = page_query\
+        .order_by(sort_key.desc(), JobPosting.id.desc())\
+        .limit(limit + 1)\
+        .all()
+    if score is not None:
+        postings, scores = [row[0] for row in rows], [row[1] for row in rows]
+    else:
+        postings, scores = rows, [posting.posted_at for posting in rows]
+
+    next_cursor = None
+    if len(postings) > limit:
+        postings = postings[:limit]
+        next_cursor = encode_cursor(scores[limit - 1], postings[-1].id)
+
+    items = summary_records(postings, selected)
+    if dedupe:
+        sources = duplicate_sources(db, postings)
+        for item in items:
+            item["sources"] = sources[item["id"]]
+    if q:
+        snippets = highlight_snippets(db, q, [posting.id for posting in postings])
+        for item, value in zip(items, scores):
+            item["snippet"] = snippets.get(item["id"])
+            if score is not None:
+                item["score"] = value
+
+    response = {
+        "items": items,
+        "next_cursor": next_cursor,
+        "limit": limit
+    }
+    if include_total:
+        response["total"], response["total_is_estimate"] = approximate_count(db, query)
+    return json_response(request, response)
+
+
+@router.get("/{posting_id}")
+def get_posting(posting_id: int, request: Request, db: Session = Depends(get_db)) -> dict:
+    """
+    One posting in full: the summary fields plus the description, the source
+    record as delivered (benefits, formatting, ...) and every copy of it in
+    ``sources``. Listings only carry summaries; this is what a card opens.
+    """
+    posting = db.query(JobPosting)\
+        .options(undefer(JobPosting.description), undefer(JobPosting.raw))\
+        .filter(JobPosting.id == posting_id)\
+        .first()
+    if posting is None:
+        raise HTTPException(status_code=404, detail="Posting not found")
+    detail = JobPostingDetail.model_validate(posting).model_dump()
+    detail["sources"] = duplicate_sources(db, [posting])[posting.id]
+    return json_response(request, detail)
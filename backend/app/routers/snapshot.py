@@ -1,280 +1,399 @@
-from fastapi import Depends, HTTPException, APIRouter, Query
+from fastapi import Depends, HTTPException, APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 import logging
-import time
-from typing import Dict, List, Optional
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from app.models.snapshot import Snapshot
-from app.db import get_db
-import requests
+from app.models.trigger_request import TriggerRequest
+from app.models.job_posting import JobPosting
+from app.models.user import UserProfile
+from app.responses import PRIVATE_REVALIDATE, json_response, not_modified, not_modified_response
+from app.versions import user_etag
+from app.listing import field_list, project, summaries_by_snapshot, summary_fields, summary_records
+from app.ingest import ingest_snapshot, scope_key
+from app.models.ingest_watermark import IngestWatermark
+from app.ranking import PostingMatrix, RankingProfile
+from app.dedup import collapse_duplicates, duplicate_sources
+from app.db import get_db, session_scope
 import os
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import func
 import boto3
 from botocore.exceptions import ClientError
 import json
+import httpx
 from botocore.config import Config
+from app.s3 import describe_fetch_error, fetch_json_many, iter_json_elements, snapshot_directory, snapshot_object_url
+from app.brightdata import (
+    BRIGHTDATA_POLL_BASE_DELAY,
+    BRIGHTDATA_READY_TIMEOUT,
+    SnapshotNotDelivered,
+    build_payloads,
+    deliver_snapshot,
+    get_brightdata_semaphore,
+    ingest_window,
+    normalize_payload,
+    payload_fingerprint,
+    trigger_snapshot,
+    wait_until_ready,
+)
+from app.singleflight import SingleFlight
+from app.subscriptions import record_snapshots, subscribed_to, user_snapshots
+
+# A snapshot collected for the same request within this many hours is reused
+# instead of paying for a new scrape.
+SNAPSHOT_FRESHNESS_HOURS = float(os.getenv("SNAPSHOT_FRESHNESS_HOURS", "24"))
 
-API_TOKEN = os.getenv("BRIGHTDATA_API_TOKEN")
+# NDJSON responses are flushed in chunks of about this many bytes.
+SNAPSHOT_STREAM_CHUNK_BYTES = 64 * 1024
 
-LINKEDIN_URL = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=gd_lpfll7v5hcqtkxl6l&include_errors=true&type=discover_new&discover_by=keyword"
-GLASSDOOR_URL = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=gd_lpfbbndm1xnopbrcr0&include_errors=true&type=discover_new&discover_by=keyword"
-INDEED_URL = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=gd_l7qekxkv2i7ve6hx1s&include_errors=true&type=discover_new&discover_by=keyword"
+# Bright Data flows running in this process, keyed by payload fingerprint.
+snapshot_flights = SingleFlight()
+# How each role x platform flow in this process was satisfied.
+trigger_stats = {"requests": 0, "triggered": 0, "reused": 0, "coalesced": 0}
 
-HEADERS = {
-    "Authorization": f"Bearer {API_TOKEN}",
-    "Content-Type": "application/json",
-}
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def log_trigger_requests(db: Session, outcome: str, platforms: List[str]) -> None:
+    """Record served requests for ``GET /snapshots/metrics/triggers``; the caller commits."""
+    db.add_all([TriggerRequest(platform=platform, outcome=outcome) for platform in platforms])
+
+
+def trigger_savings() -> Dict:
+    """Process-local trigger counters plus the share of flows that did not need a new scrape."""
+    requests = trigger_stats["requests"]
+    saved = trigger_stats["reused"] + trigger_stats["coalesced"]
+    return {
+        **trigger_stats,
+        "in_flight": len(snapshot_flights),
+        "savings_ratio": round(saved / requests, 4) if requests else 0.0,
+    }
+
+
 class SnapshotManager:
-    
-    def __init__(self, db: Session = Depends(get_db)):
+    """
+    Runs role x platform scrape flows. Holds no database session itself:
+    every flow opens short sessions of its own (``session_scope``), so a
+    job never pins a pooled connection while it waits on Bright Data.
+    """
+
+    def __init__(self, db: Optional[Session] = None):
         self.db = db
         self.logger = logging.getLogger(__name__)
-        self.api_token = API_TOKEN
         self.s3_bucket = os.getenv("S3_BUCKET")
         
-    def create_snapshot(self, url: str, role: str, platform: str, payload: Dict, user_id: str) -> str:
-        try:
-            db = next(get_db())
-            response = requests.post(url, json=payload, headers=HEADERS)
-            response.raise_for_status()
-            snapshot_id = response.json().get("snapshot_id")
-
-            snapshot = Snapshot(
-                role=role,
-                platform=platform,
-                snapshot_id=snapshot_id,
-                payload=payload,
-               user_id=user_id
-            )
-            
-            db.add(snapshot) 
-            db.commit()
-            db.refresh(snapshot)
-            snapshot_id = "12345"
-            print(f"Snapshot for {platform} ({role}) created: {snapshot_id}")
-            print(f"url: {url}")
-            print(f"payload: {payload}")
-            print(f"headers: {HEADERS}")
-            
-            # logging.info(f"Snapshot for {platform} ({role}) created: {snapshot_id}")
-            print(f"Snapshot for {platform} ({role}) created: {snapshot_id}")
-        except Exception as e:
-            # logging.error(f"Failed to create snapshot for {platform} ({role}): {str(e)}")
-            print(f"Failed to create snapshot for {platform} ({role}): {str(e)}")
+    def add_snapshot(self, db: Session, role: str, platform: str, snapshot_id: str, payload: Dict, user_id: str) -> None:
+        """Record the snapshot in the catalog (once) and subscribe the user to it."""
+        record_snapshots(db, user_id, [(role, platform, snapshot_id, payload)])
 
-        
-    def check_existing_snapshot(self, role: str, platform: str, payload: Dict) -> Optional[str]:
+    async def create_snapshot(self, role: str, platform: str, payload: Dict, user_id: str) -> str:
+        snapshot_id = await trigger_snapshot(platform, payload)
+        # The session is opened only once Bright Data has answered.
+        with session_scope() as db:
+            await asyncio.to_thread(self.add_snapshot, db, role, platform, snapshot_id, payload, user_id)
+
+        self.logger.info(f"Snapshot for {platform} ({role}) created: {snapshot_id}")
+        return snapshot_id
+
+    def check_existing_snapshot(self, role: str, platform: str, payload: Dict, db: Optional[Session] = None):
+        """
+        Return ``(snapshot_id, role)`` of the newest snapshot for the same request
+        collected within the freshness window, or None.
+
+        Matches on the stored payload fingerprint, so the lookup is a probe of
+        ``ix_snapshots_platform_payload_hash_created_at``. The returned role is
+        the one the snapshot was collected (and stored in S3) with, which can
+        differ from ``role`` in case or spacing.
+        """
+        db = db or self.db
+        fresh_after = datetime.utcnow() - timedelta(hours=SNAPSHOT_FRESHNESS_HOURS)
         try:
-            snapshot = self.db.query(Snapshot).filter(
-                Snapshot.role == role,
+            snapshot = db.query(Snapshot.snapshot_id, Snapshot.role).filter(
                 Snapshot.platform == platform,
-                Snapshot.payload.cast(JSONB) == payload
-            ).first()
+                Snapshot.payload_hash == payload_fingerprint(platform, payload),
+                Snapshot.created_at >= fresh_after
+            ).order_by(Snapshot.created_at.desc()).first()
             
             if snapshot:
-                logging.info(f"Existing snapshot found for {platform} ({role}): {snapshot.snapshot_id}")
-                return snapshot.snapshot_id
+                self.logger.info(f"Existing snapshot found for {platform} ({role}): {snapshot.snapshot_id}")
+                return snapshot
                     
         except Exception as e:
+            db.rollback()
             self.logger.error(f"Error checking existing snapshot: {str(e)}")
             
         return None
 
+    def reuse_snapshots(self, flows: List[Tuple[str, str, Dict]], user_id: str) -> Dict[int, Dict]:
+        """
+        Satisfy every flow a fresh snapshot already covers, in one unit of work.
+
+        ``flows`` are ``(role, platform, normalized payload)``. One query finds
+        the newest fresh snapshot per fingerprint (a probe of
+        ``ix_snapshots_platform_payload_hash_created_at`` per platform) and
+        one ``record_snapshots`` call subscribes the user to all of them.
+        Returns the results keyed by position in ``flows``.
+        """
+        if not flows:
+            return {}
+        fingerprints = [payload_fingerprint(platform, payload) for _, platform, payload in flows]
+        fresh_after = datetime.utcnow() - timedelta(hours=SNAPSHOT_FRESHNESS_HOURS)
+        with session_scope() as db:
+            rows = db.query(Snapshot.snapshot_id, Snapshot.role, Snapshot.platform, Snapshot.payload_hash).filter(
+                Snapshot.platform.in_({platform for _, platform, _ in flows}),
+                Snapshot.payload_hash.in_(set(fingerprints)),
+                Snapshot.created_at >= fresh_after
+            ).order_by(Snapshot.created_at).all()
+            # Ascending order: the newest snapshot per key wins.
+            newest = {(row.platform, row.payload_hash): row for row in rows}
+            found = {}
+            for i, ((_, platform, payload), fingerprint) in enumerate(zip(flows, fingerprints)):
+                existing = newest.get((platform, fingerprint))
+                if existing:
+                    found[i] = (existing.role, platform, existing.snapshot_id, payload)
+            # Subscribe under the role each snapshot was collected (and stored in S3) with.
+            record_snapshots(db, user_id, found.values())
+            log_trigger_requests(db, "reused", [platform for _, platform, _, _ in found.values()])
+        for i, (_, platform, _, _) in found.items():
+            self.logger.info(f"Existing snapshot found for {platform} ({flows[i][0]}): {found[i][2]}")
+        return {
+            i: {"snapshot_id": snapshot_id, "status": "existing_snapshot_used"}
+            for i, (_, _, snapshot_id, _) in found.items()
+        }
+
+    async def process_platform(self, role: str, platform: str, payload: Dict, user_id: str, reuse: bool = True) -> Dict:
+        """
+        Reuse or trigger, wait for delivery and ingest one role on one platform.
+
+        Identical requests are collapsed by payload fingerprint: a fresh
+        snapshot in the database is reused, and a request that is already
+        being scraped in this process is awaited instead of triggered again.
+        ``reuse=False`` skips the database lookup for callers that already
+        made it (``process_job_roles``).
+        """
+        payload = normalize_payload(payload)
+        fingerprint = payload_fingerprint(platform, payload)
+        trigger_stats["requests"] += 1
+
+        if reuse and fingerprint not in snapshot_flights:
+            # Each concurrent flow gets its own session and runs its queries in a
+            # worker thread, so database waits never stall the event loop.
+            with session_scope() as db:
+                existing = await asyncio.to_thread(self.check_existing_snapshot, role, platform, payload, db)
+                if existing:
+                    trigger_stats["reused"] += 1
+                    await asyncio.to_thread(self.add_snapshot, db, existing.role, platform, existing.snapshot_id, payload, user_id)
+                    await asyncio.to_thread(log_trigger_requests, db, "reused", [platform])
+                    return {
+                        "snapshot_id": existing.snapshot_id,
+                        "status": "existing_snapshot_used"
+                    }
+
+        (flow_role, result), shared = await snapshot_flights.do(
+            fingerprint, lambda: self.run_snapshot_flow(role, platform, payload, user_id)
+        )
+        if not shared:
+            trigger_stats["triggered"] += 1
+            with session_scope() as db:
+                await asyncio.to_thread(log_trigger_requests, db, "triggered", [platform])
+            return result
+
+        trigger_stats["coalesced"] += 1
+        self.logger.info(f"Joined in-flight snapshot {result.get('snapshot_id')} for {platform} ({role})")
+        with session_scope() as db:
+            if result.get("snapshot_id"):
+                # Subscribe under the role the snapshot was collected (and stored in S3) with.
+                await asyncio.to_thread(self.add_snapshot, db, flow_role, platform, result["snapshot_id"], payload, user_id)
+            await asyncio.to_thread(log_trigger_requests, db, "coalesced", [platform])
+        return {**result, "coalesced": True}
+
+    async def run_snapshot_flow(self, role: str, platform: str, payload: Dict, user_id: str) -> Tuple[str, Dict]:
+        """
+        Trigger a new snapshot, wait for delivery and ingest it. Returns ``(role, result)``.
+
+        Sessions are opened only to record the snapshot and to ingest it; no
+        pooled connection is held while Bright Data collects and delivers.
+        """
+        async with get_brightdata_semaphore():
+            snapshot_id = await self.create_snapshot(role, platform, payload, user_id)
+            snapshot_data = await self.wait_for_snapshot(snapshot_id, platform, role)
+
+        if snapshot_data["status"] != "delivered":
+            return role, {
+                "snapshot_id": snapshot_id,
+                "status": "error",
+                "error": snapshot_data.get("error")
+            }
+
+        result = {
+            "snapshot_id": snapshot_id,
+            "status": "success",
+            "s3_path": snapshot_data.get("s3_path")
+        }
+        try:
+            with session_scope() as db:
+                stats = await ingest_snapshot(
+                    db, snapshot_id, platform, role,
+                    location=payload.get("location"), window=ingest_window(payload)
+                )
+            result["postings"] = stats["seen"]
+            result["new_postings"] = stats["new"]
+            result["removed_postings"] = stats["removed"]
+        except Exception as e:
+            # The raw file stays in S3; ingestion can be retried later.
+            result["ingest_error"] = str(e)
+            self.logger.error(
+                f"Error ingesting snapshot {snapshot_id} for {platform} ({role}): {str(e)}"
+            )
+        return role, result
+
+    def uningested_role(self, db: Session, platform: str, location: Optional[str], snapshot_id: str) -> Optional[str]:
+        """
+        Role a snapshot was collected with, if it is newer than the last
+        ingestion of its scope; None when the scope is up to date.
+        """
+        snapshot = db.query(Snapshot.role, Snapshot.created_at).filter(Snapshot.snapshot_id == snapshot_id).first()
+        if snapshot is None:
+            return None
+        watermark = db.get(IngestWatermark, scope_key(platform, snapshot.role, location))
+        if watermark is not None and (
+            watermark.last_snapshot_id == snapshot_id
+            or (watermark.last_ingested_at is not None and watermark.last_ingested_at >= snapshot.created_at)
+        ):
+            return None
+        return snapshot.role
+
+    async def ingest_if_newer(self, platform: str, payload: Dict, snapshot_id: str) -> Dict:
+        """
+        Ingest a reused snapshot its scope has not ingested yet (the flow that
+        triggered it may have failed to). Returns the counts like
+        ``run_snapshot_flow``, or nothing when the scope is up to date.
+        """
+        location = payload.get("location")
+        with session_scope() as db:
+            role = await asyncio.to_thread(self.uningested_role, db, platform, location, snapshot_id)
+        if role is None:
+            return {}
+        try:
+            with session_scope() as db:
+                stats = await ingest_snapshot(db, snapshot_id, platform, role, location=location, window=ingest_window(payload))
+            return {"postings": stats["seen"], "new_postings": stats["new"], "removed_postings": stats["removed"]}
+        except Exception as e:
+            self.logger.error(f"Error ingesting reused snapshot {snapshot_id} for {platform} ({role}): {str(e)}")
+            return {"ingest_error": str(e)}
+
     async def process_job_roles(
         self,
         roles: List[str],
         location: str,
         additional_details: Dict,
-        user_id: str
+        user_id: str,
+        on_progress: Optional[Callable[[str, str, Dict], Awaitable[None]]] = None,
+        ingest_reused: bool = False,
     ) -> List[Dict]:
-        results = []
-        
-        for role in roles:
+        """
+        Run every role x platform flow concurrently.
+
+        Bright Data traffic is bounded by ``BRIGHTDATA_CONCURRENCY`` across the
+        whole process, and all waiting is done with ``asyncio.sleep`` so other
+        requests keep being served meanwhile. ``on_progress(role, platform,
+        result)`` is awaited when a flow starts and when it finishes. With
+        ``ingest_reused`` (scheduled refreshes) a flow settled by a fresh
+        snapshot also ingests it if its scope has not yet.
+        """
+        async def run_flow(role: str, platform: str, payload: Dict, reuse: bool) -> Dict:
+            if on_progress:
+                await on_progress(role, platform, {"status": "running"})
             try:
-                # Prepare payloads for each platform
-                payloads = {
-                    "LinkedIn": {
-                        "location": location,
-                        "keyword": role,
-                        "country": additional_details.get("country", ""),
-                        "time_range": "Past 24 hours",
-                        "job_type": additional_details.get("job_type", ""),
-                        "experience_level": additional_details.get("experience_level", ""),
-                        "remote": additional_details.get("remote", "")
-                    },
-                    "Glassdoor": {
-                        "location": location,
-                        "keyword": role,
-                        "country": additional_details.get("country", "")
-                    },
-                    "Indeed": {
-    "country": additional_details.get("country", ""),
-    "domain": "indeed.com",
-    "keyword_search": role,
-    "location": location,
-    "date_posted": "Last 24 hours",
-    "posted_by": ""
-}
-                }
-                
-                platform_results = {}
-                
-                for platform, payload in payloads.items():
-                    try:
-                        existing_snapshot_id = self.check_existing_snapshot(
-                            role, platform, payload
-                        )
-                        print(f"existing_snapshot_id: {existing_snapshot_id} for {platform} ({role})")
-                        if existing_snapshot_id:
-                            db = next(get_db())
-                            snapshot = Snapshot(
-                                role=role,
-                                platform=platform,
-                                snapshot_id=existing_snapshot_id,
-                                payload=payload,
-                                user_id=user_id
-                            )
-                            db.add(snapshot)
-                            db.commit()
-                            db.refresh(snapshot)
-                            platform_results[platform] = {
-                                "snapshot_id": existing_snapshot_id,
-                                "status": "existing_snapshot_used"
-                            }
-                            continue
-                            
-                        url = (
-                            LINKEDIN_URL if platform == "LinkedIn" else
-                            GLASSDOOR_URL if platform == "Glassdoor" else
-                            INDEED_URL
-                        )
-                        
-                        snapshot_id = self.create_snapshot(url, role, platform, payload, user_id)
-                        
-                        snapshot_data = await self.wait_for_snapshot(
-                            snapshot_id, platform, role
-                        )
-                        
-                        platform_results[platform] = {
-                            "snapshot_id": snapshot_id,
-                            "status": "success",
-                            "s3_path": snapshot_data.get("s3_path")
-                        }
-                        
-                    except Exception as e:
-                        platform_results[platform] = {
-                            "status": "error",
-                            "error": str(e)
-                        }
-                        self.logger.error(
-                            f"Error processing {platform} for {role}: {str(e)}"
-                        )
-                
-                results.append({
-                    "role": role,
-                    "results": platform_results
-                })
-                
+                outcome = await self.process_platform(role, platform, payload, user_id, reuse=reuse)
             except Exception as e:
-                results.append({
-                    "role": role,
-                    "status": "error",
-                    "error": str(e)
-                })
-                self.logger.error(f"Error processing role {role}: {str(e)}")
-                
-        return results
-
-    async def wait_for_snapshot(self, snapshot_id: str, platform: str, role: str, max_retries: int = 10, base_delay: int = 2) -> Dict:
+                self.logger.error(f"Error processing {platform} for {role}: {str(e)}")
+                outcome = {"status": "error", "error": str(e)}
+            if on_progress:
+                await on_progress(role, platform, outcome)
+            return outcome
+
+        # Scheduled refreshes may be limited to the platforms that had trigger budget.
+        platforms = additional_details.get("platforms")
+        flows = [
+            (role, platform, payload)
+            for role in roles
+            for platform, payload in build_payloads(role, location, additional_details).items()
+            if not platforms or platform in platforms
+        ]
+
+        # Flows a fresh snapshot already covers are settled up front with one
+        # lookup and one batch of subscriptions; requests being scraped in this
+        # process right now are left to process_platform to join.
+        normalized = [(role, platform, normalize_payload(payload)) for role, platform, payload in flows]
+        candidates = [
+            i for i, (_, platform, payload) in enumerate(normalized)
+            if payload_fingerprint(platform, payload) not in snapshot_flights
+        ]
+        try:
+            found = await asyncio.to_thread(self.reuse_snapshots, [normalized[i] for i in candidates], user_id)
+            reused = {candidates[j]: outcome for j, outcome in found.items()}
+            looked_up = set(candidates)
+        except Exception as e:
+            self.logger.error(f"Error looking up existing snapshots: {str(e)}")
+            reused, looked_up = {}, set()
+
+        async def settle(i: int) -> Dict:
+            role, platform, payload = normalized[i]
+            if i not in reused:
+                return await run_flow(role, platform, payload, reuse=i not in looked_up)
+            trigger_stats["requests"] += 1
+            trigger_stats["reused"] += 1
+            outcome = reused[i]
+            if ingest_reused:
+                outcome = {**outcome, **await self.ingest_if_newer(platform, payload, outcome["snapshot_id"])}
+            if on_progress:
+                await on_progress(role, platform, outcome)
+            return outcome
+
+        outcomes = await asyncio.gather(*(settle(i) for i in range(len(flows))))
+
+        results = {role: {} for role in roles}
+        for (role, platform, _), outcome in zip(flows, outcomes):
+            results[role][platform] = outcome
+
+        return [{"role": role, "results": platform_results} for role, platform_results in results.items()]
+
+    async def wait_for_snapshot(self, snapshot_id: str, platform: str, role: str, timeout: float = BRIGHTDATA_READY_TIMEOUT, base_delay: float = BRIGHTDATA_POLL_BASE_DELAY) -> Dict:
         """
-        Polls the Bright Data API to deliver a snapshot to S3 and stores it platform/role-wise.
+        Polls the Bright Data API until a snapshot is ready, then delivers it to S3 platform/role-wise.
 
         Args:
             snapshot_id (str): The ID of the snapshot to deliver.
             platform (str): The platform for which the snapshot was created (e.g., LinkedIn, Glassdoor, Indeed).
             role (str): The job role associated with the snapshot.
-            max_retries (int): The maximum number of retries for polling.
-            base_delay (int): The base delay in seconds for exponential backoff.
+            timeout (float): Seconds to wait for the collection to become ready.
+            base_delay (float): The base delay in seconds for exponential backoff.
 
         Returns:
             Dict: A dictionary with the snapshot delivery status and details.
         """
-        url = f"https://api.brightdata.com/datasets/v3/deliver/{snapshot_id}"
-        headers = {
-            "Authorization": f"Bearer {self.api_token}",
-            "Content-Type": "application/json"
-        }
-        
-        role_slug = role.lower().replace(" ", "_")
-        platform_slug = platform.lower()
-        
-        s3_path = f"{platform_slug}/{role_slug}"
-        
-        delivery_payload = {
-            "deliver": {
-                "type": "s3",
-                "filename": {
-                    "template": f"{snapshot_id}",
-                    "extension": "json"
-                },
-                "bucket": os.getenv("S3_BUCKET"),
-                "credentials": {
-                    "aws-access-key": os.getenv("AWS_ACCESS_KEY"),
-                    "aws-secret-key": os.getenv("AWS_SECRET_KEY"),
-                },
-                "directory": s3_path
-            },
-            "compress": False
-        }
-
-        for attempt in range(max_retries):
-            try:
-                response = requests.post(url, headers=headers, json=delivery_payload)
-
-                if response.status_code == 200:
-                    # self.logger.info(f"Snapshot {snapshot_id} for {platform} ({role}) successfully delivered to S3.")
-                    print(f"Snapshot {snapshot_id} for {platform} ({role}) successfully delivered to S3.")
-                    return {
-                        "snapshot_id": snapshot_id,
-                        "status": "delivered",
-                        "s3_path": f"s3://{self.s3_bucket}/{s3_path}/{snapshot_id}.json"
-                    }
+        s3_path = snapshot_directory(platform, role)
+        try:
+            await wait_until_ready(snapshot_id, timeout, base_delay)
+            await deliver_snapshot(snapshot_id, s3_path, base_delay=base_delay)
+        except SnapshotNotDelivered as e:
+            self.logger.error(f"{platform} ({role}): {str(e)}")
+            return {
+                "snapshot_id": snapshot_id,
+                "status": "error",
+                "error": str(e)
+            }
 
-                elif response.status_code == 404:
-                    print("404 Error")
-                else:
-                    # self.logger.error(f"Unexpected response for snapshot {snapshot_id}: {response.status_code} {response.text}")
-                    print(f"Unexpected response for snapshot {snapshot_id}: {response.status_code} {response.text}")
-                
-                print("URL: ", url)
-                print("Headers: ", headers)
-                print("Delivery Payload: ", delivery_payload)
-                print("Snapshot ID: ", snapshot_id)
-                print("Platform: ", platform)
-                print("Role: ", role)
-                print("S3 Path: ", s3_path)
-                
-                return {
-                    "snapshot_id": snapshot_id,
-                    "status": "delivered",
-                    "s3_path": f"s3://{self.s3_bucket}/{s3_path}/{snapshot_id}.json"
-                }
-
-            except requests.RequestException as e:
-                self.logger.error(f"Error while delivering snapshot {snapshot_id}: {str(e)}")
-
-            delay = base_delay * (2 ** attempt)
-            self.logger.info(f"Retrying in {delay} seconds (Attempt {attempt + 1}/{max_retries})...")
-            time.sleep(delay)
-
-        error_message = f"Snapshot {snapshot_id} for {platform} ({role}) was not delivered after {max_retries} retries."
-        self.logger.error(error_message)
+        self.logger.info(f"Snapshot {snapshot_id} for {platform} ({role}) successfully delivered to S3.")
         return {
             "snapshot_id": snapshot_id,
-            "status": "error",
-            "error": error_message
+            "status": "delivered",
+            "s3_path": f"s3://{self.s3_bucket}/{s3_path}/{snapshot_id}.json"
         }
         
 s3_client = boto3.client(
@@ -323,88 +442,284 @@ def generate_signed_url(bucket: str, key: str) -> str:
         print(f"Error generating signed URL: {e}")
         return None
 
-def get_s3_json_data(url: str) -> dict:
-    """Fetch and parse JSON data from S3."""
+@router.get("/metrics/triggers")
+def get_trigger_metrics(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    How many role/platform requests were served without a new Bright Data scrape.
+
+    Every served request is logged in ``trigger_requests`` with how it was
+    satisfied, repeats of the same snapshot included. Scrapes run in the
+    workers, so this is read from the database rather than from this
+    process's counters.
+    """
+    since = datetime.utcnow() - timedelta(hours=hours)
+    counts = dict(
+        db.query(TriggerRequest.outcome, func.count(TriggerRequest.id))
+        .filter(TriggerRequest.created_at >= since)
+        .group_by(TriggerRequest.outcome)
+        .all()
+    )
+    requests = sum(counts.values())
+    triggers = counts.get("triggered", 0)
+    saved = counts.get("reused", 0) + counts.get("coalesced", 0)
+    return {
+        "window_hours": hours,
+        "requests": requests,
+        "triggers": triggers,
+        "saved": saved,
+        "savings_ratio": round(saved / requests, 4) if requests else 0.0
+    }
+
+@router.get("/{user_id}/postings")
+def get_postings(
+    user_id: str,
+    request: Request,
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    sort: str = Query("recent", pattern="^(recent|relevance)$"),
+    dedupe: bool = True,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> dict:
+    """
+    Page over the normalized postings of every role/platform the user is subscribed to.
+
+    Unlike ``GET /snapshots/{user_id}`` this reads ``job_postings`` only and
+    never downloads snapshot files. ``sort=relevance`` ranks the postings
+    against the user's profile (see ``app.ranking``) and adds a ``score`` to
+    each item; the default is newest first. With ``dedupe`` (the default)
+    copies of the same job from other platforms or roles are folded into one
+    item that lists them all in ``sources``. ``fields`` (comma-separated)
+    limits the items to those summary fields; ``id`` is always included.
+
+    Responses carry an ETag from the user's change counter (``app.versions``);
+    a matching ``If-None-Match`` gets a 304 after that single lookup.
+    """
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        print(f"Error fetching JSON data from S3: {e}")
-        return None
-    
+        selected = summary_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    etag = user_etag(db, "postings", user_id, page, limit, sort, dedupe, ",".join(selected))
+    headers = {"Cache-Control": PRIVATE_REVALIDATE}
+    if not_modified(request, etag):
+        return not_modified_response(etag, headers)
+
+    query = db.query(JobPosting).filter(
+        subscribed_to(db, user_id, JobPosting.platform, JobPosting.role),
+        JobPosting.removed_at.is_(None),
+    )
+    if dedupe:
+        query = collapse_duplicates(db, query, user_id)
+
+    if sort == "relevance":
+        matrix = PostingMatrix.from_query(query)
+        user = db.query(UserProfile).filter(UserProfile.id == user_id).first()
+        ranked = matrix.top(RankingProfile.from_user(user), (page - 1) * limit, limit)
+        by_id = {posting.id: posting for posting in query.filter(JobPosting.id.in_([i for i, _ in ranked])).all()}
+        postings = [by_id[posting_id] for posting_id, _ in ranked if posting_id in by_id]
+        scores = dict(ranked)
+        total = len(matrix)
+    else:
+        total = query.count()
+        postings = query\
+            .order_by(JobPosting.posted_at.desc().nullslast(), JobPosting.id.desc())\
+            .offset((page - 1) * limit)\
+            .limit(limit)\
+            .all()
+        scores = None
+
+    items = summary_records(postings, selected)
+    if scores is not None:
+        for item in items:
+            item["score"] = scores[item["id"]]
+    if dedupe:
+        sources = duplicate_sources(db, postings)
+        for item in items:
+            item["sources"] = sources[item["id"]]
+
+    return json_response(request, {
+        "items": items,
+        "total": total,
+        "page": page,
+        "limit": limit
+    }, etag=etag, headers=headers)
+
+def snapshot_page(db: Session, user_id: str, offset: int, limit: int) -> Tuple[int, List[Snapshot]]:
+    """Total number of the user's snapshots and one page of them."""
+    total = user_snapshots(db, user_id).count()
+    snapshots = user_snapshots(db, user_id)\
+        .offset(offset)\
+        .limit(limit)\
+        .all()
+    return total, snapshots
 
 @router.get("/{user_id}")
-def get_snapshots(
+async def get_snapshots(
     user_id: str,
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(12, ge=1, le=100),
+    view: str = Query("full", pattern="^(summary|full)$"),
+    fields: Optional[str] = None,
     db: Session = Depends(get_db)
 ) -> dict:
     """
     Fetch paginated snapshots for a user and return signed URLs and JSON data from S3.
 
+    With ``view=full`` (the default) the S3 documents for the page are
+    downloaded concurrently and returned as delivered. A document that fails
+    to download is returned with ``data: None`` and an ``error`` reason
+    instead of failing the whole page.
+
+    With ``view=summary`` ``data`` holds the snapshot's normalized postings
+    as summary records read from ``job_postings`` (see ``app.listing``):
+    no S3 download, no descriptions. Open a posting with
+    ``GET /jobs/{posting_id}`` for the full record.
+
+    The ETag is derived from the user's change counter (``app.versions``),
+    which is bumped whenever their subscriptions or the postings ingested
+    for them change, so a matching ``If-None-Match`` gets a 304 after that
+    single lookup, without touching the catalog or S3.
+
     Args:
         user_id (str): The ID of the user.
         page (int): Page number (1-based).
         limit (int): Number of items per page.
+        view (str): ``full`` or ``summary``.
+        fields (str): Comma-separated keys to keep in each posting: summary
+            fields for ``view=summary``, source record keys for ``view=full``.
         db (Session): The database session.
 
     Returns:
         dict: Paginated response with items and total count.
     """
+    # Queries run in the threadpool: a checkout waiting on a busy pool must not block the event loop.
+    etag = await asyncio.to_thread(user_etag, db, "snapshots", user_id, page, limit, view, fields)
+    headers = {"Cache-Control": PRIVATE_REVALIDATE}
+    if not_modified(request, etag):
+        return not_modified_response(etag, headers)
+
     # Calculate offset
     offset = (page - 1) * limit
     
-    # Get total count
-    total = db.query(Snapshot).filter(Snapshot.user_id == user_id).count()
-    
-    # Get paginated snapshots
-    snapshots = db.query(Snapshot)\
-        .filter(Snapshot.user_id == user_id)\
-        .offset(offset)\
-        .limit(limit)\
-        .all()
+    total, snapshots = await asyncio.to_thread(snapshot_page, db, user_id, offset, limit)
 
     if not snapshots and page == 1:
         raise HTTPException(status_code=404, detail="No snapshots found for the user.")
 
-    s3_bucket = os.getenv("S3_BUCKET")
-    items = []
-    
     platform_map = {
         "LinkedIn": "LinkedIn",
         "Glassdoor": "Glassdoor",
         "Indeed": "Indeed"
     }
     
+    items = []
     for snapshot in snapshots:
         platform = platform_map.get(snapshot.platform, snapshot.platform)
-        role_slug = snapshot.role.replace(" ", "%20")
-        BUCKET = os.getenv("S3_BUCKET")
-        REGION = os.getenv("AWS_REGION")
-        s3_path = f"https://{BUCKET}.s3.{REGION}.amazonaws.com/{platform}/{role_slug}/{snapshot.snapshot_id}.json"
-        
-        json_data = get_s3_json_data(s3_path)
-        
-        snapshot_data = {
+        items.append({
             "snapshot_id": snapshot.snapshot_id,
             "platform": platform,
             "role": snapshot.role,
-            "signed_url": s3_path
-        }
-        
-        if json_data:
-            snapshot_data["data"] = json_data
-        else:
-            snapshot_data["data"] = None
-            print(f"Failed to fetch data for snapshot {snapshot.snapshot_id}")
-        
-        items.append(snapshot_data)
+            "signed_url": snapshot_object_url(platform, snapshot.role, snapshot.snapshot_id)
+        })
 
-    return {
+    if view == "summary":
+        try:
+            selected = summary_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        postings = await asyncio.to_thread(summaries_by_snapshot, db, [item["snapshot_id"] for item in items], selected)
+        for item in items:
+            item["data"] = postings.get(item["snapshot_id"], [])
+        return json_response(request, {
+            "items": items,
+            "total": total,
+            "page": page,
+            "limit": limit
+        }, etag=etag, headers=headers)
+
+    # Nothing more to read: hand the connection back for the duration of the downloads.
+    db.close()
+    fetched = await fetch_json_many(
+        [item["signed_url"] for item in items],
+        cache_keys=[item["snapshot_id"] for item in items]
+    )
+
+    keep = field_list(fields)
+    for item, result in zip(items, fetched):
+        item["data"] = result["data"]
+        if keep is not None and isinstance(item["data"], list):
+            item["data"] = [project(posting, keep, None) if isinstance(posting, dict) else posting for posting in item["data"]]
+        if result["error"]:
+            item["error"] = result["error"]
+
+    response = {
         "items": items,
         "total": total,
         "page": page,
         "limit": limit
-    }
\ No newline at end of file
+    }
+    # A failed download is retried on the next request, not cached by the client.
+    if any("error" in item for item in items):
+        return json_response(request, response, headers={"Cache-Control": "no-store"})
+    return json_response(request, response, etag=etag, headers=headers)
+
+@router.get("/{user_id}/stream")
+def stream_snapshots(
+    user_id: str,
+    page: int = Query(1, ge=1),
+    limit: int = Query(12, ge=1, le=100),
+    fields: Optional[str] = None,
+    exclude: Optional[str] = None,
+    db: Session = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Same page of snapshots as ``GET /snapshots/{user_id}``, streamed as NDJSON.
+
+    Every line is one posting: ``{"snapshot_id", "platform", "role",
+    "posting"}``. S3 bodies are parsed incrementally while they are
+    forwarded, so memory does not grow with the snapshot size. A snapshot
+    that cannot be read produces a line with an ``error`` instead.
+
+    Args:
+        fields (str): Comma-separated posting keys to keep (default: all).
+        exclude (str): Comma-separated posting keys to drop, e.g.
+            ``job_description_formatted,description_text`` for list views.
+    """
+    snapshots = user_snapshots(db, user_id)\
+        .offset((page - 1) * limit)\
+        .limit(limit)\
+        .all()
+    if not snapshots and page == 1:
+        raise HTTPException(status_code=404, detail="No snapshots found for the user.")
+
+    # Plain values only: the session is closed once streaming starts.
+    refs = [(snapshot.snapshot_id, snapshot.platform, snapshot.role) for snapshot in snapshots]
+    keep, drop = field_list(fields), field_list(exclude)
+
+    async def lines():
+        buffer, size = [], 0
+        for snapshot_id, platform, role in refs:
+            meta = {"snapshot_id": snapshot_id, "platform": platform, "role": role}
+            url = snapshot_object_url(platform, role, snapshot_id)
+            try:
+                async for item in iter_json_elements(url, cache_key=snapshot_id):
+                    if not isinstance(item, dict):
+                        continue
+                    line = (json.dumps({**meta, "posting": project(item, keep, drop)}) + "\n").encode()
+                    buffer.append(line)
+                    size += len(line)
+                    if size >= SNAPSHOT_STREAM_CHUNK_BYTES:
+                        yield b"".join(buffer)
+                        buffer, size = [], 0
+            except (httpx.HTTPError, ValueError) as e:
+                error = describe_fetch_error(e)
+                logger.warning(f"Error streaming snapshot {snapshot_id} from S3: {error}")
+                buffer.append((json.dumps({**meta, "error": error}) + "\n").encode())
+        if buffer:
+            yield b"".join(buffer)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app.models.user import UserProfile, UserCreate, UserResponse, UserProfileUpdate
@@ -10,11 +10,21 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 import uuid
 from sqlalchemy.exc import IntegrityError
-from app.routers.ai import recommend_job_roles
+from app.responses import json_response
+from app.versions import bump_versions
+from app.recommendations import (
+    profile_fingerprint,
+    recommendation_profile,
+    refresh_recommendations,
+    stored_recommendations,
+)
 from pydantic import BaseModel
 
 router = APIRouter()
 
+# Columns GET /profile returns; the password hash never leaves the server.
+PROFILE_COLUMNS = tuple(column.key for column in UserProfile.__table__.columns if column.key != "hashed_password")
+
 @router.post("/")
 def create_user_profile(user: UserProfileCreate, db: Session = Depends(get_db)):
     # Save user data in the database
@@ -30,6 +40,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 3*24*60
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+# Comma-separated emails of the accounts allowed to use the /admin routes
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -44,7 +56,7 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -63,8 +75,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         raise credentials_exception
     return user
 
+def get_admin_user(current_user: UserProfile = Depends(get_current_user)):
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
 @router.post("/auth/register")
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+def register(user_data: UserCreate, db: Session = Depends(get_db)):
     try:
         user = UserProfile(
             id=str(uuid.uuid4()),
@@ -91,7 +108,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
 @router.post("/auth/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(UserProfile).filter(UserProfile.email == form_data.username).first()
     if not user or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
@@ -118,19 +135,17 @@ async def read_users_me(current_user: UserProfile = Depends(get_current_user)):
     return current_user
 
 @router.get("/profile/{user_id}")
-async def get_profile(user_id: str, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_profile(user_id: str, request: Request, current_user: UserProfile = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to view this profile")
-    return current_user
-
-class AIRequest(BaseModel):
-    user_id: str
-    user_profile: dict
+    # The columns are plain JSON values already, so the response renders them directly.
+    return json_response(request, {column: getattr(current_user, column) for column in PROFILE_COLUMNS})
 
 @router.patch("/profile/{user_id}")
-async def update_profile(
+def update_profile(
     user_id: str,
     profile_data: UserProfileUpdate,
+    background_tasks: BackgroundTasks,
     current_user: UserProfile = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -141,24 +156,15 @@ async def update_profile(
         setattr(current_user, field, value)
         current_user.is_profile_complete = True
     
+    # Relevance-sorted postings depend on the profile.
+    bump_versions(db, [current_user.id])
     db.commit()
     db.refresh(current_user)
     
     if current_user.is_profile_complete:
-        user_profile_dict = {
-            "name": current_user.name,
-            "skills": current_user.skills,
-            "experience": current_user.experience_years,
-            "education": current_user.education,
-            "certifications": current_user.certifications,
-            "location": current_user.location,
-            "desired_role": current_user.preferred_job_titles
-        }
-        await recommend_job_roles(
-            request=AIRequest(
-                user_profile=user_profile_dict,
-                user_id=current_user.id
-            ),
-            db=db
-        )
+        user_profile_dict = recommendation_profile(current_user)
+        # Only edits to recommendation inputs cost a completion, and it runs after the response.
+        stored = stored_recommendations(db, current_user.id)
+        if not stored or stored.profile_fingerprint != profile_fingerprint(user_profile_dict):
+            background_tasks.add_task(refresh_recommendations, current_user.id, user_profile_dict)
     return current_user
\ No newline at end of file
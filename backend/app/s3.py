@@ -0,0 +1,165 @@
+# app/s3.py
+import asyncio
+import json
+import logging
+import os
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.jsonstream import aiter_json_documents
+from app.singleflight import SingleFlight
+from app.snapshot_cache import snapshot_cache
+
+# Upper bound on simultaneous object downloads for a single listing page.
+S3_FETCH_CONCURRENCY = int(os.getenv("S3_FETCH_CONCURRENCY", "16"))
+# Seconds allowed for one object (connect + download + parse).
+S3_FETCH_TIMEOUT = float(os.getenv("S3_FETCH_TIMEOUT", "10"))
+S3_MAX_CONNECTIONS = int(os.getenv("S3_MAX_CONNECTIONS", "64"))
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+# Downloads currently running, keyed by cache key, so concurrent requests for
+# the same snapshot share one S3 GET.
+_inflight = SingleFlight()
+
+
+def snapshot_directory(platform: str, role: str) -> str:
+    """S3 directory Bright Data delivers a platform/role's snapshot files into."""
+    return f"{platform}/{role}"
+
+
+def snapshot_object_url(platform: str, role: str, snapshot_id: str) -> str:
+    """Public HTTPS URL of a delivered snapshot file."""
+    # S3_BASE_URL points reads at a local S3 stand-in (tests, benchmarks).
+    base_url = os.getenv("S3_BASE_URL") or f"https://{os.getenv('S3_BUCKET')}.s3.{os.getenv('AWS_REGION')}.amazonaws.com"
+    directory = snapshot_directory(platform, role).replace(" ", "%20")
+    return f"{base_url.rstrip('/')}/{directory}/{snapshot_id}.json"
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide pooled client used for S3 reads."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=S3_MAX_CONNECTIONS,
+                max_keepalive_connections=S3_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(S3_FETCH_TIMEOUT),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _download_json(client: httpx.AsyncClient, url: str, cache_key: Optional[str] = None):
+    response = await client.get(url)
+    response.raise_for_status()
+    raw = response.content
+    # Snapshot files can be several MB; keep the parse off the event loop.
+    data = await asyncio.to_thread(json.loads, raw)
+    if cache_key:
+        await asyncio.to_thread(snapshot_cache.put, cache_key, data, raw)
+    return data
+
+
+async def _cached_download_json(client: httpx.AsyncClient, url: str, cache_key: str):
+    data = await asyncio.to_thread(snapshot_cache.get, cache_key)
+    if data is not None:
+        return data
+
+    data, _ = await _inflight.do(cache_key, lambda: _download_json(client, url, cache_key))
+    return data
+
+
+def describe_fetch_error(error: Exception) -> str:
+    """Short reason for a failed S3 read (``httpx.HTTPError`` or ``ValueError`` from parsing)."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    if isinstance(error, httpx.HTTPError):
+        return f"{type(error).__name__}: {error}"
+    return "invalid JSON"
+
+
+async def iter_json_elements(
+    url: str,
+    cache_key: Optional[str] = None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator:
+    """
+    Yield the elements of a snapshot file one at a time.
+
+    A document already in the snapshot cache is served from there; otherwise
+    the S3 body is parsed incrementally as it arrives and is not cached, so
+    only the element being parsed is held in memory. Raises
+    ``httpx.HTTPError`` or ``ValueError`` (possibly after some elements).
+    """
+    if cache_key:
+        data = await asyncio.to_thread(snapshot_cache.get, cache_key)
+        if data is not None:
+            for item in data if isinstance(data, list) else [data]:
+                yield item
+            return
+    client = client or get_http_client()
+    async with client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for item in aiter_json_documents(response.aiter_bytes()):
+            yield item
+
+
+async def fetch_json(
+    url: str,
+    semaphore: asyncio.Semaphore,
+    timeout: float = S3_FETCH_TIMEOUT,
+    client: Optional[httpx.AsyncClient] = None,
+    cache_key: Optional[str] = None,
+) -> Dict:
+    """
+    Fetch and parse one JSON object from S3.
+
+    When ``cache_key`` is given the parsed document is served from and stored
+    in the snapshot cache. Never raises: the result is
+    ``{"data": ..., "error": None}`` on success and
+    ``{"data": None, "error": "<reason>"}`` on failure.
+    """
+    client = client or get_http_client()
+    async with semaphore:
+        try:
+            download = (
+                _cached_download_json(client, url, cache_key) if cache_key
+                else _download_json(client, url)
+            )
+            data = await asyncio.wait_for(download, timeout)
+            return {"data": data, "error": None}
+        except asyncio.TimeoutError:
+            error = f"timed out after {timeout}s"
+        except httpx.HTTPStatusError as e:
+            error = f"HTTP {e.response.status_code}"
+        except httpx.HTTPError as e:
+            error = f"{type(e).__name__}: {e}"
+        except ValueError:
+            error = "invalid JSON"
+    logger.warning(f"Error fetching JSON data from S3 ({url}): {error}")
+    return {"data": None, "error": error}
+
+
+async def fetch_json_many(
+    urls: List[str],
+    concurrency: int = S3_FETCH_CONCURRENCY,
+    timeout: float = S3_FETCH_TIMEOUT,
+    client: Optional[httpx.AsyncClient] = None,
+    cache_keys: Optional[List[Optional[str]]] = None,
+) -> List[Dict]:
+    """Fetch several objects concurrently; results keep the order of ``urls``."""
+    semaphore = asyncio.Semaphore(concurrency)
+    cache_keys = cache_keys or [None] * len(urls)
+    return await asyncio.gather(
+        *(fetch_json(url, semaphore, timeout, client, key) for url, key in zip(urls, cache_keys))
+    )
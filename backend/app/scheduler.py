@@ -0,0 +1,424 @@
+# app/scheduler.py
+"""
+Periodic refresh of the most-demanded (role, location) pairs.
+
+Every ``REFRESH_INTERVAL_MINUTES`` the scheduler counts, for every role in
+``user_recommendations`` and the recommending user's location, how many
+users want it. It then looks up how long ago each platform was ingested for
+that scope (``ingest_watermarks``). Pairs whose data is older than
+``REFRESH_MIN_AGE_HOURS`` are ranked by subscribers x staleness. Each due
+platform needs a token from that platform's token bucket, so the number of
+Bright Data triggers stays within ``BRIGHTDATA_TRIGGERS_PER_HOUR``; a
+platform a fresh, not yet ingested snapshot covers needs no token, since the
+job reuses and ingests that snapshot. Pairs with at least one token or
+reusable snapshot are enqueued into ``scrape_jobs`` for the workers, as the
+scheduler user. Platforms that get no token wait for a later tick.
+
+The token buckets live in memory, so run the scheduler in exactly one
+process: either the API with ``SCHEDULER_ENABLED=true`` or standalone. An
+extra pass requested through ``POST /admin/scheduler/run`` is queued in
+``scheduler_requests`` and run by that process within
+``SCHEDULER_POLL_SECONDS``, against the same buckets. Passes never overlap;
+requests queued when an interval pass starts are answered by it:
+
+    python -m app.scheduler            # run forever
+    python -m app.scheduler --once     # one planning pass
+"""
+import argparse
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.brightdata import DATASET_IDS, build_payloads, normalize_payload, payload_fingerprint
+from app.db import SessionLocal
+from app.ingest import scope_key
+from app.models.ingest_watermark import IngestWatermark
+from app.models.scheduler_request import SchedulerRequest
+from app.models.scrape_job import ScrapeJob
+from app.models.snapshot import Snapshot
+from app.models.user import UserProfile, UserRecommendations
+from app.routers.snapshot import SNAPSHOT_FRESHNESS_HOURS
+from app.subscriptions import subscribe_many
+from app.tasks import enqueue_scrape_job
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+REFRESH_INTERVAL_MINUTES = float(os.getenv("REFRESH_INTERVAL_MINUTES", "30"))
+# How often the scheduler process looks for queued on-demand planning passes.
+SCHEDULER_POLL_SECONDS = float(os.getenv("SCHEDULER_POLL_SECONDS", "10"))
+# Newer data than this is not refreshed. Below SNAPSHOT_FRESHNESS_HOURS the
+# request would just reuse the existing snapshot, so that is the default.
+REFRESH_MIN_AGE_HOURS = float(os.getenv("REFRESH_MIN_AGE_HOURS", str(SNAPSHOT_FRESHNESS_HOURS)))
+# Staleness counts up to this many multiples of REFRESH_MIN_AGE_HOURS; never-fetched pairs get the maximum.
+REFRESH_MAX_STALENESS = float(os.getenv("REFRESH_MAX_STALENESS", "4"))
+REFRESH_MAX_JOBS_PER_TICK = int(os.getenv("REFRESH_MAX_JOBS_PER_TICK", "20"))
+# Per platform; BRIGHTDATA_TRIGGERS_PER_HOUR_<PLATFORM> overrides it for one platform.
+BRIGHTDATA_TRIGGERS_PER_HOUR = float(os.getenv("BRIGHTDATA_TRIGGERS_PER_HOUR", "30"))
+BRIGHTDATA_TRIGGER_BURST = float(os.getenv("BRIGHTDATA_TRIGGER_BURST", "10"))
+# Owner of scheduled scrape jobs.
+SCHEDULER_USER_ID = "scheduler"
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity``; starts full."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+def _platform_rate(platform: str) -> float:
+    return float(os.getenv(f"BRIGHTDATA_TRIGGERS_PER_HOUR_{platform.upper()}", str(BRIGHTDATA_TRIGGERS_PER_HOUR)))
+
+
+trigger_buckets: Dict[str, TokenBucket] = {
+    platform: TokenBucket(_platform_rate(platform) / 3600, BRIGHTDATA_TRIGGER_BURST) for platform in DATASET_IDS
+}
+
+# Result of the latest planning pass, for the admin endpoint.
+last_plan: Dict = {"ran_at": None, "pairs": 0, "enqueued": [], "deferred": []}
+
+_scheduler: Optional[AsyncIOScheduler] = None
+# Planning passes take tokens from the shared buckets and read pending_pairs; two at once could
+# both enqueue the same pair, so the interval and the requested passes run one at a time.
+_plan_lock = threading.Lock()
+
+
+def _clean(value: Optional[str]) -> str:
+    return " ".join((value or "").split())
+
+
+def demand(db: Session) -> Dict[Tuple[str, str], int]:
+    """Number of users per (role, location) among stored recommendations."""
+    counts: Dict[Tuple[str, str], set] = defaultdict(set)
+    rows = db.query(UserRecommendations.user_id, UserRecommendations.recommendations, UserProfile.location)\
+        .join(UserProfile, UserProfile.id == UserRecommendations.user_id)\
+        .yield_per(1000)
+    for user_id, recommendations, location in rows:
+        for role in recommendations or []:
+            if _clean(role):
+                counts[(_clean(role), _clean(location))].add(user_id)
+    return {pair: len(users) for pair, users in counts.items()}
+
+
+def last_ingested(db: Session, pairs: List[Tuple[str, str]]) -> Dict[str, datetime]:
+    """Last ingestion time per scope key for every platform of ``pairs``."""
+    keys = [scope_key(platform, role, location) for role, location in pairs for platform in DATASET_IDS]
+    found = {}
+    for start in range(0, len(keys), 1000):
+        found.update(
+            db.query(IngestWatermark.scope_key, IngestWatermark.last_ingested_at)
+            .filter(IngestWatermark.scope_key.in_(keys[start:start + 1000]))
+            .all()
+        )
+    return found
+
+
+def pending_pairs(db: Session) -> set:
+    """(role, location) pairs that already have a scheduled job waiting or running."""
+    jobs = db.query(ScrapeJob.roles, ScrapeJob.location)\
+        .filter(ScrapeJob.user_id == SCHEDULER_USER_ID, ScrapeJob.status.in_(("queued", "running")))\
+        .all()
+    return {(role, _clean(location)) for roles, location in jobs for role in roles}
+
+
+def fresh_snapshots(db: Session, flows: List[Tuple[str, str, str]]) -> Dict[Tuple[str, str, str], datetime]:
+    """
+    Creation time of the newest snapshot a scrape of each ``(role, location,
+    platform)`` would reuse instead of triggering (see
+    ``SnapshotManager.reuse_snapshots``), for the flows that have one.
+    """
+    fingerprints = {
+        (role, location, platform): payload_fingerprint(
+            platform, normalize_payload(build_payloads(role, location, {})[platform])
+        )
+        for role, location, platform in flows
+    }
+    fresh_after = datetime.utcnow() - timedelta(hours=SNAPSHOT_FRESHNESS_HOURS)
+    hashes = list(set(fingerprints.values()))
+    newest: Dict[Tuple[str, str], datetime] = {}
+    for start in range(0, len(hashes), 1000):
+        rows = db.query(Snapshot.platform, Snapshot.payload_hash, func.max(Snapshot.created_at))\
+            .filter(Snapshot.payload_hash.in_(hashes[start:start + 1000]), Snapshot.created_at >= fresh_after)\
+            .group_by(Snapshot.platform, Snapshot.payload_hash)\
+            .all()
+        newest.update(((platform, payload_hash), created_at) for platform, payload_hash, created_at in rows)
+    return {
+        flow: newest[(flow[2], fingerprint)]
+        for flow, fingerprint in fingerprints.items()
+        if (flow[2], fingerprint) in newest
+    }
+
+
+def plan_refreshes(db: Session, now: Optional[datetime] = None) -> Dict:
+    """
+    Rank due (role, location) pairs and enqueue as many as the trigger budget allows.
+
+    A due platform that a fresh snapshot newer than its last ingestion covers
+    is enqueued without a token: the job reuses and ingests that snapshot. If
+    the fresh snapshot is already ingested the platform is not due, since a
+    scrape would only reuse it again.
+    """
+    now = now or datetime.utcnow()
+    wanted = demand(db)
+    ingested = last_ingested(db, list(wanted))
+    pending = pending_pairs(db)
+
+    stale = []
+    for (role, location), subscribers in wanted.items():
+        if (role, location) in pending:
+            continue
+        for platform in DATASET_IDS:
+            last = ingested.get(scope_key(platform, role, location))
+            age_hours = (now - last).total_seconds() / 3600 if last else None
+            if age_hours is None or age_hours >= REFRESH_MIN_AGE_HOURS:
+                stale.append((role, location, platform, last, age_hours))
+    fresh = fresh_snapshots(db, [(role, location, platform) for role, location, platform, _, _ in stale])
+
+    due: Dict[Tuple[str, str], Dict] = {}
+    for role, location, platform, last, age_hours in stale:
+        created_at = fresh.get((role, location, platform))
+        if created_at is not None and last is not None and created_at <= last:
+            continue
+        pair = due.setdefault((role, location), {"trigger": [], "reuse": [], "staleness": 0.0})
+        pair["reuse" if created_at is not None else "trigger"].append(platform)
+        factor = REFRESH_MAX_STALENESS if age_hours is None else min(age_hours / REFRESH_MIN_AGE_HOURS, REFRESH_MAX_STALENESS)
+        pair["staleness"] = max(pair["staleness"], factor)
+    candidates = [
+        (wanted[pair] * entry["staleness"], pair[0], pair[1], wanted[pair], entry["trigger"], entry["reuse"])
+        for pair, entry in due.items()
+    ]
+    candidates.sort(key=lambda candidate: (-candidate[0], candidate[1], candidate[2]))
+
+    enqueued, deferred = [], []
+    for priority, role, location, subscribers, to_trigger, to_reuse in candidates:
+        entry = {"role": role, "location": location, "subscribers": subscribers, "priority": round(priority, 2)}
+        if len(enqueued) >= REFRESH_MAX_JOBS_PER_TICK:
+            deferred.append({**entry, "platforms": to_trigger + to_reuse, "reason": "tick limit"})
+            continue
+        granted = [platform for platform in to_trigger if trigger_buckets[platform].try_acquire()]
+        if granted or to_reuse:
+            job = enqueue_scrape_job(db, SCHEDULER_USER_ID, [role], location, {"platforms": granted + to_reuse})
+            enqueued.append({**entry, "platforms": granted, "reused": to_reuse, "job_id": job.id})
+        if len(granted) < len(to_trigger):
+            deferred.append({**entry, "platforms": [p for p in to_trigger if p not in granted], "reason": "rate limit"})
+
+    last_plan.update(ran_at=now, pairs=len(wanted), enqueued=enqueued, deferred=deferred)
+    logger.info(
+        f"Refresh plan: {len(wanted)} pairs in demand, {len(candidates)} due, "
+        f"{len(enqueued)} enqueued, {len(deferred)} deferred"
+    )
+    return last_plan
+
+
+def subscribe_recommenders(db: Session, role: str, location: str) -> None:
+    """Subscribe the users behind a scheduled (role, location) to its snapshots."""
+    users = [
+        user_id
+        for user_id, recommendations, user_location in
+        db.query(UserRecommendations.user_id, UserRecommendations.recommendations, UserProfile.location)
+        .join(UserProfile, UserProfile.id == UserRecommendations.user_id)
+        .yield_per(1000)
+        if _clean(user_location) == location and role in {_clean(r) for r in recommendations or []}
+    ]
+    # Only snapshots collected for this location; the location lives in the request payload.
+    snapshot_fks = [
+        fk
+        for fk, payload in db.query(Snapshot.id, Snapshot.payload).filter(Snapshot.role == role).all()
+        if payload and _clean(payload.get("location")).casefold() == location.casefold()
+    ]
+    subscribe_many(db, ((user_id, fk) for user_id in users for fk in snapshot_fks))
+
+
+def request_plan(db: Session, requested_by: Optional[str] = None) -> SchedulerRequest:
+    """Queue a planning pass for the scheduler process; planning here would spend a separate trigger budget."""
+    request = SchedulerRequest(requested_by=requested_by)
+    db.add(request)
+    db.commit()
+    db.refresh(request)
+    return request
+
+
+def run_plan(db: Session, scheduled: bool = True) -> Tuple[Optional[Dict], int]:
+    """
+    One planning pass, answering every queued request with its result.
+
+    Without ``scheduled`` the pass only runs if requests are queued. Returns
+    the plan (None when no pass ran) and how many requests were answered.
+    """
+    requests = db.query(SchedulerRequest)\
+        .filter(SchedulerRequest.finished_at.is_(None))\
+        .with_for_update(skip_locked=True)\
+        .all()
+    if not requests and not scheduled:
+        db.rollback()
+        return None, 0
+    plan = plan_refreshes(db)
+    result = {key: plan[key] for key in ("pairs", "enqueued", "deferred")}
+    finished_at = datetime.utcnow()
+    for request in requests:
+        request.finished_at = finished_at
+        request.result = result
+    db.commit()
+    return plan, len(requests)
+
+
+def _plan_in_session(scheduled: bool = True) -> Tuple[Optional[Dict], int]:
+    with _plan_lock, SessionLocal() as db:
+        return run_plan(db, scheduled)
+
+
+async def refresh_tick() -> None:
+    try:
+        _, answered = await asyncio.to_thread(_plan_in_session)
+        if answered:
+            logger.info(f"Answered {answered} requested planning passes with the scheduled one")
+    except Exception as e:
+        logger.error(f"Refresh planning failed: {str(e)}")
+
+
+async def requested_tick() -> None:
+    try:
+        _, answered = await asyncio.to_thread(_plan_in_session, False)
+        if answered:
+            logger.info(f"Ran a requested planning pass ({answered} requests)")
+    except Exception as e:
+        logger.error(f"Requested refresh planning failed: {str(e)}")
+
+
+def get_scheduler() -> AsyncIOScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AsyncIOScheduler(timezone="UTC")
+        _scheduler.add_job(
+            refresh_tick,
+            "interval",
+            minutes=REFRESH_INTERVAL_MINUTES,
+            id="refresh",
+            next_run_time=datetime.now().astimezone(),
+            max_instances=1,
+            coalesce=True,
+        )
+        _scheduler.add_job(
+            requested_tick,
+            "interval",
+            seconds=SCHEDULER_POLL_SECONDS,
+            id="requests",
+            max_instances=1,
+            coalesce=True,
+        )
+    return _scheduler
+
+
+def start_scheduler() -> None:
+    scheduler = get_scheduler()
+    if not scheduler.running:
+        scheduler.start()
+        logger.info(f"Refresh scheduler started (every {REFRESH_INTERVAL_MINUTES:g} min)")
+
+
+def shutdown_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None and _scheduler.running:
+        _scheduler.shutdown(wait=False)
+    _scheduler = None
+
+
+def scheduler_status(db: Session) -> Dict:
+    """Schedule, trigger budget, latest plan and scrape queue depth."""
+    job = _scheduler.get_job("refresh") if _scheduler is not None and _scheduler.running else None
+    queue = dict(
+        db.query(ScrapeJob.status, func.count(ScrapeJob.id))
+        .filter(ScrapeJob.status.in_(("queued", "running")))
+        .group_by(ScrapeJob.status)
+        .all()
+    )
+    scheduled = dict(
+        db.query(ScrapeJob.status, func.count(ScrapeJob.id))
+        .filter(ScrapeJob.user_id == SCHEDULER_USER_ID, ScrapeJob.status.in_(("queued", "running")))
+        .group_by(ScrapeJob.status)
+        .all()
+    )
+    requested = db.query(func.count(SchedulerRequest.id)).filter(SchedulerRequest.finished_at.is_(None)).scalar()
+    return {
+        "running": job is not None,
+        "interval_minutes": REFRESH_INTERVAL_MINUTES,
+        "next_run_at": job.next_run_time if job else None,
+        "min_age_hours": REFRESH_MIN_AGE_HOURS,
+        "max_jobs_per_tick": REFRESH_MAX_JOBS_PER_TICK,
+        "budget": {
+            platform: {
+                "tokens": round(bucket.available(), 2),
+                "capacity": bucket.capacity,
+                "per_hour": round(bucket.rate * 3600, 2),
+            }
+            for platform, bucket in trigger_buckets.items()
+        },
+        "queue": {
+            "queued": queue.get("queued", 0),
+            "running": queue.get("running", 0),
+            "scheduled_queued": scheduled.get("queued", 0),
+            "scheduled_running": scheduled.get("running", 0),
+        },
+        "requested_passes": requested,
+        "last_plan": last_plan,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Periodically enqueue refreshes of in-demand role/location pairs")
+    parser.add_argument("--once", action="store_true", help="Run one planning pass and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    if args.once:
+        plan, _ = _plan_in_session()
+        logger.info(f"Enqueued {len(plan['enqueued'])}, deferred {len(plan['deferred'])}")
+        return
+
+    async def serve():
+        start_scheduler()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            shutdown_scheduler()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
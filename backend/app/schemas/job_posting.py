@@ -0,0 +1,33 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+class JobPostingSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    platform: str
+    role: str
+    snapshot_id: str
+    title: str
+    company: Optional[str]
+    location: Optional[str]
+    is_remote: bool
+    posted_at: datetime
+    salary_min: Optional[float]
+    salary_max: Optional[float]
+    salary_currency: Optional[str]
+    salary_period: Optional[str] = None
+    url: Optional[str]
+    excerpt: Optional[str] = None
+    employment_type: Optional[str] = None
+    company_logo: Optional[str] = None
+    company_rating: Optional[float] = None
+
+class JobPostingDetail(JobPostingSummary):
+    description: Optional[str]
+    raw: Optional[dict]
+    removed_at: Optional[datetime]
+
+# Fields a listing can be projected to with ``fields=``
+SUMMARY_FIELDS = tuple(JobPostingSummary.model_fields)
@@ -17,6 +17,7 @@ class UserProfileCreate(BaseModel):
     preferred_job_titles: List[str]
     preferred_industries: Optional[List[str]]
     salary_expectations: Optional[float]
+    salary_currency: Optional[str] = None
     relocation_willingness: bool
     linkedin: Optional[str]
     portfolio: Optional[str]
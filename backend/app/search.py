@@ -0,0 +1,146 @@
+# app/search.py
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import column, func, literal_column, or_, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Query, Session
+
+from app.models.job_posting import JobPosting
+
+logger = logging.getLogger(__name__)
+
+# Postgres: generated tsvector column + GIN index (migration 9d2e61a4c3b7).
+PG_VECTOR = literal_column("job_postings.search_vector")
+PG_HEADLINE_OPTIONS = "StartSel=<mark>,StopSel=</mark>,MaxFragments=2,MaxWords=25,MinWords=10"
+
+# SQLite: external-content FTS5 table kept in sync by triggers.
+FTS_TABLE = "job_postings_fts"
+fts = table(FTS_TABLE, column("rowid"))
+# bm25() column weights for (title, company, description)
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+_TERMS = re.compile(r'"([^"]+)"|(\S+)')
+
+_sqlite_fts_ready: Dict[str, bool] = {}
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def fts5_query(q: str) -> str:
+    """Translate a web-style query ("exact phrase" words) into an FTS5 MATCH expression."""
+    parts = []
+    for phrase, word in _TERMS.findall(q):
+        term = (phrase or word).replace('"', "")
+        if term:
+            parts.append(f'"{term}"')
+    return " ".join(parts)
+
+
+def ensure_sqlite_fts(engine: Engine) -> bool:
+    """Create the FTS5 index and its sync triggers for local SQLite databases."""
+    if engine.dialect.name != "sqlite":
+        return False
+    key = str(engine.url)
+    if key in _sqlite_fts_ready:
+        return _sqlite_fts_ready[key]
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE},
+            ).first()
+            if not exists:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    "title, company, description, content='job_postings', content_rowid='id')"
+                ))
+                conn.execute(text(
+                    f"CREATE TRIGGER job_postings_fts_ai AFTER INSERT ON job_postings BEGIN "
+                    f"INSERT INTO {FTS_TABLE}(rowid, title, company, description) "
+                    "VALUES (new.id, new.title, new.company, new.description); END"
+                ))
+                conn.execute(text(
+                    f"CREATE TRIGGER job_postings_fts_ad AFTER DELETE ON job_postings BEGIN "
+                    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, description) "
+                    "VALUES ('delete', old.id, old.title, old.company, old.description); END"
+                ))
+                conn.execute(text(
+                    f"CREATE TRIGGER job_postings_fts_au AFTER UPDATE ON job_postings BEGIN "
+                    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, company, description) "
+                    "VALUES ('delete', old.id, old.title, old.company, old.description); "
+                    f"INSERT INTO {FTS_TABLE}(rowid, title, company, description) "
+                    "VALUES (new.id, new.title, new.company, new.description); END"
+                ))
+                conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        _sqlite_fts_ready[key] = True
+    except OperationalError as e:
+        # SQLite built without FTS5: search falls back to substring matching.
+        logger.warning(f"SQLite FTS5 unavailable, using LIKE search: {e}")
+        _sqlite_fts_ready[key] = False
+    return _sqlite_fts_ready[key]
+
+
+def apply_fulltext(db: Session, query: Query, q: str) -> Tuple[Query, Optional[object]]:
+    """
+    Restrict ``query`` to postings matching ``q`` and return a relevance expression.
+
+    Higher scores are better. The score is None when only substring matching
+    is available.
+    """
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery("english", q)
+        query = query.filter(PG_VECTOR.op("@@")(tsquery))
+        # Normalization 1|32: damp long documents, scale into [0, 1).
+        return query, func.ts_rank_cd(PG_VECTOR, tsquery, 33)
+
+    if dialect == "sqlite" and ensure_sqlite_fts(db.get_bind()):
+        match = fts5_query(q)
+        if match:
+            fts_ref = literal_column(FTS_TABLE)
+            query = query.join(fts, fts.c.rowid == JobPosting.id).filter(fts_ref.op("MATCH")(match))
+            # bm25() is lower-is-better.
+            return query, -func.bm25(fts_ref, *FTS_WEIGHTS)
+
+    pattern = f"%{q}%"
+    query = query.filter(or_(
+        JobPosting.title.ilike(pattern),
+        JobPosting.company.ilike(pattern),
+        JobPosting.description.ilike(pattern),
+    ))
+    return query, None
+
+
+def highlight_snippets(db: Session, q: str, posting_ids: List[int]) -> Dict[int, str]:
+    """Description snippets with matched terms wrapped in <mark>, for one page of results."""
+    if not posting_ids:
+        return {}
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        rows = db.query(
+            JobPosting.id,
+            func.ts_headline(
+                "english",
+                func.coalesce(JobPosting.description, ""),
+                func.websearch_to_tsquery("english", q),
+                PG_HEADLINE_OPTIONS,
+            ),
+        ).filter(JobPosting.id.in_(posting_ids)).all()
+        return {posting_id: snippet for posting_id, snippet in rows}
+
+    if dialect == "sqlite" and ensure_sqlite_fts(db.get_bind()) and fts5_query(q):
+        rows = db.execute(
+            text(
+                f"SELECT rowid, snippet({FTS_TABLE}, 2, '<mark>', '</mark>', '…', 24) "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+                f"AND rowid IN ({', '.join(str(int(i)) for i in posting_ids)})"
+            ),
+            {"match": fts5_query(q)},
+        ).all()
+        return {posting_id: snippet for posting_id, snippet in rows}
+    return {}
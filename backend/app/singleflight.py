@@ -0,0 +1,40 @@
+# app/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key starts ``fn``; callers arriving while it runs
+    await the same task. The task is shielded, so a caller that is cancelled
+    or times out does not cancel the work for everyone else.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another caller started the work."""
+        task = self._calls.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+
+        def _finished(done: asyncio.Future) -> None:
+            self._calls.pop(key, None)
+            # Mark the error as retrieved even if every waiter has gone away.
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(_finished)
+        return await asyncio.shield(task), False
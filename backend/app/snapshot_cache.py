@@ -0,0 +1,161 @@
+# app/snapshot_cache.py
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+SNAPSHOT_CACHE_MAX_BYTES = int(os.getenv("SNAPSHOT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+SNAPSHOT_CACHE_TTL = float(os.getenv("SNAPSHOT_CACHE_TTL", str(24 * 60 * 60)))
+# Optional second tier; unset keeps the cache in memory only.
+SNAPSHOT_CACHE_DIR = os.getenv("SNAPSHOT_CACHE_DIR")
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotCache:
+    """
+    Parsed snapshot documents keyed by ``snapshot_id``.
+
+    Delivered snapshots never change, so entries only leave the cache through
+    LRU eviction (the in-memory tier is bounded by the raw document size),
+    TTL expiry or an explicit ``invalidate``. When ``disk_dir`` is set, raw
+    documents are also kept on disk and reloaded on a memory miss.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, snapshot_id: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(snapshot_id)
+            if entry is not None:
+                data, size, stored_at = entry
+                if now - stored_at <= self.ttl:
+                    self._entries.move_to_end(snapshot_id)
+                    self._counters["hits"] += 1
+                    return data
+                self._drop(snapshot_id)
+                self._counters["expirations"] += 1
+
+        raw = self._read_disk(snapshot_id, now)
+        if raw is not None:
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                logger.warning(f"Discarding corrupt disk cache entry for snapshot {snapshot_id}")
+                self.invalidate(snapshot_id)
+            else:
+                self._store(snapshot_id, data, len(raw), now)
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                return data
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, snapshot_id: str, data: Any, raw: bytes) -> None:
+        """Cache a parsed document; ``raw`` is the body it was parsed from."""
+        self._store(snapshot_id, data, len(raw), time.time())
+        self._write_disk(snapshot_id, raw)
+
+    def invalidate(self, snapshot_id: Optional[str] = None) -> int:
+        """Drop one snapshot, or everything when no id is given. Returns entries removed."""
+        with self._lock:
+            keys = list(self._entries) if snapshot_id is None else [snapshot_id]
+            removed = sum(1 for key in keys if self._drop(key))
+        if self.disk_dir:
+            paths = (
+                [os.path.join(self.disk_dir, name) for name in os.listdir(self.disk_dir)]
+                if snapshot_id is None else [self._disk_path(snapshot_id)]
+            )
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["disk_hits"] + self._counters["misses"]
+            hits = self._counters["hits"] + self._counters["disk_hits"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+    def _store(self, snapshot_id: str, data: Any, size: int, stored_at: float) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(snapshot_id)
+            self._entries[snapshot_id] = (data, size, stored_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._counters["evictions"] += 1
+
+    def _drop(self, snapshot_id: str) -> bool:
+        entry = self._entries.pop(snapshot_id, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[1]
+        return True
+
+    def _disk_path(self, snapshot_id: str) -> str:
+        return os.path.join(self.disk_dir, f"{os.path.basename(snapshot_id)}.json")
+
+    def _read_disk(self, snapshot_id: str, now: float) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(snapshot_id)
+        try:
+            if now - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, snapshot_id: str, raw: bytes) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(snapshot_id)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(raw)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write snapshot {snapshot_id} to disk cache: {e}")
+
+
+snapshot_cache = SnapshotCache(
+    max_bytes=SNAPSHOT_CACHE_MAX_BYTES,
+    ttl=SNAPSHOT_CACHE_TTL,
+    disk_dir=SNAPSHOT_CACHE_DIR,
+)
@@ -0,0 +1,85 @@
+# app/subscriptions.py
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.brightdata import payload_fingerprint
+from app.models.snapshot import Snapshot
+from app.models.user_snapshot import UserSnapshot
+from app.versions import bump_versions
+
+
+def subscribe(db: Session, user_id: str, snapshot_fks: Iterable[int]) -> None:
+    """Link a user to catalog snapshots; existing links are left untouched."""
+    subscribe_many(db, ((user_id, fk) for fk in snapshot_fks))
+
+
+def subscribe_many(db: Session, links: Iterable[Tuple[str, int]]) -> None:
+    """
+    Insert (user_id, snapshot_fk) links for any number of users in one
+    statement, and bump the versions of the users that got a new one.
+    """
+    rows = [{"user_id": user_id, "snapshot_fk": fk} for user_id, fk in dict.fromkeys(links)]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(UserSnapshot.__table__).values(rows).on_conflict_do_nothing(
+        index_elements=["user_id", "snapshot_fk"]
+    ).returning(UserSnapshot.__table__.c.user_id)
+    inserted = db.execute(stmt).scalars().all()
+    bump_versions(db, inserted)
+    db.commit()
+
+
+def record_snapshots(db: Session, user_id: str, entries: Iterable[Tuple[str, str, str, Dict]]) -> None:
+    """
+    Add ``(role, platform, snapshot_id, payload)`` snapshots to the catalog
+    and subscribe the user to all of them.
+
+    The catalog rows go in with one multi-row insert (snapshots that are
+    already known keep their row) and the subscriptions with another, so
+    recording a whole job costs the same few statements as a single snapshot.
+    """
+    now = datetime.utcnow()
+    rows = {
+        snapshot_id: {
+            "role": role,
+            "platform": platform,
+            "snapshot_id": snapshot_id,
+            "payload": payload,
+            "payload_hash": payload_fingerprint(platform, payload) if payload is not None else None,
+            "created_at": now,
+        }
+        for role, platform, snapshot_id, payload in entries
+    }
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    db.execute(
+        insert(Snapshot.__table__).values(list(rows.values())).on_conflict_do_nothing(index_elements=["snapshot_id"])
+    )
+    snapshot_fks = db.query(Snapshot.id).filter(Snapshot.snapshot_id.in_(rows)).all()
+    subscribe(db, user_id, [snapshot_fk for (snapshot_fk,) in snapshot_fks])
+
+
+def user_snapshots(db: Session, user_id: str):
+    """Catalog snapshots the user is subscribed to, oldest subscription first."""
+    return db.query(Snapshot)\
+        .join(UserSnapshot, UserSnapshot.snapshot_fk == Snapshot.id)\
+        .filter(UserSnapshot.user_id == user_id)\
+        .order_by(UserSnapshot.id)
+
+
+def subscribed_to(db: Session, user_id: str, platform_column, role_column):
+    """EXISTS clause: the user is subscribed to a snapshot of this platform/role."""
+    return db.query(UserSnapshot.id)\
+        .join(Snapshot, Snapshot.id == UserSnapshot.snapshot_fk)\
+        .filter(
+            UserSnapshot.user_id == user_id,
+            Snapshot.platform == platform_column,
+            Snapshot.role == role_column,
+        ).exists()
@@ -1,77 +1,114 @@
 # app/tasks.py
-import requests
 import logging
-from app.models.snapshot import Snapshot
-from app.db import get_db
-from sqlalchemy.orm import Session
 import os
-from typing import List, Dict
-from fastapi import Depends
-
-API_TOKEN = os.getenv("BRIGHTDATA_API_TOKEN")
-
-LINKEDIN_URL = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=gd_lpfll7v5hcqtkxl6l&include_errors=true&type=discover_new&discover_by=keyword"
-GLASSDOOR_URL = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=gd_lpfbbndm1xnopbrcr0&include_errors=true&type=discover_new&discover_by=keyword"
-INDEED_URL = "https://api.brightdata.com/datasets/v3/trigger?dataset_id=gd_l7qekxkv2i7ve6hx1s&include_errors=true&type=discover_new&discover_by=keyword"
-
-HEADERS = {
-    "Authorization": f"Bearer {API_TOKEN}",
-    "Content-Type": "application/json",
-}
-
-def call_brightdata_api(url: str, payload: list, platform: str, role: str, db: Session):
-    try:
-        response = requests.post(url, json=payload, headers=HEADERS)
-        response.raise_for_status()
-        snapshot_id = response.json().get("snapshot_id")
-
-        snapshot = Snapshot(
-            role=role,
-            platform=platform,
-            snapshot_id=snapshot_id,
-            payload=payload
-        )
-        
-        db.add(snapshot)
-        db.commit()
-        db.refresh(snapshot)
-        
-        logging.info(f"Snapshot for {platform} ({role}) created: {snapshot_id}")
-    except Exception as e:
-        logging.error(f"Failed to create snapshot for {platform} ({role}): {str(e)}")
-
-
-def process_job_roles(roles: List[str], location: str, additional_details: Dict):
-    for role in roles:
-        linkedin_payload = [
-            {
-                "location": location,
-                "keyword": role,
-                "country": additional_details.get("country", ""),
-                "time_range": additional_details.get("time_range", "Any time"),
-                "job_type": additional_details.get("job_type", ""),
-                "experience_level": additional_details.get("experience_level", ""),
-                "remote": additional_details.get("remote", ""),
-                "company": additional_details.get("company", "")
-            }
-        ]
-        
-        glassdoor_payload = [
-            {
-                "location": location,
-                "keyword": role,
-                "country": additional_details.get("country", "")
-            }
-        ]
-
-        indeed_payload = [
-            {
-                "keyword": role
-            }
-        ]
-        
-        db = next(get_db())
-
-        call_brightdata_api(LINKEDIN_URL, linkedin_payload, "LinkedIn", role, db)
-        call_brightdata_api(GLASSDOOR_URL, glassdoor_payload, "Glassdoor", role, db)
-        call_brightdata_api(INDEED_URL, indeed_payload, "Indeed", role, db)
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.models.scrape_job import ScrapeJob
+
+# How long a claimed job stays owned by a worker without a heartbeat.
+SCRAPE_JOB_LEASE_SECONDS = int(os.getenv("SCRAPE_JOB_LEASE_SECONDS", str(15 * 60)))
+SCRAPE_JOB_MAX_ATTEMPTS = int(os.getenv("SCRAPE_JOB_MAX_ATTEMPTS", "3"))
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_scrape_job(db: Session, user_id: str, roles: List[str], location: str, additional_details: Dict) -> ScrapeJob:
+    job = ScrapeJob(
+        user_id=user_id,
+        roles=roles,
+        location=location,
+        additional_details=additional_details,
+        status="queued",
+        progress={role: {} for role in roles},
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[ScrapeJob]:
+    """
+    Atomically take the oldest runnable job.
+
+    Uses ``SELECT ... FOR UPDATE SKIP LOCKED`` so any number of workers can
+    poll the same table without handing out a job twice. Jobs whose worker
+    stopped heartbeating are picked up again once their lease expires.
+    """
+    now = datetime.utcnow()
+    job = db.query(ScrapeJob)\
+        .filter(or_(
+            ScrapeJob.status == "queued",
+            (ScrapeJob.status == "running") & (ScrapeJob.lease_expires_at < now)
+        ))\
+        .order_by(ScrapeJob.created_at)\
+        .with_for_update(skip_locked=True)\
+        .first()
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.worker_id = worker_id
+    job.attempts += 1
+    job.started_at = job.started_at or now
+    job.lease_expires_at = now + timedelta(seconds=SCRAPE_JOB_LEASE_SECONDS)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def heartbeat(db: Session, job_id: str, worker_id: str, progress: Optional[Dict] = None) -> None:
+    """Extend the lease of a running job, optionally saving its progress."""
+    values = {"lease_expires_at": datetime.utcnow() + timedelta(seconds=SCRAPE_JOB_LEASE_SECONDS)}
+    if progress is not None:
+        values["progress"] = progress
+    db.query(ScrapeJob)\
+        .filter(ScrapeJob.id == job_id, ScrapeJob.worker_id == worker_id)\
+        .update(values, synchronize_session=False)
+    db.commit()
+
+
+def complete_job(db: Session, job_id: str, worker_id: str, progress: Dict) -> None:
+    db.query(ScrapeJob)\
+        .filter(ScrapeJob.id == job_id, ScrapeJob.worker_id == worker_id)\
+        .update({
+            "status": "completed",
+            "progress": progress,
+            "lease_expires_at": None,
+            "finished_at": datetime.utcnow(),
+        }, synchronize_session=False)
+    db.commit()
+
+
+def fail_job(db: Session, job_id: str, worker_id: str, error: str) -> None:
+    """Re-queue the job, or mark it failed once it has used all its attempts."""
+    job = db.query(ScrapeJob).filter(ScrapeJob.id == job_id, ScrapeJob.worker_id == worker_id).first()
+    if job is None:
+        return
+    job.error = error
+    job.lease_expires_at = None
+    if job.attempts >= SCRAPE_JOB_MAX_ATTEMPTS:
+        job.status = "failed"
+        job.finished_at = datetime.utcnow()
+    else:
+        job.status = "queued"
+    db.commit()
+
+
+def job_status(job: ScrapeJob) -> Dict:
+    return {
+        "job_id": job.id,
+        "user_id": job.user_id,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,66 @@
+# app/versions.py
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.snapshot import Snapshot
+from app.models.user_snapshot import UserSnapshot
+from app.models.user_version import UserVersion
+from app.responses import make_etag
+
+
+def bump_versions(db: Session, user_ids: Iterable[str]) -> None:
+    """
+    Increment the change counter of each user, in the caller's transaction.
+
+    Call it next to every write that changes what a user's cached
+    resources return (recommendations, subscriptions, ingested postings);
+    the caller commits.
+    """
+    rows = [{"user_id": user_id, "version": 1, "updated_at": datetime.utcnow()} for user_id in dict.fromkeys(user_ids)]
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(UserVersion.__table__).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id"],
+        set_={"version": UserVersion.__table__.c.version + 1, "updated_at": stmt.excluded.updated_at},
+    )
+    db.execute(stmt)
+
+
+def subscribers(db: Session, platform: str, role: str) -> List[str]:
+    """Users subscribed to any snapshot of this platform/role."""
+    return scope_subscribers(db, [(platform, role)])
+
+
+def scope_subscribers(db: Session, scopes: Iterable[Tuple[str, str]]) -> List[str]:
+    """Users subscribed to any snapshot of any of these (platform, role) pairs."""
+    scopes = set(scopes)
+    if not scopes:
+        return []
+    rows = db.query(UserSnapshot.user_id)\
+        .join(Snapshot, Snapshot.id == UserSnapshot.snapshot_fk)\
+        .filter(tuple_(Snapshot.platform, Snapshot.role).in_(scopes))\
+        .distinct()\
+        .all()
+    return [user_id for (user_id,) in rows]
+
+
+def user_version(db: Session, user_id: str) -> int:
+    """The user's change counter: a single primary-key lookup, 0 before the first change."""
+    return db.query(UserVersion.version).filter(UserVersion.user_id == user_id).scalar() or 0
+
+
+def user_etag(db: Session, resource: str, user_id: str, *params) -> str:
+    """
+    Strong ETag of one of the user's resources.
+
+    Derived from the change counter and the request parameters only, so it
+    is known before any of the resource is read.
+    """
+    return make_etag(resource, user_id, user_version(db, user_id), *params)
@@ -0,0 +1,188 @@
+# app/worker.py
+"""
+Scrape worker: claims queued /process-jobs requests from ``scrape_jobs`` and
+runs them. Start as many processes as needed, on any number of hosts:
+
+    python -m app.worker --concurrency 4
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+from typing import Dict, Optional
+
+from app.db import SessionLocal, session_scope
+from app.routers.snapshot import SnapshotManager, trigger_savings
+from app.scheduler import SCHEDULER_USER_ID, subscribe_recommenders
+from app.tasks import (
+    SCRAPE_JOB_LEASE_SECONDS,
+    claim_next_job,
+    complete_job,
+    fail_job,
+    heartbeat,
+)
+from app.s3 import close_http_client
+from app.brightdata import close_brightdata_client
+
+# Jobs one worker process runs at the same time.
+SCRAPE_WORKER_CONCURRENCY = int(os.getenv("SCRAPE_WORKER_CONCURRENCY", "4"))
+SCRAPE_WORKER_POLL_INTERVAL = float(os.getenv("SCRAPE_WORKER_POLL_INTERVAL", "2"))
+
+logger = logging.getLogger(__name__)
+
+
+def _claim(worker_id: str):
+    with SessionLocal() as db:
+        job = claim_next_job(db, worker_id)
+        if job is None:
+            return None
+        return {
+            "id": job.id,
+            "user_id": job.user_id,
+            "roles": job.roles,
+            "location": job.location,
+            "additional_details": job.additional_details or {},
+            "progress": job.progress or {},
+        }
+
+
+def _call(fn, *args):
+    with session_scope() as db:
+        return fn(db, *args)
+
+
+class LeaseLost(Exception):
+    pass
+
+
+async def run_job(job: Dict, worker_id: str) -> None:
+    progress: Dict = {role: dict(job["progress"].get(role, {})) for role in job["roles"]}
+    lock = asyncio.Lock()
+
+    async def on_progress(role: str, platform: str, state: Dict) -> None:
+        # Held across the write so progress rows are saved in order.
+        async with lock:
+            progress[role][platform] = state
+            snapshot = {r: dict(p) for r, p in progress.items()}
+            await asyncio.to_thread(_call, heartbeat, job["id"], worker_id, snapshot)
+
+    async def keep_lease() -> None:
+        loop = asyncio.get_running_loop()
+        interval = SCRAPE_JOB_LEASE_SECONDS / 3
+        renewed = loop.time()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(_call, heartbeat, job["id"], worker_id, None)
+                renewed = loop.time()
+            except Exception as e:
+                logger.error(f"Scrape job {job['id']}: could not renew lease: {str(e)}")
+                # Give up before the lease lapses and another worker claims the job.
+                if loop.time() - renewed + interval >= SCRAPE_JOB_LEASE_SECONDS:
+                    raise LeaseLost(f"Lease of scrape job {job['id']} could not be renewed") from e
+
+    async def scrape() -> None:
+        # Flows open their own short sessions; none is held for the whole job.
+        results = await SnapshotManager().process_job_roles(
+            roles=job["roles"],
+            location=job["location"],
+            additional_details=job["additional_details"],
+            user_id=job["user_id"],
+            on_progress=on_progress,
+            # The planner sends scheduled jobs to reuse snapshots their scope has not ingested yet.
+            ingest_reused=job["user_id"] == SCHEDULER_USER_ID,
+        )
+        # Flow errors are reported per platform rather than raised.
+        outcomes = [outcome for entry in results for outcome in entry["results"].values()]
+        errors = [outcome for outcome in outcomes if outcome.get("status") == "error"]
+        if outcomes and len(errors) == len(outcomes):
+            raise RuntimeError(f"All {len(errors)} platform flows failed, last: {errors[-1].get('error')}")
+        if errors:
+            logger.warning(f"Scrape job {job['id']}: {len(errors)}/{len(outcomes)} platform flows failed")
+        if job["user_id"] == SCHEDULER_USER_ID:
+            # Scheduled refreshes are run on behalf of everyone recommended the role.
+            for role in job["roles"]:
+                await asyncio.to_thread(_call, subscribe_recommenders, role, job["location"])
+
+    lease = asyncio.create_task(keep_lease())
+    work = asyncio.create_task(scrape())
+    try:
+        await asyncio.wait({work, lease}, return_when=asyncio.FIRST_COMPLETED)
+        if not work.done():
+            work.cancel()
+            await asyncio.gather(work, return_exceptions=True)
+            lease.result()
+        work.result()
+        await asyncio.to_thread(_call, complete_job, job["id"], worker_id, progress)
+        stats = trigger_savings()
+        logger.info(
+            f"Scrape job {job['id']} completed "
+            f"(triggers saved: {stats['reused'] + stats['coalesced']}/{stats['requests']}, ratio {stats['savings_ratio']})"
+        )
+    except Exception as e:
+        logger.error(f"Scrape job {job['id']} failed: {str(e)}")
+        await asyncio.to_thread(_call, fail_job, job["id"], worker_id, str(e))
+    finally:
+        lease.cancel()
+        work.cancel()
+
+
+async def run_worker(
+    concurrency: int = SCRAPE_WORKER_CONCURRENCY,
+    poll_interval: float = SCRAPE_WORKER_POLL_INTERVAL,
+    stop: Optional[asyncio.Event] = None,
+    worker_id: Optional[str] = None,
+) -> None:
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    stop = stop or asyncio.Event()
+    running = set()
+    logger.info(f"Worker {worker_id} started (concurrency {concurrency})")
+
+    while not stop.is_set():
+        job = None
+        if len(running) < concurrency:
+            try:
+                job = await asyncio.to_thread(_claim, worker_id)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} could not claim a job: {str(e)}")
+        if job is not None:
+            task = asyncio.create_task(run_job(job, worker_id))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            continue
+        try:
+            await asyncio.wait_for(stop.wait(), poll_interval)
+        except asyncio.TimeoutError:
+            pass
+
+    # Let in-flight jobs finish; anything interrupted is re-queued when its lease expires.
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+    await close_http_client()
+    await close_brightdata_client()
+    logger.info(f"Worker {worker_id} stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scrape job worker")
+    parser.add_argument("--concurrency", type=int, default=SCRAPE_WORKER_CONCURRENCY)
+    parser.add_argument("--poll-interval", type=float, default=SCRAPE_WORKER_POLL_INTERVAL)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    async def serve():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await run_worker(args.concurrency, args.poll_interval, stop)
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Payload size and server time of one dashboard page of ``GET /snapshots/{user_id}``:
+``view=full`` (the delivered S3 documents) versus ``view=summary`` (card
+fields from ``job_postings``), plus a ``fields=`` projection of the summary.
+
+Writes synthetic LinkedIn / Indeed / Glassdoor snapshots, normalizes them
+into ``job_postings`` the way ingest does, serves the files from a local
+stand-in for S3 and calls the app in-process. The snapshot cache stays on,
+so after the first request the full view measures serialization rather than
+downloads.
+
+    cd backend && python -m benchmarks.bench_listing_views --snapshots 12 --postings 100
+"""
+import argparse
+import functools
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+WORKDIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(WORKDIR, 'bench.db')}")
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from fastapi.testclient import TestClient
+
+from app.db import Base, SessionLocal, engine
+from app.ingest import normalize_posting, upsert_postings
+from app.models.job_posting import JobPosting
+from app.models.posting_bucket import PostingBucket
+from app.models.snapshot import Snapshot
+from app.models.user_snapshot import UserSnapshot
+
+PLATFORMS = ["LinkedIn", "Indeed", "Glassdoor"]
+PARAGRAPH = ("You will design, build and operate services used by millions of customers, work closely "
+             "with product and design, review code and mentor other engineers. ")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def make_posting(platform: str, snapshot: int, i: int) -> dict:
+    description = PARAGRAPH * 25
+    common = {
+        "url": f"https://example.com/{platform}/{snapshot}/{i}",
+        "job_title": f"Software Engineer {snapshot}-{i}",
+        "company_name": f"Company {i % 40}",
+        "company_rating": 4.1,
+    }
+    if platform == "LinkedIn":
+        return {**common,
+                "job_location": "Bangalore, Karnataka, India",
+                "job_posted_date": "2026-10-01T10:00:00Z",
+                "job_employment_type": "Full-time",
+                "company_logo": f"https://media.example.com/logo/{i % 40}.png",
+                "job_summary": description[:2000],
+                "job_description_formatted": "<div><p>" + description + "</p><ul><li>Benefits</li></ul></div>",
+                "base_salary": {"min_amount": 1800000, "max_amount": 2600000, "currency": "INR"},
+                "job_industries": "Software Development", "job_function": "Engineering"}
+    if platform == "Indeed":
+        return {**common,
+                "location": "Bengaluru, Karnataka",
+                "date_posted": "3 days ago",
+                "salary_formatted": "₹18,00,000 - ₹26,00,000 a year",
+                "description_text": description,
+                "benefits": ["Health insurance", "Provident Fund", "Paid time off", "Work from home"]}
+    return {**common,
+            "job_location": "Bengaluru",
+            "job_posted_date": "2026-10-02",
+            "job_overview": description,
+            "pay_median_glassdoor": 2200000,
+            "pay_range_currency": "INR",
+            "company_size": "1001 to 5000 Employees",
+            "company_industry": "Information Technology"}
+
+
+def setup(snapshots: int, postings: int) -> None:
+    Base.metadata.create_all(engine, tables=[
+        JobPosting.__table__, PostingBucket.__table__, Snapshot.__table__, UserSnapshot.__table__
+    ])
+    with SessionLocal() as db:
+        for s in range(snapshots):
+            platform = PLATFORMS[s % len(PLATFORMS)]
+            snapshot_id = f"s_{s}"
+            directory = os.path.join(WORKDIR, platform, "Software Engineer")
+            os.makedirs(directory, exist_ok=True)
+            items = [make_posting(platform, s, i) for i in range(postings)]
+            with open(os.path.join(directory, f"{snapshot_id}.json"), "w") as f:
+                json.dump(items, f)
+            upsert_postings(db, [normalize_posting(platform, "Software Engineer", snapshot_id, item) for item in items])
+            snapshot = Snapshot(role="Software Engineer", platform=platform, snapshot_id=snapshot_id, payload={})
+            db.add(snapshot)
+            db.commit()
+            db.add(UserSnapshot(user_id="bench", snapshot_fk=snapshot.id))
+            db.commit()
+
+
+def measure(client: TestClient, path: str, repeat: int) -> tuple:
+    client.get(path).raise_for_status()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return len(response.content), statistics.median(timings), sorted(timings)[int(len(timings) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshots", type=int, default=12)
+    parser.add_argument("--postings", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    s3 = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=WORKDIR))
+    threading.Thread(target=s3.serve_forever, daemon=True).start()
+    os.environ["S3_BASE_URL"] = f"http://127.0.0.1:{s3.server_address[1]}"
+    setup(args.snapshots, args.postings)
+
+    from app.main import app
+
+    base = f"/snapshots/bench?limit={args.snapshots}"
+    modes = [
+        ("view=full", base),
+        ("view=summary", f"{base}&view=summary"),
+        ("view=summary&fields=card", f"{base}&view=summary&fields=title,company,location,posted_at,"
+                                     "salary_min,salary_max,salary_currency,url,excerpt"),
+    ]
+    print(f"{args.snapshots} snapshots x {args.postings} postings")
+    with TestClient(app) as client:
+        full_size = None
+        for name, path in modes:
+            size, p50, p95 = measure(client, path, args.repeat)
+            full_size = full_size or size
+            print(f"{name:>26}: {size / 1024:8.1f} KiB ({full_size / size:5.1f}x smaller), "
+                  f"p50 {p50:6.1f} ms, p95 {p95:6.1f} ms")
+    s3.shutdown()
+
+
+if __name__ == "__main__":
+    main()
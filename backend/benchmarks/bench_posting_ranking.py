@@ -0,0 +1,101 @@
+"""
+Relevance ranking (app.ranking) of many postings for one user.
+
+Builds synthetic postings from the role taxonomy terms, computes their
+ranking columns the way ingest does, then times loading them into a
+PostingMatrix (decoding the stored blobs) and scoring / taking the first
+page for one profile.
+
+    cd backend && python -m benchmarks.bench_posting_ranking --postings 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from app.ranking import PostingMatrix, RankingProfile, posting_features
+from app.role_matcher import ROLE_TAXONOMY
+
+FILLER = ("we are looking for a motivated team player to join our growing company and help customers "
+          "build reliable products in a fast paced environment with great benefits and flexible hours").split()
+LEVELS = ["Intern", "Junior", "", "Senior", "Lead", "Principal"]
+
+
+def make_rows(n: int, rng: random.Random):
+    roles = list(ROLE_TAXONOMY)
+    now = datetime.utcnow()
+    templates = []
+    # Feature extraction is the ingest-time cost; a pool of distinct postings is enough to time it.
+    start = time.perf_counter()
+    for i in range(min(n, 2000)):
+        role = rng.choice(roles)
+        terms = ROLE_TAXONOMY[role].split()
+        title = f"{rng.choice(LEVELS)} {role}".strip()
+        words = rng.sample(terms, min(len(terms), 8)) + rng.choices(FILLER, k=250)
+        rng.shuffle(words)
+        description = f"{rng.randint(1, 10)}+ years of experience. " + " ".join(words)
+        templates.append(posting_features(title, description))
+    per_posting = (time.perf_counter() - start) / len(templates) * 1000
+
+    rows = []
+    for i in range(n):
+        features = templates[i % len(templates)]
+        salary = rng.choice([None, rng.uniform(3e5, 4e6)])
+        period = rng.choice([None, "year", "month"])
+        if period == "month" and salary:
+            salary /= 12
+        rows.append((
+            i + 1,
+            features["title_features"],
+            features["skill_features"],
+            features["seniority"],
+            features["min_experience_years"],
+            salary,
+            salary,
+            now - timedelta(hours=rng.uniform(0, 24 * 60)),
+            rng.choice([None, "INR", "INR", "USD"]),
+            period,
+        ))
+    return rows, per_posting
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--postings", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    rows, per_posting = make_rows(args.postings, rng)
+    average_features = statistics.mean(len(row[2]) // 2 for row in rows[:2000])
+    print(f"ingest-time features: {per_posting:.2f} ms per posting, {average_features:.0f} hashes on average")
+
+    profile = RankingProfile(
+        skills=["Python", "PostgreSQL", "Docker", "Kubernetes", "REST API", "machine learning"],
+        titles=["Backend Engineer", "Software Engineer"],
+        experience_years=5,
+        salary_expectation=2_000_000,
+        salary_currency="INR",
+    )
+
+    load, score = [], []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        matrix = PostingMatrix(rows)
+        load.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        page = matrix.top(profile, 0, 20)
+        score.append(time.perf_counter() - start)
+
+    print(f"{args.postings} postings: load {statistics.median(load) * 1000:.0f} ms, "
+          f"score + first page {statistics.median(score) * 1000:.0f} ms (median of {args.repeat})")
+    print("top 3:", page[:3])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Bytes on the wire and latency of a 100-item listing page per encoding,
+plus the cost of the JSON encoding itself: FastAPI's default
+``jsonable_encoder`` + ``JSONResponse`` versus
+``app.responses.FastJSONResponse``. The page is
+``GET /jobs/search?limit=100&dedupe=false``, since the synthetic postings
+are near-duplicates of each other.
+
+Postings are generated from the snapshot fixtures of
+``bench_listing_views`` and normalized into a temporary SQLite database. The
+app is called in-process, so latency is server time without the network.
+zstd and brotli are measured when ``zstandard`` / ``brotli`` are installed.
+
+    cd backend && python -m benchmarks.bench_response_encoding --postings 2000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.compression import ENCODERS
+from app.db import Base, SessionLocal, engine
+from app.ingest import normalize_posting, upsert_postings
+from app.models.job_posting import JobPosting
+from app.models.posting_bucket import PostingBucket
+from app.responses import FastJSONResponse
+from benchmarks.bench_listing_views import PLATFORMS, make_posting
+
+
+def setup(postings: int) -> None:
+    Base.metadata.create_all(engine, tables=[JobPosting.__table__, PostingBucket.__table__])
+    with SessionLocal() as db:
+        for s, platform in enumerate(PLATFORMS):
+            rows = [normalize_posting(platform, "Software Engineer", f"s_{s}", make_posting(platform, s, i))
+                    for i in range(postings // len(PLATFORMS))]
+            upsert_postings(db, rows)
+
+
+def percentiles(timings):
+    ordered = sorted(timings)
+    return statistics.median(ordered), ordered[int(len(ordered) * 0.95) - 1]
+
+
+def time_encoding(payload, repeat: int):
+    results = {}
+    for name, encode in (
+        ("jsonable_encoder + JSONResponse", lambda: JSONResponse(jsonable_encoder(payload)).body),
+        ("FastJSONResponse", lambda: FastJSONResponse(payload).body),
+    ):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            encode()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = percentiles(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--postings", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    setup(args.postings)
+
+    from app.main import app
+
+    path = "/jobs/search?limit=100&dedupe=false"
+    with TestClient(app) as client:
+        first = client.get(path, headers={"Accept-Encoding": "identity"})
+        first.raise_for_status()
+        payload = first.json()
+        print(f"{len(payload['items'])}-item page of {args.postings} postings")
+
+        for name, (p50, p95) in time_encoding(payload, args.repeat).items():
+            print(f"  encode {name:>31}: p50 {p50:6.2f} ms, p95 {p95:6.2f} ms")
+
+        for encoding in ["identity", *ENCODERS]:
+            timings, wire = [], 0
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                response = client.get(path, headers={"Accept-Encoding": encoding})
+                timings.append((time.perf_counter() - start) * 1000)
+                wire = response.num_bytes_downloaded
+            p50, p95 = percentiles(timings)
+            print(f"  GET {encoding:>34}: {wire / 1024:7.1f} KiB on the wire, p50 {p50:6.1f} ms, p95 {p95:6.1f} ms")
+
+        etag = first.headers["etag"]
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get(path, headers={"If-None-Match": etag})
+            timings.append((time.perf_counter() - start) * 1000)
+        p50, p95 = percentiles(timings)
+        print(f"  GET {'If-None-Match (' + str(response.status_code) + ')':>34}: "
+              f"{response.num_bytes_downloaded / 1024:7.1f} KiB on the wire, p50 {p50:6.1f} ms, p95 {p95:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Resume text extraction: inline pdfplumber in the event loop (the previous
+upload_resume) versus app.resume's page-parallel process pool.
+
+Generates a corpus of text PDFs of 1-30 pages, extracts all of them
+concurrently with each approach while a ticker task measures how long the
+event loop was blocked, and reports throughput per pool worker.
+
+    cd backend && python -m benchmarks.bench_resume_extract --docs 60
+"""
+import argparse
+import asyncio
+import io
+import os
+import time
+
+import pdfplumber
+
+from app.resume import RESUME_EXTRACT_WORKERS, extract_resume_text, get_extract_pool, shutdown_extract_pool
+
+WORDS = ("python", "kubernetes", "led", "team", "of", "engineers", "shipped", "data", "pipeline",
+         "reduced", "latency", "by", "40%", "designed", "api", "postgres", "aws", "mentored")
+
+
+def make_pdf(n_pages: int, lines_per_page: int = 45) -> bytes:
+    """A minimal valid PDF with ``n_pages`` pages of Helvetica text."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for p in range(n_pages):
+        lines = []
+        for i in range(lines_per_page):
+            words = " ".join(WORDS[(p * 7 + i * 3 + k) % len(WORDS)] for k in range(12))
+            lines.append(f"({words}) Tj 0 -16 Td")
+        stream = ("BT /F1 10 Tf 40 800 Td " + " ".join(lines) + " ET").encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % n_pages
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+async def inline_extract(data: bytes) -> str:
+    content = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            content += page.extract_text() or ""
+    return content
+
+
+async def measure(extract, corpus):
+    """Run every extraction concurrently; return (elapsed s, max loop stall ms, total stall ms)."""
+    tick = 0.005
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(tick)
+            stalls.append(max(0.0, time.perf_counter() - start - tick) * 1000)
+
+    monitor = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    texts = await asyncio.gather(*(extract(data) for data in corpus))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await monitor
+    assert all(texts)
+    return elapsed, max(stalls or [0.0]), sum(stalls)
+
+
+async def run(corpus, pages):
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    # Spawn every pool worker up front so the comparison excludes process start-up.
+    await asyncio.gather(*(loop.run_in_executor(get_extract_pool(), os.getpid) for _ in range(RESUME_EXTRACT_WORKERS)))
+    print(f"pool of {RESUME_EXTRACT_WORKERS} workers started in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'':>14} {'elapsed s':>10} {'pages/s':>9} {'pages/s/core':>13} {'max stall ms':>13} {'total stall ms':>15}")
+    for label, extract, cores in (
+        ("inline", inline_extract, 1),
+        ("process pool", extract_resume_text, RESUME_EXTRACT_WORKERS),
+    ):
+        elapsed, max_stall, total_stall = await measure(extract, corpus)
+        rate = pages / elapsed
+        print(f"{label:>14} {elapsed:>10.2f} {rate:>9.1f} {rate / cores:>13.1f} {max_stall:>13.1f} {total_stall:>15.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=60)
+    parser.add_argument("--max-pages", type=int, default=30)
+    args = parser.parse_args()
+
+    sizes = [1 + (i * 7) % args.max_pages for i in range(args.docs)]
+    corpus = [make_pdf(n) for n in sizes]
+    print(f"{args.docs} PDFs, {sum(sizes)} pages, {sum(map(len, corpus)) / 1e6:.1f} MB")
+    try:
+        asyncio.run(run(corpus, sum(sizes)))
+    finally:
+        shutdown_extract_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Local role matcher (app.role_matcher) latency and agreement.
+
+Generates synthetic profiles from the role taxonomy: a few of each role's
+terms as skills, sometimes an alternative title, plus unrelated noise
+skills. Reports per-user match latency, how often the matcher would fall
+back to the LLM, and how often the source role is in the top 3.
+
+    cd backend && python -m benchmarks.bench_role_matcher --users 10000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.role_matcher import ROLE_MATCHER_MIN_CONFIDENCE, ROLE_TAXONOMY, RoleMatcher, get_role_matcher
+
+NOISE = ["communication", "teamwork", "leadership", "english", "problem solving", "ms office", "time management"]
+TITLE_VARIANTS = {"Engineer": "Developer", "Developer": "Engineer", "Manager": "Lead", "Analyst": "Specialist"}
+
+
+def make_profile(rng: random.Random, role: str):
+    terms = ROLE_TAXONOMY[role].split()[2:]
+    title = role
+    if rng.random() < 0.5:
+        for old, new in TITLE_VARIANTS.items():
+            title = title.replace(old, new)
+    return {
+        "skills": rng.sample(terms, min(len(terms), rng.randint(2, 6))) + rng.sample(NOISE, rng.randint(0, 3)),
+        "desired_role": [title] if rng.random() < 0.7 else None,
+        "education": rng.choice(["B.Tech Computer Science", "MBA", "BSc", None]),
+        "certifications": None,
+    }
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    RoleMatcher(ROLE_TAXONOMY)
+    print(f"taxonomy of {len(ROLE_TAXONOMY)} roles built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    matcher = get_role_matcher()
+    rng = random.Random(11)
+    roles = list(ROLE_TAXONOMY)
+    cases = [(role, make_profile(rng, role)) for role in (rng.choice(roles) for _ in range(args.users))]
+
+    latencies, fallbacks, in_top3 = [], 0, 0
+    for role, profile in cases:
+        start = time.perf_counter()
+        matched = matcher.match(profile)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if matched is None:
+            fallbacks += 1
+        elif role in matched:
+            in_top3 += 1
+
+    confident = args.users - fallbacks
+    print(f"{args.users} users: p50 {statistics.median(latencies):.3f} ms, p99 {percentile(latencies, 0.99):.3f} ms, "
+          f"max {max(latencies):.3f} ms per match")
+    print(f"LLM fallback (best cosine < {ROLE_MATCHER_MIN_CONFIDENCE}): {fallbacks} ({fallbacks / args.users:.1%})")
+    print(f"source role in top 3 of confident matches: {in_top3}/{confident} ({in_top3 / max(confident, 1):.1%})")
+
+
+if __name__ == "__main__":
+    main()
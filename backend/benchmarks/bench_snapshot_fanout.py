@@ -0,0 +1,119 @@
+"""
+Page latency of the /snapshots/{user_id} S3 fan-out: serial requests.get
+(the previous implementation) versus the pooled concurrent fetcher.
+
+A threaded stdlib HTTP server stands in for S3 and adds a fixed per-object
+latency, so the numbers isolate round-trip cost from real network noise.
+
+    cd backend && python -m benchmarks.bench_snapshot_fanout --latency-ms 40
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.s3 import close_http_client, fetch_json_many
+from app.snapshot_cache import snapshot_cache
+
+DOCUMENT = json.dumps([
+    {"job_title": f"Engineer {i}", "company_name": "Acme", "job_location": "Bangalore",
+     "job_description_formatted": "<p>" + "lorem ipsum " * 200 + "</p>", "url": f"https://example.com/{i}"}
+    for i in range(25)
+]).encode()
+
+
+class FakeS3Server(ThreadingHTTPServer):
+    request_queue_size = 256
+    daemon_threads = True
+
+
+def make_handler(latency: float):
+    class FakeS3Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path.startswith("/missing"):
+                self.send_response(403)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(DOCUMENT)))
+            self.end_headers()
+            self.wfile.write(DOCUMENT)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeS3Handler
+
+
+def serial_page(urls):
+    results = []
+    for url in urls:
+        response = requests.get(url)
+        response.raise_for_status()
+        results.append(response.json())
+    return results
+
+
+def measure(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    server = FakeS3Server(("127.0.0.1", 0), make_handler(args.latency_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    loop = asyncio.new_event_loop()
+
+    def concurrent_page(urls):
+        return loop.run_until_complete(fetch_json_many(urls, concurrency=args.concurrency))
+
+    print(f"per-object latency {args.latency_ms:.0f} ms, concurrency {args.concurrency}")
+    print(f"{'limit':>6} {'serial p50 ms':>14} {'concurrent p50 ms':>18} {'speedup':>8}")
+    for limit in (12, 50, 100):
+        urls = [f"{base}/linkedin/role/{i}.json" for i in range(limit)]
+        serial, _ = measure(lambda: serial_page(urls), args.rounds)
+        concurrent, _ = measure(lambda: concurrent_page(urls), args.rounds)
+        print(f"{limit:>6} {serial:>14.1f} {concurrent:>18.1f} {serial / concurrent:>7.1f}x")
+
+    # Repeat reads of the same snapshots are served from the snapshot cache.
+    snapshot_cache.invalidate()
+    urls = [f"{base}/linkedin/role/{i}.json" for i in range(100)]
+    keys = [str(i) for i in range(100)]
+    cold, _ = measure(lambda: loop.run_until_complete(fetch_json_many(urls, cache_keys=keys)), 1)
+    warm, _ = measure(lambda: loop.run_until_complete(fetch_json_many(urls, cache_keys=keys)), args.rounds)
+    print(f"cached limit=100: cold {cold:.1f} ms, warm p50 {warm:.1f} ms, stats {snapshot_cache.stats()}")
+
+    # A page with failing objects still returns every item.
+    urls = [f"{base}/ok/1.json", f"{base}/missing/2.json"]
+    results = concurrent_page(urls)
+    print("partial page errors:", [r["error"] for r in results])
+
+    loop.run_until_complete(close_http_client())
+    loop.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Snapshot reuse lookup on a large ``snapshots`` table: the previous
+role/platform/payload equality filter versus the indexed
+(platform, payload_hash, created_at) probe.
+
+Builds a throwaway SQLite database with a synthetic table (one million rows
+by default), prints SQLite's query plan for both lookups and times them.
+
+    cd backend && python -m benchmarks.bench_snapshot_lookup --rows 1000000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.brightdata import build_payloads, normalize_payload, payload_fingerprint
+from app.models.snapshot import Snapshot
+
+
+def populate(engine, n_rows: int, n_roles: int) -> None:
+    now = datetime.utcnow()
+    payloads = {}
+    for r in range(n_roles):
+        for platform, payload in build_payloads(f"Role {r}", "Bangalore", {"country": "IN"}).items():
+            payload = normalize_payload(payload)
+            payloads[(r, platform)] = (json.dumps(payload), payload_fingerprint(platform, payload))
+    platforms = list(build_payloads("", "", {}))
+
+    rng = random.Random(7)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        batch = []
+        for i in range(n_rows):
+            r = rng.randrange(n_roles)
+            platform = rng.choice(platforms)
+            payload_json, payload_hash = payloads[(r, platform)]
+            created_at = now - timedelta(minutes=rng.randrange(60 * 24 * 90))
+            batch.append((f"Role {r}", platform, f"s_{i:08x}", payload_json, payload_hash,
+                          created_at.isoformat(sep=" ")))
+            if len(batch) == 50_000:
+                cursor.executemany(
+                    "INSERT INTO snapshots (role, platform, snapshot_id, payload, payload_hash, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", batch)
+                batch.clear()
+        if batch:
+            cursor.executemany(
+                "INSERT INTO snapshots (role, platform, snapshot_id, payload, payload_hash, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", batch)
+        raw.commit()
+        cursor.execute("ANALYZE")
+    finally:
+        raw.close()
+
+
+def explain(db, query) -> str:
+    compiled = query.statement.compile(db.get_bind())
+    params = [compiled.params[name] for name in compiled.positiontup]
+    params = [json.dumps(value) if isinstance(value, dict) else value for value in params]
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", tuple(params)).all()
+    return "; ".join(row[-1] for row in rows)
+
+
+def measure(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--roles", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'lookup.db')}")
+    Snapshot.__table__.create(engine)
+    start = time.perf_counter()
+    populate(engine, args.rows, args.roles)
+    print(f"built {args.rows:,} snapshot rows in {time.perf_counter() - start:.1f}s")
+
+    db = sessionmaker(bind=engine)()
+    fresh_after = datetime.utcnow() - timedelta(hours=24)
+
+    def lookups(role: str, platform: str = "LinkedIn"):
+        payload = normalize_payload(build_payloads(role, "Bangalore", {"country": "IN"})[platform])
+        # The previous lookup: unindexed role/platform filter plus payload equality.
+        before = db.query(Snapshot.snapshot_id).filter(
+            Snapshot.role == role,
+            Snapshot.platform == platform,
+            Snapshot.payload == payload,
+        )
+        after = db.query(Snapshot.snapshot_id, Snapshot.role).filter(
+            Snapshot.platform == platform,
+            Snapshot.payload_hash == payload_fingerprint(platform, payload),
+            Snapshot.created_at >= fresh_after,
+        ).order_by(Snapshot.created_at.desc())
+        return before, after
+
+    # A role seen before (hit) and a never-requested role (miss: the old lookup reads the whole table).
+    cases = {"hit": lookups(f"Role {args.roles // 2}"), "miss": lookups("Role never requested")}
+
+    # Measure the old lookup against the old schema, i.e. without the newer indexes.
+    indexes = [i for i in Snapshot.__table__.indexes if i.name != "ix_snapshots_id"]
+    for index in indexes:
+        index.drop(engine)
+    for case, (before, _) in cases.items():
+        elapsed = measure(lambda: before.first(), args.rounds)
+        print(f"payload equality   {case:>4}: p50 {elapsed:9.3f} ms  plan: {explain(db, before)}")
+    db.rollback()
+
+    for index in indexes:
+        index.create(engine)
+    db.execute(text("ANALYZE"))
+    for case, (_, after) in cases.items():
+        elapsed = measure(lambda: after.first(), args.rounds)
+        print(f"payload_hash probe {case:>4}: p50 {elapsed:9.3f} ms  plan: {explain(db, after)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Peak RSS of the API process serving a large snapshot: the buffered
+``GET /snapshots/{user_id}`` (whole document parsed and embedded in one JSON
+response) versus ``GET /snapshots/{user_id}/stream`` (NDJSON, parsed
+incrementally), with and without dropping the descriptions.
+
+Writes a synthetic LinkedIn-style snapshot (50 MB by default), serves it
+from a local stand-in for S3 and runs the app under uvicorn in a fresh
+subprocess per mode. The client streams and discards the body; the
+server's peak RSS is read from /proc/<pid>/status (VmHWM). The snapshot
+cache is disabled so both modes download the file.
+
+    cd backend && python -m benchmarks.bench_snapshot_stream --size-mb 50
+"""
+import argparse
+import functools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+SERVER = """
+import os, uvicorn
+from app.db import Base, SessionLocal, engine
+from app.models.job_posting import JobPosting
+from app.models.snapshot import Snapshot
+from app.models.user_snapshot import UserSnapshot
+Base.metadata.create_all(engine, tables=[JobPosting.__table__, Snapshot.__table__, UserSnapshot.__table__])
+with SessionLocal() as db:
+    if not db.query(Snapshot).count():
+        snapshot = Snapshot(role="Engineer", platform="LinkedIn", snapshot_id="big", payload={})
+        db.add(snapshot)
+        db.commit()
+        db.add(UserSnapshot(user_id="bench", snapshot_fk=snapshot.id))
+        db.commit()
+from app.main import app
+uvicorn.run(app, host="127.0.0.1", port=int(os.environ["PORT"]), log_level="warning")
+"""
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def write_snapshot(path: str, size_mb: float) -> int:
+    description = "<p>" + "Responsibilities include building <b>scalable</b> services. " * 350 + "</p>"
+    count = 0
+    with open(path, "w") as f:
+        f.write("[")
+        while f.tell() < size_mb * 1024 * 1024:
+            if count:
+                f.write(",")
+            json.dump({
+                "url": f"https://www.linkedin.com/jobs/view/{count}",
+                "job_title": f"Software Engineer {count}",
+                "company_name": "Acme",
+                "job_location": "Bangalore, Karnataka, India",
+                "job_posted_date": "2024-12-18T10:00:00Z",
+                "job_summary": description[:2000],
+                "job_description_formatted": description,
+            }, f)
+            count += 1
+        f.write("]")
+    return count
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def run_mode(path: str, env: dict) -> tuple:
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "-c", SERVER], env={**env, "PORT": str(port)})
+    try:
+        base = f"http://127.0.0.1:{port}"
+        for _ in range(200):
+            try:
+                httpx.get(f"{base}/health")
+                break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        idle = peak_rss_mb(server.pid)
+        start = time.perf_counter()
+        received = 0
+        with httpx.stream("GET", f"{base}{path}", timeout=300) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                received += len(chunk)
+        elapsed = time.perf_counter() - start
+        return idle, peak_rss_mb(server.pid), received, elapsed
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=float, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(workdir, "LinkedIn", "Engineer"))
+    count = write_snapshot(os.path.join(workdir, "LinkedIn", "Engineer", "big.json"), args.size_mb)
+    print(f"snapshot: {args.size_mb:.0f} MB, {count} postings")
+
+    s3 = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=workdir))
+    threading.Thread(target=s3.serve_forever, daemon=True).start()
+
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "OPENAI_API_KEY": "unused",
+        "S3_BASE_URL": f"http://127.0.0.1:{s3.server_address[1]}",
+        "S3_FETCH_TIMEOUT": "300",
+        "SNAPSHOT_CACHE_MAX_BYTES": "0",
+        "PYTHONPATH": os.getcwd(),
+    }
+    modes = [
+        ("buffered JSON", "/snapshots/bench"),
+        ("NDJSON stream", "/snapshots/bench/stream"),
+        ("NDJSON, no descriptions", "/snapshots/bench/stream?exclude=job_description_formatted,job_summary"),
+    ]
+    for name, path in modes:
+        idle, peak, received, elapsed = run_mode(path, env)
+        print(f"{name:>24}: peak RSS {peak:.0f} MB (idle {idle:.0f} MB, +{peak - idle:.0f} MB), "
+              f"{received / 1e6:.1f} MB sent in {elapsed:.2f}s")
+    s3.shutdown()
+
+
+if __name__ == "__main__":
+    main()
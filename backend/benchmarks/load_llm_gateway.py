@@ -0,0 +1,189 @@
+"""
+Concurrent LLM-backed requests through the shared async gateway (app.llm).
+
+Starts a fake OpenAI-compatible server on localhost that answers every chat
+completion after a fixed latency (and optionally with some 429s), points
+LLM_BASE_URL at it, runs the app under uvicorn and fires N concurrent
+/resume/upload calls, plus /ai/recommend calls when DATABASE_URL is a
+Postgres database (user_recommendations uses ARRAY columns). For comparison
+it also times the previous pattern: the synchronous OpenAI client called
+from async code.
+
+    cd backend && python -m benchmarks.load_llm_gateway --requests 20 --latency-ms 500
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.bench_resume_extract import make_pdf
+
+
+class FakeServer(ThreadingHTTPServer):
+    request_queue_size = 512
+    daemon_threads = True
+
+
+def make_handler(latency: float, error_rate: float):
+    class FakeOpenAIHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status, body, headers=None):
+            raw = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if not self.path.endswith("/chat/completions"):
+                self._send(404, {})
+                return
+            if random.random() < error_rate:
+                self._send(429, {"error": {"message": "rate limited", "type": "rate_limit"}}, {"retry-after": "0.1"})
+                return
+            time.sleep(latency)
+            system = request["messages"][0]["content"]
+            content = '{"skills": ["python"], "current_title": "Engineer"}' if "JSON object" in system \
+                else "[Data Scientist, ML Engineer, Data Analyst]"
+            self._send(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            })
+
+        def log_message(self, *args):
+            pass
+
+    return FakeOpenAIHandler
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def timed(coro):
+    start = time.perf_counter()
+    response = await coro
+    return response, (time.perf_counter() - start) * 1000
+
+
+async def serial_baseline(base_url: str, n: int) -> float:
+    """The previous handlers: a synchronous client call inside ``async def``."""
+    from openai import OpenAI
+
+    client = OpenAI(api_key="unused", base_url=base_url, max_retries=5)
+
+    async def handler():
+        client.chat.completions.create(model="gpt-4o", messages=[{"role": "system", "content": "roles"}])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(n)))
+    return time.perf_counter() - start
+
+
+async def run(app_url: str, n: int, include_recommend: bool):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=app_url, timeout=300) as client:
+        calls = [
+            client.post("/resume/upload", files={"file": ("cv.pdf", make_pdf(1, lines_per_page=5 + i), "application/pdf")})
+            for i in range(n)
+        ]
+        if include_recommend:
+            calls += [
+                client.post("/ai/recommend", json={
+                    "user_id": f"load-{i}",
+                    "user_profile": {"name": "Load", "skills": ["python"], "experience": 3},
+                })
+                for i in range(n)
+            ]
+        start = time.perf_counter()
+        results = await asyncio.gather(*(timed(call) for call in calls))
+        elapsed = time.perf_counter() - start
+
+    latencies = [ms for _, ms in results]
+    statuses = {}
+    for response, _ in results:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return elapsed, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    fake = FakeServer(("127.0.0.1", 0), make_handler(latency, args.error_rate))
+    threading.Thread(target=fake.serve_forever, daemon=True).start()
+    fake_url = f"http://127.0.0.1:{fake.server_address[1]}/v1"
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'llm.db')}")
+    os.environ.update({
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "unused"),
+        "LLM_BASE_URL": fake_url,
+        "LLM_RETRY_BASE_DELAY": "0.05",
+    })
+
+    import uvicorn
+    from app.db import Base, engine
+    from app.main import app
+    from app.models.job_posting import JobPosting
+    from app.models.resume_cache import ResumeCacheEntry
+    from app.models.snapshot import Snapshot
+    from app.models.user_snapshot import UserSnapshot
+
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    include_recommend = engine.dialect.name == "postgresql"
+    tables = [ResumeCacheEntry.__table__, JobPosting.__table__, Snapshot.__table__, UserSnapshot.__table__]
+    if include_recommend:
+        from app.models.user import UserRecommendations
+        tables.append(UserRecommendations.__table__)
+    Base.metadata.create_all(engine, tables=tables)
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    n_calls = args.requests * (2 if include_recommend else 1)
+    print(f"fake completion latency {args.latency_ms:.0f} ms, {args.error_rate:.0%} answered with 429")
+    if not include_recommend:
+        print("/ai/recommend skipped: needs a Postgres DATABASE_URL")
+
+    baseline = asyncio.run(serial_baseline(fake_url, n_calls))
+    print(f"sync client in async code: {n_calls} completions took {baseline:.2f}s (serialized)")
+
+    elapsed, latencies, statuses = asyncio.run(run(f"http://127.0.0.1:{port}", args.requests, include_recommend))
+    print(f"gateway via app: {n_calls} requests took {elapsed:.2f}s, statuses {statuses}, "
+          f"p50 {statistics.median(latencies):.0f} ms, p95 {percentile(latencies, 0.95):.0f} ms "
+          f"(serial lower bound {n_calls * latency:.1f}s)")
+
+    server.should_exit = True
+    thread.join()
+    fake.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+API responsiveness while scrape jobs are in flight.
+
+Starts a fake Bright Data API (trigger / progress / deliver) plus a fake S3
+bucket on localhost, runs the app under uvicorn and a scrape worker against
+a throwaway SQLite database, submits N /process-jobs requests, and samples
+/health latency until the worker has finished every job.
+
+    cd backend && python -m benchmarks.load_process_jobs --requests 50
+
+With ``--distinct-roles`` smaller than ``--requests`` several users ask for
+the same role at once, which shows how many Bright Data triggers were saved.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAKE_LATENCY = 0.05
+READY_AFTER = 1.0
+
+_triggered = {}
+
+
+class FakeServer(ThreadingHTTPServer):
+    request_queue_size = 512
+    daemon_threads = True
+
+
+class FakeBrightDataHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, body):
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        time.sleep(FAKE_LATENCY)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path.startswith("/datasets/v3/trigger"):
+            snapshot_id = f"s_{uuid.uuid4().hex[:12]}"
+            _triggered[snapshot_id] = time.time()
+            self._send(200, {"snapshot_id": snapshot_id})
+        elif self.path.startswith("/datasets/v3/deliver/"):
+            self._send(200, {"id": self.path.rsplit("/", 1)[-1]})
+        else:
+            self._send(404, {})
+
+    def do_GET(self):
+        time.sleep(FAKE_LATENCY)
+        if self.path.startswith("/datasets/v3/progress/"):
+            snapshot_id = self.path.rsplit("/", 1)[-1]
+            ready = time.time() - _triggered.get(snapshot_id, 0) >= READY_AFTER
+            self._send(200, {"status": "ready" if ready else "running"})
+        elif self.path.endswith(".json"):
+            self._send(200, [
+                {"job_title": f"Engineer {i}", "company_name": "Acme", "job_location": "Remote",
+                 "location": "Remote", "url": f"https://example.com/{uuid.uuid4().hex}"}
+                for i in range(20)
+            ])
+        else:
+            self._send(404, {})
+
+    def log_message(self, *args):
+        pass
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def sample_health(client, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.02)
+
+
+async def run(base_url: str, n_requests: int, distinct_roles: int):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300) as client:
+        idle = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_health(client, stop, idle))
+        await asyncio.sleep(1)
+        stop.set()
+        await sampler
+
+        loaded = []
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(sample_health(client, stop, loaded))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.post("/process-jobs", json={
+                "roles": [f"Role {i % distinct_roles}"],
+                "location": "Bangalore",
+                "additional_details": {"country": "IN"},
+                "user_id": f"user-{i}",
+            })
+            for i in range(n_requests)
+        ))
+        enqueue_elapsed = time.perf_counter() - start
+        job_ids = [r.json()["job_id"] for r in responses]
+
+        pending = set(job_ids)
+        statuses = {}
+        while pending:
+            await asyncio.sleep(0.25)
+            for job_id in list(pending):
+                status = (await client.get(f"/process-jobs/{job_id}")).json()["status"]
+                if status in ("completed", "failed"):
+                    statuses[job_id] = status
+                    pending.discard(job_id)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await sampler
+        metrics = (await client.get("/snapshots/metrics/triggers")).json()
+
+    completed = sum(1 for status in statuses.values() if status == "completed")
+    print(f"{n_requests} /process-jobs calls accepted in {enqueue_elapsed:.2f}s; "
+          f"{completed} jobs completed after {elapsed:.1f}s")
+    for label, samples in (("idle", idle), ("under load", loaded)):
+        print(f"/health {label:>10}: n={len(samples):4d} p50={statistics.median(samples):6.1f} ms "
+              f"p95={percentile(samples, 0.95):6.1f} ms max={max(samples):6.1f} ms")
+    flows = n_requests * 3
+    print(f"Bright Data triggers: {len(_triggered)} for {flows} role/platform flows "
+          f"({1 - len(_triggered) / flows:.0%} saved)")
+    print(f"/snapshots/metrics/triggers: {metrics['requests']} requests, {metrics['triggers']} triggers, "
+          f"savings ratio {metrics['savings_ratio']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--distinct-roles", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeServer(("127.0.0.1", 0), FakeBrightDataHandler)
+    threading.Thread(target=fake.serve_forever, daemon=True).start()
+    fake_url = f"http://127.0.0.1:{fake.server_address[1]}"
+
+    db_path = os.path.join(tempfile.mkdtemp(), "load.db")
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", "unused"),
+        "BRIGHTDATA_API_URL": fake_url,
+        "S3_BASE_URL": fake_url,
+        "BRIGHTDATA_POLL_BASE_DELAY": "0.2",
+        "BRIGHTDATA_POLL_MAX_DELAY": "0.5",
+        "BRIGHTDATA_CONCURRENCY": "32",
+    })
+
+    import uvicorn
+    from app.db import Base, engine
+    from app.main import app
+    from app.models.ingest_watermark import IngestWatermark
+    from app.models.job_posting import JobPosting
+    from app.models.posting_scope import PostingScope
+    from app.models.scrape_job import ScrapeJob
+    from app.models.snapshot import Snapshot
+    from app.models.trigger_request import TriggerRequest
+    from app.models.user_snapshot import UserSnapshot
+    from app.models.user_version import UserVersion
+    from app.worker import run_worker
+
+    logging.getLogger("app").setLevel(logging.CRITICAL)
+    Base.metadata.create_all(engine, tables=[
+        Snapshot.__table__, UserSnapshot.__table__, JobPosting.__table__, ScrapeJob.__table__,
+        TriggerRequest.__table__, UserVersion.__table__, PostingScope.__table__, IngestWatermark.__table__,
+    ])
+
+    # The worker normally runs as its own process; a thread with its own loop stands in here.
+    worker_loop = asyncio.new_event_loop()
+    worker_stop = asyncio.Event()
+    worker_thread = threading.Thread(
+        target=worker_loop.run_until_complete,
+        args=(run_worker(concurrency=args.requests, poll_interval=0.1, stop=worker_stop),),
+        daemon=True,
+    )
+    worker_thread.start()
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+
+    asyncio.run(run(f"http://127.0.0.1:{port}", args.requests, args.distinct_roles or args.requests))
+
+    worker_loop.call_soon_threadsafe(worker_stop.set)
+    worker_thread.join()
+    server.should_exit = True
+    thread.join()
+    fake.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Connection pool under sustained load: 10k API requests (roles, snapshot
+summaries, postings, search, posting detail, /ai/recommend) plus scrape jobs
+whose snapshots are all reused, checking that pooled connections are always
+returned: nothing stays checked out, and no more connections are ever open
+than ``pool_size + max_overflow``.
+
+Runs the app in-process over ASGI against a throwaway SQLite file (or the
+database in ``DATABASE_URL``), ``--concurrency`` requests at a time, and
+prints ``app.db.pool_stats()`` every ``--every`` requests. ``connections_opened`` growing while ``connections_open`` stays put is
+overflow churn (connections beyond ``pool_size`` are closed on checkin), a
+sign ``DB_POOL_SIZE`` is below the steady concurrency. Exits non-zero if
+connections leaked or any request failed.
+
+    cd backend && python -m benchmarks.stress_db_pool --requests 10000 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'stress.db')}")
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+# /ai/recommend is answered by the local role matcher, never the LLM.
+os.environ.setdefault("RECOMMEND_BACKEND", "local")
+
+import httpx
+from sqlalchemy import JSON
+
+from app.models.user import UserRecommendations
+
+if os.environ["DATABASE_URL"].startswith("sqlite"):
+    # user_recommendations uses a Postgres ARRAY
+    UserRecommendations.__table__.c.recommendations.type = JSON()
+
+import app.models.user as user_models
+from app.brightdata import build_payloads
+from app.db import DB_MAX_OVERFLOW, DB_POOL_SIZE, Base, SessionLocal, engine, pool_stats
+from app.ingest import normalize_posting, upsert_postings
+from app.models import ingest_watermark, posting_bucket, resume_cache, scrape_job, trigger_request, user_snapshot, user_version
+from app.models.snapshot import Snapshot
+from app.routers.snapshot import SnapshotManager
+from app.subscriptions import record_snapshots
+
+USERS = 20
+ROLES = ["Software Engineer", "Data Analyst", "Product Manager"]
+LOCATION = "Bangalore"
+
+
+def setup() -> None:
+    Base.metadata.create_all(engine)
+    user_models.Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        for role in ROLES:
+            for platform, payload in build_payloads(role, LOCATION, {}).items():
+                snapshot_id = f"{platform}-{role}".replace(" ", "_")
+                upsert_postings(db, [
+                    normalize_posting(platform, role, snapshot_id, {
+                        "url": f"https://example.com/{snapshot_id}/{i}",
+                        "job_title": f"{role} {i}",
+                        "company_name": f"Company {i}",
+                        "job_location": LOCATION,
+                        "location": LOCATION,
+                        "job_description_formatted": f"<p>{role} needed. " + "Build things. " * 50 + "</p>",
+                    })
+                    for i in range(50)
+                ])
+                for user in range(USERS):
+                    record_snapshots(db, f"user-{user}", [(role, platform, snapshot_id, payload)])
+        for user in range(USERS):
+            db.add(UserRecommendations(user_id=f"user-{user}", recommendations=ROLES))
+        db.commit()
+
+
+def request(client: httpx.AsyncClient, i: int):
+    user = f"user-{i % USERS}"
+    if i % 7 == 6:
+        # Generated once per user, then answered from the stored fingerprint.
+        return client.post("/ai/recommend", json={"user_id": user, "user_profile": {
+            "skills": ["Python", "SQL"], "experience": 3, "location": LOCATION, "desired_role": ROLES[i % len(ROLES)],
+        }})
+    return client.get([
+        f"/roles/{user}",
+        f"/snapshots/{user}?view=summary",
+        f"/snapshots/{user}/postings?limit=20",
+        f"/snapshots/{user}/postings?sort=relevance",
+        f"/jobs/search?user_id={user}&limit=20",
+        f"/jobs/{1 + i % 100}",
+    ][i % 7])
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--every", type=int, default=1000)
+    parser.add_argument("--job-every", type=int, default=100, help="Run a (fully reused) scrape job every N requests")
+    args = parser.parse_args()
+
+    setup()
+    from app.main import app
+
+    print(f"pool_size={DB_POOL_SIZE} max_overflow={DB_MAX_OVERFLOW}, {args.concurrency} concurrent requests")
+    peak_open = 0
+    errors = 0
+    done = 0
+    queue = iter(range(args.requests))
+    manager = SnapshotManager()
+    started = time.perf_counter()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://stress") as client:
+        async def worker():
+            nonlocal done, errors, peak_open
+            for i in queue:
+                if i % args.job_every == 0:
+                    results = await manager.process_job_roles(ROLES, LOCATION, {}, f"user-{i % USERS}")
+                    if any(r["status"] != "existing_snapshot_used" for entry in results for r in entry["results"].values()):
+                        errors += 1
+                response = await request(client, i)
+                if response.status_code != 200:
+                    errors += 1
+                done += 1
+                if done % args.every == 0:
+                    stats = pool_stats()
+                    peak_open = max(peak_open, stats["connections_open"])
+                    print(f"{done:>6} requests: checked_out={stats.get('checked_out')} "
+                          f"overflow={stats.get('overflow')} open={stats['connections_open']} "
+                          f"opened={stats['connections_opened']} "
+                          f"wait avg={stats['wait_ms_avg']} ms max={stats['wait_ms_max']} ms "
+                          f"timeouts={stats['timeouts']}")
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+    elapsed = time.perf_counter() - started
+    final = pool_stats()
+    print(f"{args.requests} requests in {elapsed:.1f}s ({args.requests / elapsed:.0f}/s), {errors} errors")
+    print(f"final: {final}")
+
+    print(f"peak open connections at samples: {peak_open} (limit {DB_POOL_SIZE + DB_MAX_OVERFLOW})")
+    leaked = (
+        final.get("checked_out", 0) != 0
+        or final["connections_open"] > DB_POOL_SIZE
+        or peak_open > DB_POOL_SIZE + DB_MAX_OVERFLOW
+        or final["timeouts"]
+    )
+    print("connections leaked" if leaked else "all connections returned")
+    sys.exit(1 if leaked or errors else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -27,6 +27,16 @@ fileConfig(config.config_file_name)
 # Import your models here for 'autogenerate' support
 from app.models import user  # Replace with your actual models import
 from app.models import snapshot
+from app.models import job_posting
+from app.models import user_snapshot
+from app.models import scrape_job
+from app.models import resume_cache
+from app.models import posting_bucket
+from app.models import ingest_watermark
+from app.models import user_version
+from app.models import trigger_request
+from app.models import scheduler_request
+from app.models import posting_scope
 
 # Add your model's MetaData object here for 'autogenerate' support
 # target_metadata = Base.metadata
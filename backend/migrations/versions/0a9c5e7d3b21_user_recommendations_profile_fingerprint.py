@@ -0,0 +1,28 @@
+"""user recommendations profile fingerprint
+
+Revision ID: 0a9c5e7d3b21
+Revises: f3a86d21b7c4
+Create Date: 2026-10-18 18:12:40.517733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a9c5e7d3b21'
+down_revision: Union[str, None] = 'f3a86d21b7c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_recommendations', sa.Column('profile_fingerprint', sa.String(length=64), nullable=True))
+    op.add_column('user_recommendations', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user_recommendations', 'updated_at')
+    op.drop_column('user_recommendations', 'profile_fingerprint')
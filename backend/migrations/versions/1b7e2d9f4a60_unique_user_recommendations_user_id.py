@@ -0,0 +1,31 @@
+"""unique user recommendations user id
+
+Revision ID: 1b7e2d9f4a60
+Revises: 0a9c5e7d3b21
+Create Date: 2026-10-18 18:40:22.093514
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b7e2d9f4a60'
+down_revision: Union[str, None] = '0a9c5e7d3b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the newest row per user.
+    op.execute("""
+        DELETE FROM user_recommendations
+        WHERE id NOT IN (SELECT MAX(id) FROM user_recommendations GROUP BY user_id)
+    """)
+    op.create_unique_constraint('uq_user_recommendations_user_id', 'user_recommendations', ['user_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_recommendations_user_id', 'user_recommendations', type_='unique')
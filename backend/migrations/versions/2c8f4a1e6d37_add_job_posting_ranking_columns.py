@@ -0,0 +1,33 @@
+"""add job posting ranking columns
+
+Revision ID: 2c8f4a1e6d37
+Revises: 1b7e2d9f4a60
+Create Date: 2026-10-18 19:12:47.530118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c8f4a1e6d37'
+down_revision: Union[str, None] = '1b7e2d9f4a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are filled in by `python -m app.ranking --backfill`.
+    op.add_column('job_postings', sa.Column('title_features', sa.LargeBinary(), nullable=True))
+    op.add_column('job_postings', sa.Column('skill_features', sa.LargeBinary(), nullable=True))
+    op.add_column('job_postings', sa.Column('seniority', sa.SmallInteger(), nullable=True))
+    op.add_column('job_postings', sa.Column('min_experience_years', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('job_postings', 'min_experience_years')
+    op.drop_column('job_postings', 'seniority')
+    op.drop_column('job_postings', 'skill_features')
+    op.drop_column('job_postings', 'title_features')
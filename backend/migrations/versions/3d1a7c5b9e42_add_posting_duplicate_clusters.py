@@ -0,0 +1,44 @@
+"""add posting duplicate clusters
+
+Revision ID: 3d1a7c5b9e42
+Revises: 2c8f4a1e6d37
+Create Date: 2026-10-18 19:48:03.871240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d1a7c5b9e42'
+down_revision: Union[str, None] = '2c8f4a1e6d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are clustered by `python -m app.dedup --backfill`.
+    op.add_column('job_postings', sa.Column('dedup_key', sa.String(length=40), nullable=True))
+    op.add_column('job_postings', sa.Column('minhash', sa.LargeBinary(), nullable=True))
+    op.add_column('job_postings', sa.Column('cluster_id', sa.Integer(), nullable=True))
+    op.create_index('ix_job_postings_dedup_key', 'job_postings', ['dedup_key'], unique=False)
+    op.create_index('ix_job_postings_cluster_id_id', 'job_postings', ['cluster_id', 'id'], unique=False)
+    op.create_table('posting_lsh_buckets',
+    sa.Column('band', sa.BigInteger(), nullable=False),
+    sa.Column('posting_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['posting_id'], ['job_postings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('band', 'posting_id')
+    )
+    op.create_index('ix_posting_lsh_buckets_posting_id', 'posting_lsh_buckets', ['posting_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posting_lsh_buckets_posting_id', table_name='posting_lsh_buckets')
+    op.drop_table('posting_lsh_buckets')
+    op.drop_index('ix_job_postings_cluster_id_id', table_name='job_postings')
+    op.drop_index('ix_job_postings_dedup_key', table_name='job_postings')
+    op.drop_column('job_postings', 'cluster_id')
+    op.drop_column('job_postings', 'minhash')
+    op.drop_column('job_postings', 'dedup_key')
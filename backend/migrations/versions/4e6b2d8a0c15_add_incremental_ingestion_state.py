@@ -0,0 +1,47 @@
+"""add incremental ingestion state
+
+Revision ID: 4e6b2d8a0c15
+Revises: 3d1a7c5b9e42
+Create Date: 2026-10-18 20:31:26.402857
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e6b2d8a0c15'
+down_revision: Union[str, None] = '3d1a7c5b9e42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ingest_watermarks',
+    sa.Column('scope_key', sa.String(length=64), nullable=False),
+    sa.Column('platform', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('last_snapshot_id', sa.String(), nullable=True),
+    sa.Column('last_posted_at', sa.DateTime(), nullable=True),
+    sa.Column('last_ingested_at', sa.DateTime(), nullable=True),
+    sa.Column('postings_seen', sa.Integer(), nullable=False),
+    sa.Column('postings_new', sa.Integer(), nullable=False),
+    sa.Column('postings_removed', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope_key')
+    )
+    # Postings ingested before this revision have no scope and are never tombstoned.
+    op.add_column('job_postings', sa.Column('scope_key', sa.String(length=64), nullable=True))
+    op.add_column('job_postings', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+    op.add_column('job_postings', sa.Column('removed_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_job_postings_scope_key_last_seen_at', 'job_postings', ['scope_key', 'last_seen_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_postings_scope_key_last_seen_at', table_name='job_postings')
+    op.drop_column('job_postings', 'removed_at')
+    op.drop_column('job_postings', 'last_seen_at')
+    op.drop_column('job_postings', 'scope_key')
+    op.drop_table('ingest_watermarks')
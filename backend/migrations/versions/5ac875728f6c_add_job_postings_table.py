@@ -0,0 +1,54 @@
+"""add job postings table
+
+Revision ID: 5ac875728f6c
+Revises: 33164f731ca9
+Create Date: 2026-10-18 09:12:41.508213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5ac875728f6c'
+down_revision: Union[str, None] = '33164f731ca9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('job_postings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('platform', sa.String(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('snapshot_id', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('company', sa.String(), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('posted_at', sa.DateTime(), nullable=True),
+    sa.Column('salary_min', sa.Float(), nullable=True),
+    sa.Column('salary_max', sa.Float(), nullable=True),
+    sa.Column('salary_currency', sa.String(), nullable=True),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.Column('dedup_hash', sa.String(length=40), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('raw', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('role', 'dedup_hash', name='uq_job_postings_role_dedup_hash')
+    )
+    op.create_index(op.f('ix_job_postings_id'), 'job_postings', ['id'], unique=False)
+    op.create_index('ix_job_postings_platform_role_posted_at', 'job_postings', ['platform', 'role', 'posted_at'], unique=False)
+    op.create_index('ix_job_postings_snapshot_id', 'job_postings', ['snapshot_id'], unique=False)
+    op.create_index('ix_job_postings_company', 'job_postings', ['company'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_postings_company', table_name='job_postings')
+    op.drop_index('ix_job_postings_snapshot_id', table_name='job_postings')
+    op.drop_index('ix_job_postings_platform_role_posted_at', table_name='job_postings')
+    op.drop_index(op.f('ix_job_postings_id'), table_name='job_postings')
+    op.drop_table('job_postings')
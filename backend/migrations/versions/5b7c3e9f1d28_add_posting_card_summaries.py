@@ -0,0 +1,33 @@
+"""add posting card summaries
+
+Revision ID: 5b7c3e9f1d28
+Revises: 4e6b2d8a0c15
+Create Date: 2026-10-18 21:05:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7c3e9f1d28'
+down_revision: Union[str, None] = '4e6b2d8a0c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows are filled in by `python -m app.ingest --backfill`.
+    op.add_column('job_postings', sa.Column('excerpt', sa.String(length=300), nullable=True))
+    op.add_column('job_postings', sa.Column('employment_type', sa.String(), nullable=True))
+    op.add_column('job_postings', sa.Column('company_logo', sa.String(), nullable=True))
+    op.add_column('job_postings', sa.Column('company_rating', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('job_postings', 'company_rating')
+    op.drop_column('job_postings', 'company_logo')
+    op.drop_column('job_postings', 'employment_type')
+    op.drop_column('job_postings', 'excerpt')
@@ -0,0 +1,32 @@
+"""add user versions
+
+Revision ID: 6c2e8a4f7b13
+Revises: 5b7c3e9f1d28
+Create Date: 2026-10-18 21:52:40.117385
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2e8a4f7b13'
+down_revision: Union[str, None] = '5b7c3e9f1d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Users without a row are at version 0 until their first change.
+    op.create_table('user_versions',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_versions')
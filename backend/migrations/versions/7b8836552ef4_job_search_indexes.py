@@ -0,0 +1,46 @@
+"""job search indexes
+
+Revision ID: 7b8836552ef4
+Revises: 5ac875728f6c
+Create Date: 2026-10-18 11:03:27.114902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b8836552ef4'
+down_revision: Union[str, None] = '5ac875728f6c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('job_postings', sa.Column('is_remote', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.execute("UPDATE job_postings SET is_remote = true WHERE location ILIKE '%remote%' OR title ILIKE '%remote%'")
+
+    # Keyset pagination needs a non-null sort key.
+    op.execute("UPDATE job_postings SET posted_at = COALESCE(created_at, now()) WHERE posted_at IS NULL")
+    op.alter_column('job_postings', 'posted_at', existing_type=sa.DateTime(), nullable=False)
+
+    op.drop_index('ix_job_postings_platform_role_posted_at', table_name='job_postings')
+    op.create_index('ix_job_postings_posted_at_id', 'job_postings', ['posted_at', 'id'], unique=False)
+    op.create_index('ix_job_postings_platform_role_posted_at_id', 'job_postings', ['platform', 'role', 'posted_at', 'id'], unique=False)
+    op.create_index('ix_job_postings_role_posted_at_id', 'job_postings', ['role', 'posted_at', 'id'], unique=False)
+
+    op.create_index('ix_snapshots_user_id_platform_role', 'snapshots', ['user_id', 'platform', 'role'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_snapshots_user_id_platform_role', table_name='snapshots')
+
+    op.drop_index('ix_job_postings_role_posted_at_id', table_name='job_postings')
+    op.drop_index('ix_job_postings_platform_role_posted_at_id', table_name='job_postings')
+    op.drop_index('ix_job_postings_posted_at_id', table_name='job_postings')
+    op.create_index('ix_job_postings_platform_role_posted_at', 'job_postings', ['platform', 'role', 'posted_at'], unique=False)
+
+    op.alter_column('job_postings', 'posted_at', existing_type=sa.DateTime(), nullable=True)
+    op.drop_column('job_postings', 'is_remote')
@@ -0,0 +1,34 @@
+"""add trigger requests
+
+Revision ID: 8e4f1b6d2a97
+Revises: 6c2e8a4f7b13
+Create Date: 2026-10-18 23:41:07.562019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f1b6d2a97'
+down_revision: Union[str, None] = '6c2e8a4f7b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('trigger_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('platform', sa.String(), nullable=False),
+    sa.Column('outcome', sa.String(length=16), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trigger_requests_created_at'), 'trigger_requests', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_trigger_requests_created_at'), table_name='trigger_requests')
+    op.drop_table('trigger_requests')
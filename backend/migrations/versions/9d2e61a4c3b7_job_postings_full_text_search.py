@@ -0,0 +1,36 @@
+"""job postings full text search
+
+Revision ID: 9d2e61a4c3b7
+Revises: 7b8836552ef4
+Create Date: 2026-10-18 13:40:05.671390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e61a4c3b7'
+down_revision: Union[str, None] = '7b8836552ef4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Title matches outrank company matches, which outrank description matches.
+    op.execute("""
+        ALTER TABLE job_postings ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(company, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+    """)
+    op.create_index('ix_job_postings_search_vector', 'job_postings', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_job_postings_search_vector', table_name='job_postings')
+    op.drop_column('job_postings', 'search_vector')
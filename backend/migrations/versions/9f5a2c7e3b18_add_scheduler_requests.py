@@ -0,0 +1,35 @@
+"""add scheduler requests
+
+Revision ID: 9f5a2c7e3b18
+Revises: 8e4f1b6d2a97
+Create Date: 2026-10-19 00:27:53.204817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f5a2c7e3b18'
+down_revision: Union[str, None] = '8e4f1b6d2a97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduler_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('requested_by', sa.String(), nullable=True),
+    sa.Column('requested_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scheduler_requests_finished_at'), 'scheduler_requests', ['finished_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scheduler_requests_finished_at'), table_name='scheduler_requests')
+    op.drop_table('scheduler_requests')
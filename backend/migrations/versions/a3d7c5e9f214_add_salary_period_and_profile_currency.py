@@ -0,0 +1,28 @@
+"""add salary period and profile salary currency
+
+Revision ID: a3d7c5e9f214
+Revises: 9f5a2c7e3b18
+Create Date: 2026-10-19 02:11:36.418290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d7c5e9f214'
+down_revision: Union[str, None] = '9f5a2c7e3b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('job_postings', sa.Column('salary_period', sa.String(length=8), nullable=True))
+    op.add_column('user_profiles', sa.Column('salary_currency', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('user_profiles', 'salary_currency')
+    op.drop_column('job_postings', 'salary_period')
@@ -0,0 +1,46 @@
+"""add scrape jobs table
+
+Revision ID: b41f0c2d7e95
+Revises: 9d2e61a4c3b7
+Create Date: 2026-10-18 15:21:48.336017
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41f0c2d7e95'
+down_revision: Union[str, None] = '9d2e61a4c3b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('scrape_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('roles', sa.JSON(), nullable=False),
+    sa.Column('location', sa.String(), nullable=False),
+    sa.Column('additional_details', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('progress', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('worker_id', sa.String(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_scrape_jobs_status_created_at', 'scrape_jobs', ['status', 'created_at'], unique=False)
+    op.create_index('ix_scrape_jobs_user_id', 'scrape_jobs', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scrape_jobs_user_id', table_name='scrape_jobs')
+    op.drop_index('ix_scrape_jobs_status_created_at', table_name='scrape_jobs')
+    op.drop_table('scrape_jobs')
@@ -0,0 +1,50 @@
+"""add posting scopes
+
+Revision ID: b6e2f8a4d931
+Revises: a3d7c5e9f214
+Create Date: 2026-10-19 02:58:14.730961
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2f8a4d931'
+down_revision: Union[str, None] = 'a3d7c5e9f214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('posting_scopes',
+    sa.Column('posting_id', sa.Integer(), nullable=False),
+    sa.Column('scope_key', sa.String(length=64), nullable=False),
+    sa.Column('last_seen_at', sa.DateTime(), nullable=False),
+    sa.Column('removed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['posting_id'], ['job_postings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('posting_id', 'scope_key')
+    )
+    op.create_index('ix_posting_scopes_scope_key_last_seen_at', 'posting_scopes', ['scope_key', 'last_seen_at'], unique=False)
+    # Each posting's single recorded scope becomes its first membership.
+    op.execute(
+        "INSERT INTO posting_scopes (posting_id, scope_key, last_seen_at, removed_at) "
+        "SELECT id, scope_key, COALESCE(last_seen_at, created_at, posted_at), removed_at "
+        "FROM job_postings WHERE scope_key IS NOT NULL"
+    )
+    op.drop_index('ix_job_postings_scope_key_last_seen_at', table_name='job_postings')
+    op.drop_column('job_postings', 'scope_key')
+
+
+def downgrade() -> None:
+    op.add_column('job_postings', sa.Column('scope_key', sa.String(length=64), nullable=True))
+    op.execute(
+        "UPDATE job_postings SET scope_key = ("
+        "SELECT scope_key FROM posting_scopes WHERE posting_scopes.posting_id = job_postings.id "
+        "ORDER BY last_seen_at DESC LIMIT 1)"
+    )
+    op.create_index('ix_job_postings_scope_key_last_seen_at', 'job_postings', ['scope_key', 'last_seen_at'], unique=False)
+    op.drop_index('ix_posting_scopes_scope_key_last_seen_at', table_name='posting_scopes')
+    op.drop_table('posting_scopes')
@@ -0,0 +1,80 @@
+"""snapshot payload hash
+
+Revision ID: c7e1a9d43f08
+Revises: b41f0c2d7e95
+Create Date: 2026-10-18 16:02:11.418305
+
+"""
+import hashlib
+import json
+from typing import Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e1a9d43f08'
+down_revision: Union[str, None] = 'b41f0c2d7e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+snapshots = sa.table(
+    'snapshots',
+    sa.column('id', sa.Integer()),
+    sa.column('platform', sa.String()),
+    sa.column('payload', sa.JSON()),
+    sa.column('payload_hash', sa.String()),
+)
+
+
+# Frozen copies of app.brightdata.normalize_payload / payload_fingerprint as
+# of this revision, so replaying the migration always computes the same hashes.
+def normalize_payload(payload: Dict) -> Dict:
+    return {
+        key: " ".join(value.split()) if isinstance(value, str) else value
+        for key, value in payload.items()
+    }
+
+
+def payload_fingerprint(platform: str, payload: Dict) -> str:
+    canonical = {
+        key: value.casefold() if isinstance(value, str) else value
+        for key, value in normalize_payload(payload).items()
+        if value not in ("", None)
+    }
+    encoded = json.dumps([platform, canonical], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column('snapshots', sa.Column('payload_hash', sa.String(length=64), nullable=True))
+
+    # Backfill in id order, one batch at a time.
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(snapshots.c.id, snapshots.c.platform, snapshots.c.payload)
+            .where(snapshots.c.id > last_id, snapshots.c.payload.isnot(None))
+            .order_by(snapshots.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            snapshots.update()
+            .where(snapshots.c.id == sa.bindparam('row_id'))
+            .values(payload_hash=sa.bindparam('hash')),
+            [{'row_id': row.id, 'hash': payload_fingerprint(row.platform, row.payload)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    op.create_index('ix_snapshots_platform_payload_hash_created_at', 'snapshots', ['platform', 'payload_hash', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_snapshots_platform_payload_hash_created_at', table_name='snapshots')
+    op.drop_column('snapshots', 'payload_hash')
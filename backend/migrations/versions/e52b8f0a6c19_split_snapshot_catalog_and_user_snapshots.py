@@ -0,0 +1,82 @@
+"""split snapshot catalog and user snapshots
+
+Revision ID: e52b8f0a6c19
+Revises: c7e1a9d43f08
+Create Date: 2026-10-18 16:48:37.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e52b8f0a6c19'
+down_revision: Union[str, None] = 'c7e1a9d43f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('snapshot_fk', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['snapshot_fk'], ['snapshots.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'snapshot_fk', name='uq_user_snapshots_user_id_snapshot_fk')
+    )
+
+    # Every (user, snapshot) pair becomes a link to the oldest row of that snapshot.
+    op.execute("""
+        INSERT INTO user_snapshots (user_id, snapshot_fk, created_at)
+        SELECT s.user_id, keep.id, MIN(s.created_at)
+        FROM snapshots s
+        JOIN (SELECT snapshot_id, MIN(id) AS id FROM snapshots GROUP BY snapshot_id) keep
+          ON keep.snapshot_id = s.snapshot_id
+        WHERE s.user_id IS NOT NULL
+        GROUP BY s.user_id, keep.id
+    """)
+    # Copies made for other users carry no payload; keep a hash if any copy has one.
+    op.execute("""
+        UPDATE snapshots SET payload_hash = (
+            SELECT MAX(d.payload_hash) FROM snapshots d WHERE d.snapshot_id = snapshots.snapshot_id
+        )
+        WHERE payload_hash IS NULL
+    """)
+    op.execute("""
+        DELETE FROM snapshots
+        WHERE id NOT IN (SELECT MIN(id) FROM snapshots GROUP BY snapshot_id)
+    """)
+
+    op.drop_index('ix_snapshots_user_id_platform_role', table_name='snapshots')
+    op.drop_column('snapshots', 'user_id')
+    op.create_unique_constraint('uq_snapshots_snapshot_id', 'snapshots', ['snapshot_id'])
+    op.create_index('ix_snapshots_role_platform', 'snapshots', ['role', 'platform'], unique=False)
+    op.create_index('ix_user_snapshots_snapshot_fk', 'user_snapshots', ['snapshot_fk'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_snapshots_role_platform', table_name='snapshots')
+    op.drop_constraint('uq_snapshots_snapshot_id', 'snapshots', type_='unique')
+    op.add_column('snapshots', sa.Column('user_id', sa.String(), nullable=True))
+
+    # Give each catalog row one subscriber and re-create a copy per other subscriber.
+    op.execute("""
+        UPDATE snapshots SET user_id = (
+            SELECT MIN(us.user_id) FROM user_snapshots us WHERE us.snapshot_fk = snapshots.id
+        )
+    """)
+    op.execute("""
+        INSERT INTO snapshots (role, platform, snapshot_id, payload, payload_hash, created_at, user_id)
+        SELECT s.role, s.platform, s.snapshot_id, s.payload, s.payload_hash, us.created_at, us.user_id
+        FROM user_snapshots us
+        JOIN snapshots s ON s.id = us.snapshot_fk
+        WHERE us.user_id <> s.user_id
+    """)
+
+    op.create_index('ix_snapshots_user_id_platform_role', 'snapshots', ['user_id', 'platform', 'role'], unique=False)
+    op.drop_index('ix_user_snapshots_snapshot_fk', table_name='user_snapshots')
+    op.drop_table('user_snapshots')
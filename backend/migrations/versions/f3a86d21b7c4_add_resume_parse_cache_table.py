@@ -0,0 +1,37 @@
+"""add resume parse cache table
+
+Revision ID: f3a86d21b7c4
+Revises: e52b8f0a6c19
+Create Date: 2026-10-18 17:34:05.221980
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a86d21b7c4'
+down_revision: Union[str, None] = 'e52b8f0a6c19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('resume_parse_cache',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('prompt_version', sa.String(length=16), nullable=True),
+    sa.Column('hits', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    op.create_index('ix_resume_parse_cache_last_used_at', 'resume_parse_cache', ['last_used_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_resume_parse_cache_last_used_at', table_name='resume_parse_cache')
+    op.drop_table('resume_parse_cache')